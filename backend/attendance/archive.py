@@ -0,0 +1,101 @@
+"""
+Term-based archival of attendance records.
+
+The attendance table holds the terms still in use; once a term has ended
+(and ATTENDANCE_ARCHIVE_AFTER_DAYS more have passed for late corrections)
+`manage.py archive_attendance` moves its records to ArchivedAttendance, so
+the hot table and its indexes stay the size of a term or two however many
+years of history pile up. Reports on an archived term read the archive
+(see records_for_term), which nothing writes to afterwards.
+
+Records are moved in batches of sessions, each with one INSERT ... SELECT
+and one DELETE in its own transaction. The DELETE is raw so it sends no
+post_delete: archived records are not deletions for syncing clients. An
+interrupted run is resumed by running the command again; the term is
+marked archived once its last batch has moved.
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from caching.tiered import invalidate_model
+from classes.models import Term
+from session.closing import finalize_session
+from session.models import Session
+
+from .models import ArchivedAttendance, Attendance
+
+ARCHIVE_SQL = """
+INSERT INTO {archive} (id, term_id, session_id, student_id, status, scanned_at, updated_at, archived_at)
+SELECT id, %s, session_id, student_id, status, scanned_at, updated_at, %s
+FROM {attendance} WHERE session_id IN ({sessions})
+"""
+
+DELETE_SQL = 'DELETE FROM {attendance} WHERE session_id IN ({sessions})'
+
+
+def term_bounds(term):
+    """The [start, end) datetimes of a term's sessions"""
+    start = timezone.make_aware(datetime.combine(term.start_date, time.min))
+    end = timezone.make_aware(datetime.combine(term.end_date + timedelta(days=1), time.min))
+    return start, end
+
+
+def term_sessions(term):
+    start, end = term_bounds(term)
+    return Session.objects.filter(start_time__gte=start, start_time__lt=end)
+
+
+def archivable_terms(today=None):
+    """Terms ended at least ATTENDANCE_ARCHIVE_AFTER_DAYS ago and not archived yet"""
+    today = today or timezone.localdate()
+    cutoff = today - timedelta(days=getattr(settings, 'ATTENDANCE_ARCHIVE_AFTER_DAYS', 30))
+    return Term.objects.filter(archived_at__isnull=True, end_date__lt=cutoff).order_by('start_date')
+
+
+def archive_term(term, batch_size=500):
+    """
+    Move a term's attendance records to the archive table. Sessions not
+    finalized yet are finalized first, so their absences are archived with
+    them. Returns the number of records moved.
+    """
+    for session in term_sessions(term).filter(finalized_at__isnull=True):
+        finalize_session(session)
+
+    quote = connection.ops.quote_name
+    tables = {
+        'archive': quote(ArchivedAttendance._meta.db_table),
+        'attendance': quote(Attendance._meta.db_table),
+    }
+    now = timezone.now()
+    timestamp = connection.ops.adapt_datetimefield_value(now)
+    session_ids = list(term_sessions(term).order_by('id').values_list('id', flat=True))
+    moved = 0
+    for i in range(0, len(session_ids), batch_size):
+        batch = session_ids[i:i + batch_size]
+        sessions = ', '.join(['%s'] * len(batch))
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(ARCHIVE_SQL.format(sessions=sessions, **tables), [term.pk, timestamp, *batch])
+            moved += cursor.rowcount
+            cursor.execute(DELETE_SQL.format(sessions=sessions, **tables), batch)
+            # Raw writes send no signals
+            invalidate_model(Attendance)
+
+    Term.objects.filter(pk=term.pk).update(archived_at=now)
+    term.archived_at = now
+    return moved
+
+
+def records_for_term(term):
+    """
+    The attendance records of a term, from the archive table once it is
+    archived. Both models have the same fields, so callers can filter and
+    project either the same way.
+    """
+    if term.archived_at is not None:
+        return ArchivedAttendance.objects.filter(term=term)
+    start, end = term_bounds(term)
+    # Compare on start_time itself so the (classe, start_time) index applies
+    return Attendance.objects.filter(session__start_time__gte=start, session__start_time__lt=end)
@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import TokenError
+
+from session.models import Session
+from users.authentication import ClaimsJWTAuthentication
+
+from .live import get_broker, session_channel, session_counts
+
+
+def _authenticate(request):
+    """
+    Authenticate with the Authorization header or, since EventSource
+    cannot set headers, a `token` query parameter. Tokens without current
+    claims are checked against the database, so call this off the event
+    loop.
+    """
+    authentication = ClaimsJWTAuthentication()
+    raw_token = request.GET.get('token')
+    if raw_token is None:
+        result = authentication.authenticate(request)
+        return result[0] if result else None
+    validated_token = authentication.get_validated_token(raw_token.encode())
+    return authentication.get_user(validated_token)
+
+
+def _format_event(event, name):
+    return f'event: {name}\ndata: {json.dumps(event)}\n\n'
+
+
+async def _event_stream(session_id, subscription, keepalive):
+    broker = get_broker()
+    try:
+        counts = await sync_to_async(session_counts)([session_id])
+        yield _format_event({'session_id': session_id, 'counts': counts[session_id]}, 'snapshot')
+        while True:
+            try:
+                event = await subscription.get(keepalive)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            if subscription.overflowed:
+                subscription.overflowed = False
+                counts = await sync_to_async(session_counts)([session_id])
+                yield _format_event({'session_id': session_id, 'counts': counts[session_id]}, 'snapshot')
+            yield _format_event(event, event.get('type', 'message'))
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@require_GET
+async def attendance_stream(request, session_id):
+    """
+    Server-Sent Events stream of a session's scans
+    GET /api/attendance/stream/<session_id>/
+
+    Sends a `snapshot` event with the current counts, then a `scans` event
+    with the new scans and running counts whenever records are written.
+    Needs backend/asgi.py; only the session's professor may subscribe.
+    """
+    try:
+        user = await sync_to_async(_authenticate)(request)
+    except (AuthenticationFailed, TokenError):
+        user = None
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    owned = await Session.objects.filter(pk=session_id, professor_id=user.id).aexists()
+    if not owned:
+        return JsonResponse({'error': 'Session not found'}, status=404)
+
+    subscription = get_broker().subscribe(session_channel(session_id))
+    response = StreamingHttpResponse(
+        _event_stream(session_id, subscription, getattr(settings, 'ATTENDANCE_LIVE_KEEPALIVE', 15)),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,247 @@
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from caching.tiered import invalidate_model
+
+from .live import publish_scans
+from .models import Attendance
+from .summary import record_new_attendances, record_status_change
+
+logger = logging.getLogger(__name__)
+
+INSERT_FIELDS = ('session', 'student', 'status', 'scanned_at', 'updated_at')
+
+INSERT_SQL = """
+INSERT INTO {table} ({columns}) {rows}
+ON CONFLICT (session_id, student_id) DO NOTHING
+RETURNING id, session_id, student_id
+"""
+
+
+class ScanBuffer:
+    """
+    Coalesces attendance scans into bulk upserts.
+
+    `submit()` only touches memory: it rejects a (session, student) pair
+    this process has already accepted and queues the rest. A background
+    thread writes the queue every `flush_interval` seconds, or as soon as
+    `max_batch` rows are waiting, with one `INSERT ... ON CONFLICT DO NOTHING`
+    keyed on the (session, student) unique constraint, so replays after a
+    restart or scans handled by another worker are still idempotent. The
+    same transaction folds the rows it inserted into the absence summaries.
+    """
+
+    def __init__(self, flush_interval=0.05, max_batch=500):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending = []
+        self._seen = set()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def submit(self, session_id, student_id, status, scanned_at, background=True):
+        """
+        Queue a scan, returning False if it duplicates an accepted one.
+        With `background=False` the caller is responsible for flushing.
+        """
+        key = (session_id, student_id)
+        with self._lock:
+            if key in self._seen:
+                return False
+            self._seen.add(key)
+            self._pending.append(Attendance(
+                session_id=session_id,
+                student_id=student_id,
+                status=status,
+                scanned_at=scanned_at,
+            ))
+            full = len(self._pending) >= self.max_batch
+        if background:
+            if full:
+                self._wakeup.set()
+            self._ensure_started()
+        return True
+
+    def flush(self):
+        """Write every queued scan; returns the number of rows submitted"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                written = self._write(batch)
+            except Exception:
+                logger.exception('Bulk write of %d attendance scans failed, retrying row by row', len(batch))
+                written = self._write_rows(batch)
+            try:
+                publish_scans(written)
+            except Exception:
+                logger.exception('Failed to publish attendance scans')
+            return len(batch)
+
+    def _write(self, batch):
+        return write_attendances(batch, batch_size=self.max_batch)
+
+    def _write_rows(self, batch):
+        written = []
+        for attendance in batch:
+            try:
+                written.extend(self._write([attendance]))
+            except Exception:
+                logger.exception('Dropping attendance scan %s/%s', attendance.session_id, attendance.student_id)
+                # Let the student scan again
+                with self._lock:
+                    self._seen.discard((attendance.session_id, attendance.student_id))
+        return written
+
+    def forget_session(self, session_id):
+        """Drop the duplicate-detection state of a finished session"""
+        with self._lock:
+            self._seen = {key for key in self._seen if key[0] != session_id}
+
+    def clear(self):
+        """Discard queued scans and duplicate-detection state"""
+        with self._lock:
+            self._pending = []
+            self._seen = set()
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='attendance-flush', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Attendance flush failed')
+            finally:
+                close_old_connections()
+
+
+scan_buffer = ScanBuffer(
+    flush_interval=getattr(settings, 'ATTENDANCE_FLUSH_INTERVAL_MS', 50) / 1000,
+    max_batch=getattr(settings, 'ATTENDANCE_FLUSH_MAX_ROWS', 500),
+)
+
+
+def record_scan(session_id, student_id, status, scanned_at):
+    """
+    Accept a scan for writing. Returns False for a duplicate.
+    With ATTENDANCE_BUFFER_WRITES off the scan is written before returning.
+    """
+    buffered = getattr(settings, 'ATTENDANCE_BUFFER_WRITES', True)
+    accepted = scan_buffer.submit(session_id, student_id, status, scanned_at, background=buffered)
+    if accepted and not buffered:
+        scan_buffer.flush()
+    return accepted
+
+
+def write_attendances(attendances, batch_size=500):
+    """
+    Insert the records whose (session, student) pair is not stored yet and
+    fold them into the absence summaries. Scans landing on an absence the
+    session's auto-close recorded replace it. Returns the records written.
+    """
+    with transaction.atomic():
+        new = insert_attendances(attendances, batch_size=batch_size)
+        record_new_attendances(new)
+        if new:
+            # Raw inserts send no post_save
+            invalidate_model(Attendance)
+        written = {id(attendance) for attendance in new}
+        upgraded = replace_auto_absences([
+            attendance for attendance in attendances if id(attendance) not in written
+        ])
+    return new + upgraded
+
+
+def insert_attendances(attendances, batch_size=500):
+    """
+    Insert the records with `ON CONFLICT DO NOTHING RETURNING`, so only the
+    rows this statement actually stored come back: a pair another worker
+    inserted first, even one committed after our transaction began, is
+    skipped rather than counted twice. Returns the inserted records with
+    their ids set.
+    """
+    if not attendances:
+        return []
+    fields = [Attendance._meta.get_field(name) for name in INSERT_FIELDS]
+    session_field, student_field = fields[:2]
+    now = timezone.now()
+    by_pair = {}
+    for attendance in attendances:
+        attendance.updated_at = now
+        key = (
+            session_field.get_db_prep_save(attendance.session_id, connection),
+            student_field.get_db_prep_save(attendance.student_id, connection),
+        )
+        # A pair repeated in the batch is inserted once, as its first record
+        by_pair.setdefault(key, attendance)
+
+    table = connection.ops.quote_name(Attendance._meta.db_table)
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    batch_size = min(batch_size, connection.ops.bulk_batch_size(fields, attendances))
+    inserted = []
+    with connection.cursor() as cursor:
+        for start in range(0, len(attendances), batch_size):
+            chunk = attendances[start:start + batch_size]
+            rows = 'VALUES ' + ', '.join(['(' + ', '.join(['%s'] * len(fields)) + ')'] * len(chunk))
+            cursor.execute(INSERT_SQL.format(table=table, columns=columns, rows=rows), [
+                field.get_db_prep_save(getattr(attendance, field.attname), connection)
+                for attendance in chunk for field in fields
+            ])
+            for pk, session_id, student_id in cursor.fetchall():
+                attendance = by_pair.pop((session_id, student_id))
+                attendance.id = pk
+                inserted.append(attendance)
+    return inserted
+
+
+def replace_auto_absences(scans):
+    """
+    Turn the absences session.closing recorded for these scans' students
+    into the scanned status, e.g. for offline scans uploaded after the
+    session closed. Those absences carry the session's finalized_at as
+    their scanned_at; absences set by a professor are left alone. Returns
+    the records changed.
+    """
+    if not scans:
+        return []
+    by_pair = {(scan.session_id, scan.student_id): scan for scan in scans}
+    absences = Attendance.objects.filter(
+        session_id__in={scan.session_id for scan in scans},
+        student_id__in={scan.student_id for scan in scans},
+        status=Attendance.statuses.ABSENT,
+        scanned_at=F('session__finalized_at'),
+    )
+    upgraded = []
+    for attendance in absences:
+        scan = by_pair.get((attendance.session_id, attendance.student_id))
+        if scan is None or scan.status == Attendance.statuses.ABSENT:
+            continue
+        attendance.status, attendance.scanned_at = scan.status, scan.scanned_at
+        attendance.save(update_fields=['status', 'scanned_at', 'updated_at'])
+        record_status_change(attendance, Attendance.statuses.ABSENT)
+        upgraded.append(attendance)
+    return upgraded
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Count
+from django.utils.module_loading import import_string
+
+from .models import Attendance
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """A subscriber's bounded queue of events, bound to its event loop"""
+
+    def __init__(self, channel, max_events):
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(max_events)
+        self.overflowed = False
+
+    def deliver(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A slow client gets a resync instead of an unbounded backlog
+            self.overflowed = True
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class InProcessBroker:
+    """
+    Pub/sub within one process. Publishing is thread-safe and never blocks:
+    events are handed to each subscriber's event loop.
+    """
+
+    # Subscribers are all visible to this process
+    local = True
+
+    def __init__(self, max_events=1000):
+        self.max_events = max_events
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        subscription = Subscription(channel, self.max_events)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel, set())
+            subscribers.discard(subscription)
+            if not subscribers:
+                self._subscribers.pop(subscription.channel, None)
+
+    def publish(self, channel, event):
+        self.deliver(channel, event)
+
+    def deliver(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The subscriber's loop has closed
+                self.unsubscribe(subscription)
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+
+class RedisBroker(InProcessBroker):
+    """
+    Fans events out across workers through Redis pub/sub. Each process
+    relays messages from Redis to its local subscribers.
+    Requires the `redis` package and ATTENDANCE_LIVE_REDIS_URL.
+    """
+
+    prefix = 'attendify:live:'
+    local = False
+
+    def __init__(self, max_events=1000):
+        super().__init__(max_events)
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured('RedisBroker requires the redis package')
+        self._redis = redis.Redis.from_url(settings.ATTENDANCE_LIVE_REDIS_URL)
+        self._relay = None
+
+    def subscribe(self, channel):
+        self._ensure_relay()
+        return super().subscribe(channel)
+
+    def publish(self, channel, event):
+        self._redis.publish(f'{self.prefix}{channel}', json.dumps(event))
+
+    def _ensure_relay(self):
+        if self._relay is not None:
+            return
+        with self._lock:
+            if self._relay is None:
+                self._relay = threading.Thread(target=self._run_relay, name='live-relay', daemon=True)
+                self._relay.start()
+
+    def _run_relay(self):
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(f'{self.prefix}*')
+        for message in pubsub.listen():
+            channel = message['channel'].decode()[len(self.prefix):]
+            self.deliver(channel, json.loads(message['data']))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                broker_class = import_string(getattr(
+                    settings, 'ATTENDANCE_LIVE_BROKER', 'attendance.live.InProcessBroker'
+                ))
+                _broker = broker_class()
+    return _broker
+
+
+def session_channel(session_id):
+    return f'session:{session_id}'
+
+
+def session_counts(session_ids):
+    """Return {session_id: {'present': n, 'late': n, 'absent': n}} in one query"""
+    counts = {session_id: {status: 0 for status in Attendance.statuses.values} for session_id in session_ids}
+    rows = Attendance.objects.filter(session_id__in=session_ids).values('session_id', 'status').annotate(n=Count('id'))
+    for row in rows:
+        counts[row['session_id']][row['status']] = row['n']
+    return counts
+
+
+def publish_scans(attendances):
+    """Push scan deltas and running counts to the watchers of each session"""
+    broker = get_broker()
+    by_session = {}
+    for attendance in attendances:
+        by_session.setdefault(attendance.session_id, []).append({
+            'student_id': attendance.student_id,
+            'status': attendance.status,
+            'scanned_at': attendance.scanned_at.isoformat(),
+        })
+    # Other workers' subscribers are invisible, so only local brokers can skip
+    watched = [
+        session_id for session_id in by_session
+        if not broker.local or broker.subscriber_count(session_channel(session_id))
+    ]
+    if not watched:
+        return
+    counts = session_counts(watched)
+    for session_id in watched:
+        broker.publish(session_channel(session_id), {
+            'type': 'scans',
+            'session_id': session_id,
+            'scans': by_session[session_id],
+            'counts': counts[session_id],
+        })
+
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from attendance.archive import archivable_terms, archive_term
+from classes.models import Term
+
+
+class Command(BaseCommand):
+    help = 'Move the attendance records of ended terms to the archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--term', action='append', help='term code to archive (default: every archivable term)')
+        parser.add_argument('--batch-size', type=int, default=500, help='sessions moved per transaction')
+
+    def handle(self, *args, **options):
+        if options['term']:
+            terms = list(Term.objects.filter(code__in=options['term']).order_by('start_date'))
+            unknown = set(options['term']) - {term.code for term in terms}
+            if unknown:
+                raise CommandError(f"Unknown term: {', '.join(sorted(unknown))}")
+            for term in terms:
+                if term.end_date >= timezone.localdate():
+                    raise CommandError(f"Term '{term.code}' has not ended")
+                if term.archived_at is not None:
+                    raise CommandError(f"Term '{term.code}' is already archived")
+        else:
+            terms = list(archivable_terms())
+
+        for term in terms:
+            moved = archive_term(term, batch_size=options['batch_size'])
+            self.stdout.write(f'{term.code}: archived {moved} attendance records')
+        self.stdout.write(self.style.SUCCESS(f'Archived {len(terms)} terms'))
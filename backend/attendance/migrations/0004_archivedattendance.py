@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_attendance_updated_at'),
+        ('classes', '0005_term_archived_at'),
+        ('session', '0004_session_finalized_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAttendance',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('present', 'Present'), ('absent', 'Absent'), ('late', 'Late')], max_length=10)),
+                ('scanned_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField()),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendances', to='session.session')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendances', to=settings.AUTH_USER_MODEL)),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendances', to='classes.term')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', 'session'], name='archived_term_session_idx'), models.Index(fields=['term', 'student'], name='archived_term_student_idx')],
+            },
+        ),
+    ]
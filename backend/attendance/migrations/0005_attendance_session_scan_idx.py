@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0004_archivedattendance'),
+        ('session', '0005_session_prof_start_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['session', 'scanned_at', 'id'], name='attendance_session_scan_idx'),
+        ),
+    ]
@@ -1,3 +1,98 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class Attendance(models.Model):
+
+    class statuses(models.TextChoices):
+        PRESENT = 'present', 'Present'
+        ABSENT = 'absent', 'Absent'
+        LATE = 'late', 'Late'
+
+    session = models.ForeignKey('session.Session', on_delete=models.CASCADE, related_name='attendances')
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='attendances'
+    )
+    status = models.CharField(max_length=10, choices=statuses.choices, default=statuses.PRESENT)
+    scanned_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # One record per student and session; scans are upserted on this key
+            models.UniqueConstraint(fields=['session', 'student'], name='unique_session_student'),
+        ]
+        indexes = [
+            # Delta sync (sync app) walks rows in (updated_at, id) order
+            models.Index(fields=['updated_at', 'id'], name='attendance_updated_idx'),
+            models.Index(fields=['student', 'updated_at', 'id'], name='attendance_student_upd_idx'),
+            # A session's records, paginated in scan order
+            models.Index(fields=['session', 'scanned_at', 'id'], name='attendance_session_scan_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.student} - {self.session} ({self.status})'
+
+
+class ArchivedAttendance(models.Model):
+    """
+    Attendance records of archived terms, moved out of the attendance table
+    by `manage.py archive_attendance` (see attendance.archive) so its rows
+    and indexes only cover the terms still in use. Rows keep their original
+    id and are read-only.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    term = models.ForeignKey('classes.Term', on_delete=models.CASCADE, related_name='archived_attendances')
+    session = models.ForeignKey('session.Session', on_delete=models.CASCADE, related_name='archived_attendances')
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_attendances'
+    )
+    status = models.CharField(max_length=10, choices=Attendance.statuses.choices)
+    scanned_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            # Reports read one term at a time, by session or by student
+            models.Index(fields=['term', 'session'], name='archived_term_session_idx'),
+            models.Index(fields=['term', 'student'], name='archived_term_student_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.student} - {self.session} ({self.status}, archived)'
+
+
+class AbsenceSummary(models.Model):
+    """
+    Running attendance totals per student, class and term, maintained
+    incrementally by attendance writes (see attendance.summary) and rebuilt
+    by `manage.py rebuild_absence_summary`.
+    """
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='absence_summaries'
+    )
+    classe = models.ForeignKey('classes.Class', on_delete=models.CASCADE, related_name='absence_summaries')
+    term = models.ForeignKey('classes.Term', on_delete=models.CASCADE, related_name='absence_summaries')
+    present_count = models.PositiveIntegerField(default=0)
+    late_count = models.PositiveIntegerField(default=0)
+    absent_count = models.PositiveIntegerField(default=0)
+    # Consecutive absences up to the latest recorded session, and the record
+    current_streak = models.PositiveIntegerField(default=0)
+    longest_streak = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'classe', 'term'], name='unique_absence_summary'),
+        ]
+
+    def __str__(self):
+        return f'{self.student} - {self.classe} ({self.term}): {self.absent_count} absences'
@@ -0,0 +1,47 @@
+from rest_framework import serializers
+
+from .models import AbsenceSummary, Attendance
+
+
+class AttendanceSerializer(serializers.ModelSerializer):
+    """Serializer for attendance records"""
+    
+    session_id = serializers.IntegerField(read_only=True)
+    student_id = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = Attendance
+        fields = ['id', 'session_id', 'student_id', 'status', 'scanned_at', 'updated_at']
+        read_only_fields = ['id', 'scanned_at', 'updated_at']
+
+
+class ScanSerializer(serializers.Serializer):
+    """Serializer for a student's attendance scan"""
+    
+    session_id = serializers.IntegerField(required=False)
+    qr_token = serializers.CharField(required=False)
+    status = serializers.ChoiceField(
+        choices=[Attendance.statuses.PRESENT, Attendance.statuses.LATE],
+        default=Attendance.statuses.PRESENT
+    )
+    
+    def validate(self, attrs):
+        """Require a session, either directly or through a QR token"""
+        if 'session_id' not in attrs and 'qr_token' not in attrs:
+            raise serializers.ValidationError({"session_id": "This field is required."})
+        return attrs
+
+
+class AbsenceSummarySerializer(serializers.ModelSerializer):
+    """Serializer for a student's attendance totals in a class and term"""
+    
+    student_id = serializers.IntegerField(read_only=True)
+    class_id = serializers.IntegerField(source='classe_id', read_only=True)
+    term = serializers.CharField(source='term.code', read_only=True)
+    
+    class Meta:
+        model = AbsenceSummary
+        fields = [
+            'student_id', 'class_id', 'term', 'present_count', 'late_count',
+            'absent_count', 'current_streak', 'longest_streak', 'updated_at'
+        ]
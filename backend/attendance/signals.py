@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from session.models import Session
+
+from .ingest import scan_buffer
+
+
+@receiver(post_save, sender=Session)
+def release_closed_session(sender, instance, **kwargs):
+    """Free the in-memory duplicate state of a session once it closes"""
+    if not instance.is_active:
+        scan_buffer.forget_session(instance.pk)
@@ -0,0 +1,163 @@
+from django.db import connection
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from classes.terms import term_id_for
+from session.models import Session
+
+from .models import AbsenceSummary, Attendance
+
+STATUS_COLUMNS = {
+    Attendance.statuses.PRESENT: 'present_count',
+    Attendance.statuses.LATE: 'late_count',
+    Attendance.statuses.ABSENT: 'absent_count',
+}
+
+UPSERT_SQL = """
+INSERT INTO {table} (
+    student_id, classe_id, term_id, present_count, late_count, absent_count,
+    current_streak, longest_streak, updated_at
+) {rows}
+ON CONFLICT (student_id, classe_id, term_id) DO UPDATE SET
+    present_count = {table}.present_count + excluded.present_count,
+    late_count = {table}.late_count + excluded.late_count,
+    absent_count = {table}.absent_count + excluded.absent_count,
+    current_streak = CASE WHEN excluded.absent_count > 0 THEN {table}.current_streak + 1 ELSE 0 END,
+    longest_streak = {greatest}(
+        {table}.longest_streak,
+        CASE WHEN excluded.absent_count > 0 THEN {table}.current_streak + 1 ELSE 0 END
+    ),
+    updated_at = excluded.updated_at
+"""
+
+# Rows per INSERT statement, well under every backend's parameter limit
+CHUNK_SIZE = 100
+
+
+def session_keys(session_ids):
+    """Return {session_id: (classe_id, term_id, start_time)}"""
+    rows = Session.objects.filter(id__in=set(session_ids)).values_list('id', 'classe_id', 'start_time')
+    return {
+        session_id: (classe_id, term_id_for(timezone.localdate(start_time)), start_time)
+        for session_id, classe_id, start_time in rows
+    }
+
+
+def record_new_attendances(attendances):
+    """
+    Fold newly written attendance records into the absence summaries.
+
+    Call inside the transaction that wrote the records. Each record adds
+    one to its status count; absences extend the current streak and any
+    other status resets it, so records are applied in session order. Rows
+    are upserted in multi-row statements, splitting only when the same
+    summary appears twice in a batch.
+    """
+    if not attendances:
+        return
+    keys = session_keys(attendance.session_id for attendance in attendances)
+    attendances = sorted(attendances, key=lambda attendance: keys[attendance.session_id][2])
+
+    now = timezone.now()
+    rounds = []
+    for attendance in attendances:
+        classe_id, term_id, _ = keys[attendance.session_id]
+        key = (attendance.student_id, classe_id, term_id)
+        absent = int(attendance.status == Attendance.statuses.ABSENT)
+        row = key + (
+            int(attendance.status == Attendance.statuses.PRESENT),
+            int(attendance.status == Attendance.statuses.LATE),
+            absent, absent, absent, now,
+        )
+        # A summary may only be touched once per statement
+        for keys_in_round, rows in rounds:
+            if key not in keys_in_round and len(rows) < CHUNK_SIZE:
+                break
+        else:
+            keys_in_round, rows = set(), []
+            rounds.append((keys_in_round, rows))
+        keys_in_round.add(key)
+        rows.append(row)
+
+    for _, rows in rounds:
+        values = 'VALUES ' + ', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s)'] * len(rows))
+        upsert_summaries(values, [value for row in rows for value in row])
+
+
+def upsert_summaries(rows, params):
+    """
+    Add `rows` to the summaries: a VALUES list or a SELECT yielding
+    (student, class, term, present, late, absent, absent, absent, time).
+    Each summary may appear only once. Returns the rows upserted.
+    """
+    table = connection.ops.quote_name(AbsenceSummary._meta.db_table)
+    greatest = 'MAX' if connection.vendor == 'sqlite' else 'GREATEST'
+    with connection.cursor() as cursor:
+        cursor.execute(UPSERT_SQL.format(table=table, rows=rows, greatest=greatest), params)
+        return cursor.rowcount
+
+
+def record_status_change(attendance, old_status):
+    """
+    Move a corrected record between status counts, creating the summary if
+    it is missing. The old count never drops below zero, should it have
+    drifted. Streaks are left as they are; `rebuild_absence_summary`
+    recomputes them exactly.
+    """
+    if old_status == attendance.status:
+        return
+    classe_id, term_id, _ = session_keys([attendance.session_id])[attendance.session_id]
+    old_column, new_column = STATUS_COLUMNS[old_status], STATUS_COLUMNS[attendance.status]
+    now = timezone.now()
+    updated = AbsenceSummary.objects.filter(
+        student_id=attendance.student_id, classe_id=classe_id, term_id=term_id
+    ).update(**{
+        old_column: Greatest(F(old_column) - 1, 0),
+        new_column: F(new_column) + 1,
+        'updated_at': now,
+    })
+    if not updated:
+        absent = int(attendance.status == Attendance.statuses.ABSENT)
+        upsert_summaries('VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)', [
+            attendance.student_id, classe_id, term_id,
+            int(attendance.status == Attendance.statuses.PRESENT),
+            int(attendance.status == Attendance.statuses.LATE),
+            absent, absent, absent, now,
+        ])
+
+
+def rebuild_summaries(batch_size=2000):
+    """
+    Recompute every summary from the attendance table; those of archived
+    terms, whose records have moved out of it, are kept as they are.
+    Records are streamed in (student, class, session start) order so only
+    the summary being built is held in memory. Returns the number written.
+    """
+    AbsenceSummary.objects.filter(term__archived_at__isnull=True).delete()
+    records = Attendance.objects.order_by(
+        'student_id', 'session__classe_id', 'session__start_time'
+    ).values_list('student_id', 'session__classe_id', 'session__start_time', 'status')
+
+    summaries = []
+    written = 0
+    current_key, summary = None, None
+    for student_id, classe_id, start_time, status in records.iterator(chunk_size=batch_size):
+        key = (student_id, classe_id, term_id_for(timezone.localdate(start_time)))
+        if key != current_key:
+            current_key = key
+            summary = AbsenceSummary(student_id=student_id, classe_id=classe_id, term_id=key[2])
+            summaries.append(summary)
+        setattr(summary, STATUS_COLUMNS[status], getattr(summary, STATUS_COLUMNS[status]) + 1)
+        if status == Attendance.statuses.ABSENT:
+            summary.current_streak += 1
+            summary.longest_streak = max(summary.longest_streak, summary.current_streak)
+        else:
+            summary.current_streak = 0
+        if len(summaries) > batch_size:
+            # Keep the summary still being accumulated
+            AbsenceSummary.objects.bulk_create(summaries[:-1])
+            written += len(summaries) - 1
+            summaries = summaries[-1:]
+    AbsenceSummary.objects.bulk_create(summaries)
+    return written + len(summaries)
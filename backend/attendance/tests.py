@@ -1,3 +1,588 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+from datetime import date, datetime, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend.testing import Grower, QueryBudgetMixin, bulk_users
+from classes.models import Class, Enrollment, Term
+from classes.roster import enroll_students, is_enrolled
+from classes.terms import clear_term_cache, term_id_for
+from exports.datasets import build_export
+from session.models import Session
+from session.qr import qr_tokens
+from sync.models import Tombstone
+from users.tokens import ClaimsRefreshToken
+
+from .archive import archive_term
+from .ingest import ScanBuffer, scan_buffer, write_attendances
+from .live import InProcessBroker, publish_scans
+from .models import AbsenceSummary, ArchivedAttendance, Attendance
+from .summary import record_status_change
+
+User = get_user_model()
+
+
+def create_session(**kwargs):
+    professor = User.objects.create_user(
+        username='professor',
+        email='prof@example.com',
+        password='ProfPass123!',
+        role=User.roles.PROFESOR
+    )
+    classe = Class.objects.create(name='Algorithms', code='ALG101', professor=professor)
+    return Session.objects.create(classe=classe, professor=professor, **kwargs)
+
+
+def create_students(count, prefix='student'):
+    return [
+        User.objects.create_user(
+            username=f'{prefix}{i}',
+            email=f'{prefix}{i}@example.com',
+            role=User.roles.STUDENT
+        )
+        for i in range(count)
+    ]
+
+
+class ScanBufferTest(TestCase):
+    """Test cases for the attendance write buffer"""
+    
+    def setUp(self):
+        clear_term_cache()
+        self.session = create_session()
+        self.students = create_students(3)
+        self.buffer = ScanBuffer()
+    
+    def submit(self, student, scanned_at):
+        # Flush explicitly instead of from the background thread
+        return self.buffer.submit(self.session.id, student.id, 'present', scanned_at, background=False)
+    
+    def test_duplicate_scans_rejected_in_memory(self):
+        """Test a second scan for the same student is refused without queries"""
+        now = timezone.now()
+        with self.assertNumQueries(0):
+            self.assertTrue(self.submit(self.students[0], now))
+            self.assertFalse(self.submit(self.students[0], now))
+        self.assertEqual(self.buffer.pending(), 1)
+    
+    def test_flush_cost_independent_of_batch_size(self):
+        """Test a flush issues the same statements for 1 or many scans"""
+        now = timezone.now()
+        students = create_students(27, prefix='other')
+        # Create the term and cache the term list beforehand
+        term_id_for(timezone.localdate(now))
+        term_id_for(timezone.localdate(now))
+        self.submit(self.students[0], now)
+        self.buffer.flush()
+        self.submit(self.students[1], now)
+        with CaptureQueriesContext(connection) as single:
+            self.buffer.flush()
+        for student in students:
+            self.submit(student, now)
+        with CaptureQueriesContext(connection) as many:
+            self.assertEqual(self.buffer.flush(), 27)
+        self.assertEqual(len(single), len(many))
+        self.assertEqual(Attendance.objects.filter(session=self.session).count(), 29)
+        self.assertEqual(self.buffer.pending(), 0)
+    
+    def test_flush_is_idempotent(self):
+        """Test scans already stored by another worker are ignored"""
+        now = timezone.now()
+        Attendance.objects.create(session=self.session, student=self.students[0], status='late')
+        self.submit(self.students[0], now)
+        self.buffer.flush()
+        self.assertEqual(Attendance.objects.get(student=self.students[0]).status, 'late')
+    
+    def test_forget_session(self):
+        """Test a finished session's duplicate state is released"""
+        now = timezone.now()
+        self.submit(self.students[0], now)
+        self.buffer.forget_session(self.session.id)
+        self.assertTrue(self.submit(self.students[0], now))
+
+
+@override_settings(ATTENDANCE_BUFFER_WRITES=False)
+class AttendanceScanTest(APITestCase):
+    """Test cases for the attendance scan endpoint"""
+    
+    def setUp(self):
+        cache.clear()
+        clear_term_cache()
+        scan_buffer.clear()
+        self.url = '/api/attendance/'
+        self.session = create_session()
+        self.student = create_students(1)[0]
+        Enrollment.objects.create(classe=self.session.classe, student=self.student)
+        self.authenticate(self.student)
+    
+    def authenticate(self, user):
+        token = ClaimsRefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    
+    def test_scan_accepted(self):
+        """Test a student's scan is acknowledged and stored"""
+        response = self.client.post(self.url, {'session_id': self.session.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'present')
+        self.assertTrue(Attendance.objects.filter(session=self.session, student=self.student).exists())
+    
+    def test_duplicate_scan_rejected(self):
+        """Test scanning twice is rejected"""
+        self.client.post(self.url, {'session_id': self.session.id}, format='json')
+        response = self.client.post(self.url, {'session_id': self.session.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+    
+    def test_scan_closed_session(self):
+        """Test scans for inactive or expired sessions are refused"""
+        expired = Session.objects.create(
+            classe=self.session.classe,
+            professor=self.session.professor,
+            start_time=timezone.now() - timedelta(hours=1)
+        )
+        response = self.client.post(self.url, {'session_id': expired.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_scan_requires_student(self):
+        """Test professors cannot record scans"""
+        self.authenticate(self.session.professor)
+        response = self.client.post(self.url, {'session_id': self.session.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+    
+    def test_list_session_attendance(self):
+        """Test listing the records of a session"""
+        self.client.post(self.url, {'session_id': self.session.id}, format='json')
+        self.authenticate(self.session.professor)
+        response = self.client.get(self.url, {'session_id': self.session.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['attendance']), 1)
+        self.assertEqual(response.data['attendance'][0]['student_id'], self.student.id)
+    
+    def test_list_paginated(self):
+        """Test records are listed in scan order, a page at a time"""
+        students = create_students(3, prefix='other')
+        Attendance.objects.bulk_create([
+            Attendance(session=self.session, student=student, scanned_at=timezone.now() - timedelta(minutes=i))
+            for i, student in enumerate(students)
+        ])
+        self.authenticate(self.session.professor)
+        response = self.client.get(self.url, {'session_id': self.session.id, 'page_size': 2})
+        ids = [record['student_id'] for record in response.data['attendance']]
+        response = self.client.get(response.data['next'])
+        ids += [record['student_id'] for record in response.data['attendance']]
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(ids, [student.id for student in reversed(students)])
+    
+    def test_list_rejects_malformed_ids(self):
+        """Test non-integer id filters are a 400, not a server error"""
+        self.authenticate(self.session.professor)
+        for params in ({'session_id': 'abc'}, {'student_id': '1;'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_professor_scoped_to_own_sessions(self):
+        """Test professors can neither list nor correct records of other professors' sessions"""
+        attendance = Attendance.objects.create(session=self.session, student=self.student)
+        other = User.objects.create_user(
+            username='other', email='other@example.com', password='ProfPass123!', role=User.roles.PROFESOR
+        )
+        self.authenticate(other)
+        response = self.client.get(self.url, {'session_id': self.session.id})
+        self.assertEqual(response.data['attendance'], [])
+        response = self.client.patch(f'{self.url}{attendance.id}/', {'status': 'absent'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        attendance.refresh_from_db()
+        self.assertEqual(attendance.status, Attendance.statuses.PRESENT)
+    
+    def test_scan_with_qr_token(self):
+        """Test a scan carrying a QR token is attributed to its session"""
+        response = self.client.post(self.url, {'qr_token': qr_tokens.issue(self.session.id)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['session_id'], self.session.id)
+    
+    def test_scan_with_invalid_qr_token(self):
+        """Test forged QR tokens are rejected without queries"""
+        token = qr_tokens.issue(self.session.id)[:-2] + 'xx'
+        with self.assertNumQueries(0):
+            response = self.client.post(self.url, {'qr_token': token}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_scan_requires_enrollment(self):
+        """Test students outside the class roster cannot scan"""
+        outsider = create_students(1, prefix='outsider')[0]
+        self.authenticate(outsider)
+        response = self.client.post(self.url, {'session_id': self.session.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        Enrollment.objects.create(classe=self.session.classe, student=outsider)
+        response = self.client.post(self.url, {'session_id': self.session.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+    
+    @override_settings(ATTENDANCE_REQUIRE_ENROLLMENT=False)
+    def test_enrollment_check_optional(self):
+        """Test deployments still importing rosters can accept any student"""
+        outsider = create_students(1, prefix='outsider')[0]
+        self.authenticate(outsider)
+        response = self.client.post(self.url, {'session_id': self.session.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+    
+    def test_enrollment_check_cached(self):
+        """Test the roster loaded when a session opens answers scans without queries"""
+        self.session.save()
+        with self.assertNumQueries(0):
+            self.assertTrue(is_enrolled(self.session.classe_id, self.student.id))
+    
+    @override_settings(ATTENDANCE_REQUIRE_QR_TOKEN=True)
+    def test_scan_requires_qr_token(self):
+        """Test bare session ids are refused when QR tokens are required"""
+        response = self.client.post(self.url, {'session_id': self.session.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('qr_token', response.data)
+
+
+class InProcessBrokerTest(SimpleTestCase):
+    """Test cases for the in-process pub/sub broker"""
+    
+    async def test_publish_from_another_thread(self):
+        """Test events published by the flush thread reach async subscribers"""
+        broker = InProcessBroker()
+        subscription = broker.subscribe('session:1')
+        thread = threading.Thread(target=broker.publish, args=('session:1', {'type': 'scans'}))
+        thread.start()
+        thread.join()
+        self.assertEqual(await subscription.get(1), {'type': 'scans'})
+        broker.unsubscribe(subscription)
+        self.assertEqual(broker.subscriber_count('session:1'), 0)
+    
+    async def test_slow_subscriber_overflows(self):
+        """Test a full subscriber queue is flagged instead of growing"""
+        broker = InProcessBroker(max_events=1)
+        subscription = broker.subscribe('session:1')
+        broker.publish('session:1', {'n': 1})
+        broker.publish('session:1', {'n': 2})
+        await asyncio.sleep(0)
+        self.assertTrue(subscription.overflowed)
+        self.assertEqual(subscription.queue.qsize(), 1)
+
+
+class AttendanceStreamTest(TestCase):
+    """Test cases for the live attendance stream"""
+    
+    def setUp(self):
+        clear_term_cache()
+        self.session = create_session()
+        self.student = create_students(1)[0]
+        token = ClaimsRefreshToken.for_user(self.session.professor).access_token
+        self.url = f'/api/attendance/stream/{self.session.id}/?token={token}'
+    
+    async def read_event(self, stream):
+        chunk = await asyncio.wait_for(anext(stream), 5)
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        name, data = chunk.strip().split('\n')
+        return name[len('event: '):], json.loads(data[len('data: '):])
+    
+    async def test_stream_pushes_scans(self):
+        """Test watchers get a snapshot followed by scan deltas"""
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        name, event = await self.read_event(stream)
+        self.assertEqual(name, 'snapshot')
+        self.assertEqual(event['counts']['present'], 0)
+        
+        attendance = await Attendance.objects.acreate(session=self.session, student=self.student)
+        await sync_to_async(publish_scans)([attendance])
+        name, event = await self.read_event(stream)
+        self.assertEqual(name, 'scans')
+        self.assertEqual(event['scans'][0]['student_id'], self.student.id)
+        self.assertEqual(event['counts']['present'], 1)
+        await stream.aclose()
+    
+    async def test_stream_requires_session_professor(self):
+        """Test students cannot watch a session"""
+        token = ClaimsRefreshToken.for_user(self.student).access_token
+        response = await self.async_client.get(f'/api/attendance/stream/{self.session.id}/?token={token}')
+        self.assertEqual(response.status_code, 404)
+        response = await self.async_client.get(f'/api/attendance/stream/{self.session.id}/')
+        self.assertEqual(response.status_code, 401)
+    
+    async def test_stream_accepts_legacy_token(self):
+        """Test a token without role claims is checked against the database off the event loop"""
+        await sync_to_async(cache.clear)()
+        token = AccessToken.for_user(self.session.professor)
+        response = await self.async_client.get(f'/api/attendance/stream/{self.session.id}/?token={token}')
+        self.assertEqual(response.status_code, 200)
+        await aiter(response.streaming_content).aclose()
+
+
+class AbsenceSummaryTest(APITestCase):
+    """Test cases for the incrementally maintained absence summaries"""
+    
+    def setUp(self):
+        clear_term_cache()
+        self.first = create_session(start_time=timezone.now() - timedelta(days=3))
+        self.classe, self.professor = self.first.classe, self.first.professor
+        self.sessions = [self.first] + [
+            Session.objects.create(
+                classe=self.classe,
+                professor=self.professor,
+                start_time=timezone.now() - timedelta(days=days)
+            )
+            for days in (2, 1)
+        ]
+        self.student = create_students(1)[0]
+        self.buffer = ScanBuffer()
+    
+    def record(self, session, status):
+        self.buffer.submit(session.id, self.student.id, status, session.start_time, background=False)
+        self.buffer.flush()
+    
+    def summary(self):
+        return AbsenceSummary.objects.get(student=self.student, classe=self.classe)
+    
+    def test_counts_and_streaks(self):
+        """Test writes update counts and consecutive absence streaks"""
+        self.record(self.sessions[0], 'absent')
+        self.record(self.sessions[1], 'absent')
+        summary = self.summary()
+        self.assertEqual((summary.absent_count, summary.current_streak, summary.longest_streak), (2, 2, 2))
+        self.record(self.sessions[2], 'present')
+        summary = self.summary()
+        self.assertEqual((summary.present_count, summary.current_streak, summary.longest_streak), (1, 0, 2))
+    
+    def test_duplicates_not_counted(self):
+        """Test a scan already stored is not counted twice"""
+        self.record(self.sessions[0], 'present')
+        self.buffer.clear()
+        self.record(self.sessions[0], 'present')
+        self.assertEqual(self.summary().present_count, 1)
+    
+    def test_lost_insert_race_not_counted(self):
+        """Test a scan two workers both accepted is counted and published once"""
+        session = self.sessions[0]
+        other = ScanBuffer()
+        for buffer in (self.buffer, other):
+            self.assertTrue(buffer.submit(session.id, self.student.id, 'present', session.start_time, background=False))
+        with mock.patch('attendance.ingest.publish_scans') as publish:
+            self.buffer.flush()
+            other.flush()
+        published = [attendance for call in publish.call_args_list for attendance in call.args[0]]
+        self.assertEqual(len(published), 1)
+        self.assertEqual(published[0].id, Attendance.objects.get(student=self.student).id)
+        self.assertEqual(self.summary().present_count, 1)
+    
+    def test_repeated_pair_in_batch_counted_once(self):
+        """Test a pair appearing twice in one write is inserted and counted once"""
+        session = self.sessions[0]
+        written = write_attendances([
+            Attendance(session=session, student=self.student, status='present', scanned_at=session.start_time)
+            for _ in range(2)
+        ])
+        self.assertEqual(len(written), 1)
+        self.assertEqual(self.summary().present_count, 1)
+    
+    def test_correction_moves_count(self):
+        """Test correcting a record adjusts the summary"""
+        self.record(self.sessions[0], 'absent')
+        attendance = Attendance.objects.get(student=self.student)
+        token = ClaimsRefreshToken.for_user(self.professor).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.patch(f'/api/attendance/{attendance.id}/', {'status': 'late'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        summary = self.summary()
+        self.assertEqual((summary.absent_count, summary.late_count), (0, 1))
+    
+    def test_correction_without_summary(self):
+        """Test a correction creates a missing summary and never counts below zero"""
+        self.record(self.sessions[0], 'absent')
+        AbsenceSummary.objects.update(absent_count=0)
+        attendance = Attendance.objects.get(student=self.student)
+        attendance.status = Attendance.statuses.LATE
+        record_status_change(attendance, Attendance.statuses.ABSENT)
+        summary = self.summary()
+        self.assertEqual((summary.absent_count, summary.late_count), (0, 1))
+        
+        AbsenceSummary.objects.all().delete()
+        attendance.status = Attendance.statuses.PRESENT
+        record_status_change(attendance, Attendance.statuses.LATE)
+        summary = self.summary()
+        self.assertEqual((summary.present_count, summary.late_count), (1, 0))
+    
+    def test_absences_rejects_malformed_ids(self):
+        """Test non-integer filters of the absences endpoint are a 400"""
+        token = ClaimsRefreshToken.for_user(self.professor).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        for params in ({'student_id': 'abc'}, {'class_id': 'x'}):
+            response = self.client.get('/api/attendance/absences/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_absences_endpoint(self):
+        """Test a student's totals are read in a constant number of queries"""
+        for session in self.sessions:
+            self.record(session, 'absent')
+        token = ClaimsRefreshToken.for_user(self.student).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/attendance/absences/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['absences'][0]['absent_count'], 3)
+        self.assertEqual(response.data['absences'][0]['class_id'], self.classe.id)
+    
+    def test_absences_scoped_to_professor_classes(self):
+        """Test professors only read the totals of the classes they teach"""
+        self.record(self.sessions[0], 'absent')
+        other = User.objects.create_user(
+            username='other_professor',
+            email='other@example.com',
+            role=User.roles.PROFESOR
+        )
+        token = ClaimsRefreshToken.for_user(other).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.get(f'/api/attendance/absences/?student_id={self.student.id}')
+        self.assertEqual(response.data['absences'], [])
+        token = ClaimsRefreshToken.for_user(self.professor).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.get(f'/api/attendance/absences/?student_id={self.student.id}')
+        self.assertEqual(len(response.data['absences']), 1)
+    
+    def test_rebuild_matches_incremental(self):
+        """Test the rebuild command reproduces the incremental summaries"""
+        for session, status_ in zip(self.sessions, ['absent', 'absent', 'late']):
+            self.record(session, status_)
+        expected = AbsenceSummary.objects.values(
+            'student_id', 'classe_id', 'term_id', 'present_count', 'late_count',
+            'absent_count', 'current_streak', 'longest_streak'
+        ).get()
+        AbsenceSummary.objects.update(absent_count=0, longest_streak=0)
+        call_command('rebuild_absence_summary', stdout=StringIO())
+        rebuilt = AbsenceSummary.objects.values(*expected).get()
+        self.assertEqual(rebuilt, expected)
+
+
+class AttendanceArchiveTest(TestCase):
+    """Test cases for moving ended terms to the archive table"""
+    
+    def setUp(self):
+        clear_term_cache()
+        self.old_term = Term.objects.create(code='2025-S1', start_date=date(2025, 1, 1), end_date=date(2025, 6, 30))
+        today = timezone.localdate()
+        self.current_term = Term.objects.create(
+            code='current', start_date=today - timedelta(days=30), end_date=today + timedelta(days=30)
+        )
+        self.old_session = create_session(start_time=timezone.make_aware(datetime(2025, 3, 10, 10)))
+        self.classe = self.old_session.classe
+        self.session = Session.objects.create(
+            classe=self.classe, professor=self.old_session.professor, start_time=timezone.now() - timedelta(hours=1)
+        )
+        self.students = create_students(3)
+        enroll_students(self.classe.id, [student.id for student in self.students])
+        write_attendances([
+            Attendance(session=self.old_session, student=student, scanned_at=self.old_session.start_time)
+            for student in self.students[:2]
+        ] + [Attendance(session=self.session, student=self.students[0])])
+    
+    def test_archive_moves_ended_terms(self):
+        """Test records of ended terms leave the attendance table with their ids"""
+        old_ids = set(Attendance.objects.filter(session=self.old_session).values_list('id', flat=True))
+        call_command('archive_attendance', stdout=StringIO())
+        self.assertEqual(list(Attendance.objects.values_list('session_id', flat=True)), [self.session.id])
+        archived = ArchivedAttendance.objects.filter(term=self.old_term)
+        # The unfinalized session's absentee is recorded before archiving
+        self.assertEqual(archived.count(), 3)
+        self.assertTrue(old_ids < set(archived.values_list('id', flat=True)))
+        self.assertEqual(archived.filter(status=Attendance.statuses.ABSENT).get().student, self.students[2])
+        self.old_term.refresh_from_db()
+        self.current_term.refresh_from_db()
+        self.assertIsNotNone(self.old_term.archived_at)
+        self.assertIsNone(self.current_term.archived_at)
+    
+    def test_archive_records_no_deletions(self):
+        """Test archived records are not reported to syncing clients as deleted"""
+        call_command('archive_attendance', stdout=StringIO())
+        self.assertFalse(Tombstone.objects.exists())
+    
+    def test_archive_resumes(self):
+        """Test archiving a term again moves only what is left"""
+        self.assertEqual(archive_term(self.old_term), 3)
+        self.assertEqual(archive_term(self.old_term), 0)
+        self.assertEqual(ArchivedAttendance.objects.count(), 3)
+    
+    def test_archived_term_exported(self):
+        """Test reports on an archived term read the archive"""
+        call_command('archive_attendance', stdout=StringIO())
+        headers, rows = build_export('attendance', {'term': '2025-S1', 'class_id': self.classe.id})
+        rows = list(rows)
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0][headers.index('class')], 'ALG101')
+        _, rows = build_export('attendance', {})
+        self.assertEqual(len(list(rows)), 1)
+    
+    def test_rebuild_keeps_archived_summaries(self):
+        """Test rebuilding summaries keeps those of archived terms"""
+        call_command('archive_attendance', stdout=StringIO())
+        call_command('rebuild_absence_summary', stdout=StringIO())
+        summary = AbsenceSummary.objects.get(student=self.students[2], term=self.old_term)
+        self.assertEqual(summary.absent_count, 1)
+        self.assertTrue(AbsenceSummary.objects.filter(term=self.current_term).exists())
+    
+    def test_open_term_refused(self):
+        """Test a term that has not ended cannot be archived"""
+        with self.assertRaises(CommandError):
+            call_command('archive_attendance', term=['current'], stdout=StringIO())
+        self.assertEqual(Attendance.objects.count(), 3)
+
+
+class AttendanceQueryBudgetTest(QueryBudgetMixin, APITestCase):
+    """Query and latency budgets of the attendance endpoints as scans pile up"""
+    
+    def setUp(self):
+        clear_term_cache()
+        self.session = create_session(is_active=False)
+        self.student = User.objects.create_user(
+            username='student',
+            email='student@example.com',
+            role=User.roles.STUDENT
+        )
+        Attendance.objects.create(session=self.session, student=self.student)
+        admin = User.objects.create_user(
+            username='admin',
+            email='admin@example.com',
+            role=User.roles.ADMIN
+        )
+        self.grow = Grower(self.create_attendances)
+        self.login(admin)
+    
+    def login(self, user):
+        token = ClaimsRefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    
+    def create_attendances(self, start, count):
+        students = bulk_users(count, prefix='student', start=start)
+        Attendance.objects.bulk_create([
+            Attendance(session=self.session, student=student) for student in students
+        ])
+    
+    def test_session_attendance_budget(self):
+        """Test listing a session's attendance runs a fixed number of queries"""
+        self.assertQueryBudget(
+            f'/api/attendance/?session_id={self.session.id}', self.grow,
+            max_queries=1, max_ms=250
+        )
+    
+    def test_student_attendance_budget(self):
+        """Test a student's own attendance does not depend on other students"""
+        self.login(self.student)
+        self.assertQueryBudget('/api/attendance/', self.grow, max_queries=1, max_ms=250)
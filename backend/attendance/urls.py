@@ -0,0 +1,11 @@
+from django.urls import path
+from .async_views import attendance_stream
+from .views import AbsenceSummaryView, AttendanceListView, AttendanceDetailView
+
+
+urlpatterns = [
+    path('', AttendanceListView.as_view(), name='attendance-list'),
+    path('absences/', AbsenceSummaryView.as_view(), name='absence-summary'),
+    path('<int:pk>/', AttendanceDetailView.as_view(), name='attendance-detail'),
+    path('stream/<int:session_id>/', attendance_stream, name='attendance-stream'),
+]
@@ -1,3 +1,174 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
-# Create your views here.
+from backend.pagination import KeysetPagination
+from classes.roster import is_enrolled
+from session.cache import get_open_session
+from session.qr import QrTokenError, qr_tokens
+from users.permissions import IsProfessor, IsStudent
+
+from .ingest import record_scan
+from .live import publish_scans
+from .models import AbsenceSummary, Attendance
+from .serializers import AbsenceSummarySerializer, AttendanceSerializer, ScanSerializer
+from .summary import record_status_change
+
+
+def scoped_attendance(user):
+    """The records a user may read: a student's own, a professor's sessions', all for admins"""
+    queryset = Attendance.objects.all()
+    if user.role == 'STUDENT':
+        return queryset.filter(student_id=user.id)
+    if user.role == 'PROFESSOR':
+        return queryset.filter(session__professor_id=user.id)
+    return queryset
+
+
+def id_param(params, name):
+    """An id query parameter, None when absent; a malformed one is a 400"""
+    value = params.get(name)
+    if not value:
+        return None
+    if not value.isdigit():
+        raise ValidationError({'error': f'{name} must be an integer'})
+    return int(value)
+
+
+class AttendancePagination(KeysetPagination):
+    ordering = ('scanned_at', 'id')
+    results_key = 'attendance'
+
+
+class AttendanceListView(generics.ListCreateAPIView):
+    """
+    API endpoint for attendance records
+    GET /api/attendance/?session_id=&student_id=&cursor=&page_size= - List
+        attendance records a page at a time: a student's own, the records
+        of a professor's sessions, or any for admins
+    POST /api/attendance/ - Record the current student's scan, identified
+        by `qr_token` (issued by /api/sessions/<id>/qr/) or `session_id`
+    """
+    serializer_class = AttendanceSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = AttendancePagination
+    
+    def get_permissions(self):
+        if self.request.method == 'POST':
+            return [IsAuthenticated(), IsStudent()]
+        return super().get_permissions()
+    
+    def get_queryset(self):
+        queryset = scoped_attendance(self.request.user)
+        session_id = id_param(self.request.query_params, 'session_id')
+        if session_id is not None:
+            queryset = queryset.filter(session_id=session_id)
+        student_id = id_param(self.request.query_params, 'student_id')
+        if student_id is not None:
+            queryset = queryset.filter(student_id=student_id)
+        return queryset
+    
+    def create(self, request, *args, **kwargs):
+        serializer = ScanSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        qr_token = serializer.validated_data.get('qr_token')
+        if qr_token:
+            # Signature, expiry and replay checks run before any ORM work
+            try:
+                session_id = qr_tokens.verify(qr_token, scanner_id=request.user.id)
+            except QrTokenError as e:
+                return Response({
+                    'error': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+        elif getattr(settings, 'ATTENDANCE_REQUIRE_QR_TOKEN', False):
+            return Response({
+                'qr_token': ['This field is required.']
+            }, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            session_id = serializer.validated_data['session_id']
+        scanned_at = timezone.now()
+        
+        window = get_open_session(session_id)
+        if window is None or not window[0] <= scanned_at <= window[1]:
+            return Response({
+                'error': 'Session is not open for attendance'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if getattr(settings, 'ATTENDANCE_REQUIRE_ENROLLMENT', True) and not is_enrolled(window[2], request.user.id):
+            return Response({
+                'error': 'You are not enrolled in this class'
+            }, status=status.HTTP_403_FORBIDDEN)
+        
+        if not record_scan(session_id, request.user.id, serializer.validated_data['status'], scanned_at):
+            return Response({
+                'error': 'Attendance already recorded for this session'
+            }, status=status.HTTP_409_CONFLICT)
+        
+        # The write is coalesced with other scans and happens shortly after
+        return Response({
+            'message': 'Attendance recorded',
+            'session_id': session_id,
+            'student_id': request.user.id,
+            'status': serializer.validated_data['status'],
+            'scanned_at': scanned_at
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class AttendanceDetailView(generics.RetrieveUpdateAPIView):
+    """
+    API endpoint for correcting an attendance record
+    GET/PATCH /api/attendance/<id>/ - Records of the professor's own sessions
+    """
+    serializer_class = AttendanceSerializer
+    permission_classes = [IsAuthenticated, IsProfessor]
+    
+    def get_queryset(self):
+        return scoped_attendance(self.request.user)
+    
+    def perform_update(self, serializer):
+        old_status = serializer.instance.status
+        with transaction.atomic():
+            attendance = serializer.save()
+            record_status_change(attendance, old_status)
+        publish_scans([attendance])
+
+
+class AbsenceSummaryPagination(KeysetPagination):
+    ordering = ('id',)
+    results_key = 'absences'
+
+
+class AbsenceSummaryView(generics.ListAPIView):
+    """
+    API endpoint for per-class absence totals
+    GET /api/attendance/absences/?student_id=&class_id=&term=&cursor=&page_size=
+    
+    Reads the incrementally maintained summary rows, so the cost does not
+    depend on how many sessions a term has. Students only see their own
+    and professors those of the classes they teach.
+    """
+    serializer_class = AbsenceSummarySerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = AbsenceSummaryPagination
+    
+    def get_queryset(self):
+        queryset = AbsenceSummary.objects.select_related('term')
+        params = self.request.query_params
+        user = self.request.user
+        if user.role == 'STUDENT':
+            queryset = queryset.filter(student_id=user.id)
+        elif user.role == 'PROFESSOR':
+            queryset = queryset.filter(classe__professor_id=user.id)
+        student_id = id_param(params, 'student_id')
+        if user.role != 'STUDENT' and student_id is not None:
+            queryset = queryset.filter(student_id=student_id)
+        class_id = id_param(params, 'class_id')
+        if class_id is not None:
+            queryset = queryset.filter(classe_id=class_id)
+        if params.get('term'):
+            queryset = queryset.filter(term__code=params['term'])
+        return queryset
@@ -3,6 +3,10 @@ ASGI config for backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Async views such as the login endpoint in users.async_views and the live
+attendance stream in attendance.async_views only run on the event loop when
+served through this entry point, e.g. ``uvicorn backend.asgi:application``.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
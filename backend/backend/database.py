@@ -0,0 +1,108 @@
+"""
+Database settings read from the environment.
+
+    DB_ENGINE               sqlite (default) or postgresql
+    DB_NAME                 database name, or SQLite file (default db.sqlite3)
+    DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+    DB_CONN_MAX_AGE         seconds a connection is reused across requests
+                            (default 60, 0 closes it after every request)
+    DB_CONN_HEALTH_CHECKS   ping reused connections first (default on)
+
+PostgreSQL only:
+
+    DB_POOL                 use psycopg's connection pool (needs psycopg[pool])
+                            instead of one persistent connection per thread
+    DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT
+    DB_DISABLE_SERVER_SIDE_CURSORS
+                            set behind PgBouncer in transaction pooling mode
+
+SQLite only:
+
+    SQLITE_BUSY_TIMEOUT     milliseconds a writer waits for the lock (5000)
+    SQLITE_MMAP_SIZE        bytes of the file read through mmap (128 MiB)
+"""
+import os
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+
+def env_bool(env, name, default=False):
+    value = env.get(name)
+    if value is None or value == '':
+        return default
+    return value.lower() in TRUE_VALUES
+
+
+def env_int(env, name, default):
+    value = env.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+def sqlite_init_command(busy_timeout=5000, mmap_size=128 * 1024 * 1024):
+    """
+    PRAGMAs run on every new SQLite connection. WAL lets readers proceed
+    while a scan flush writes, synchronous=NORMAL is durable in WAL mode
+    without an fsync per commit, and busy_timeout makes writers wait for
+    the lock instead of failing with "database is locked".
+    """
+    return ';'.join([
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        f'PRAGMA busy_timeout={busy_timeout}',
+        f'PRAGMA mmap_size={mmap_size}',
+        'PRAGMA temp_store=MEMORY',
+    ])
+
+
+def sqlite_config(env, base_dir):
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': env.get('DB_NAME') or base_dir / 'db.sqlite3',
+        'CONN_MAX_AGE': env_int(env, 'DB_CONN_MAX_AGE', 60),
+        'CONN_HEALTH_CHECKS': env_bool(env, 'DB_CONN_HEALTH_CHECKS', True),
+        'OPTIONS': {
+            'init_command': sqlite_init_command(
+                busy_timeout=env_int(env, 'SQLITE_BUSY_TIMEOUT', 5000),
+                mmap_size=env_int(env, 'SQLITE_MMAP_SIZE', 128 * 1024 * 1024),
+            ),
+            # Take the write lock when a transaction starts. Upgrading a read
+            # transaction to a write fails at once instead of honouring
+            # busy_timeout.
+            'transaction_mode': 'IMMEDIATE',
+        },
+    }
+
+
+def postgresql_config(env):
+    config = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': env.get('DB_NAME', 'attendify'),
+        'USER': env.get('DB_USER', ''),
+        'PASSWORD': env.get('DB_PASSWORD', ''),
+        'HOST': env.get('DB_HOST', ''),
+        'PORT': env.get('DB_PORT', ''),
+        'CONN_MAX_AGE': env_int(env, 'DB_CONN_MAX_AGE', 60),
+        'CONN_HEALTH_CHECKS': env_bool(env, 'DB_CONN_HEALTH_CHECKS', True),
+        'DISABLE_SERVER_SIDE_CURSORS': env_bool(env, 'DB_DISABLE_SERVER_SIDE_CURSORS'),
+        'OPTIONS': {},
+    }
+    if env_bool(env, 'DB_POOL'):
+        # The pool owns connection reuse; Django refuses CONN_MAX_AGE with it
+        config['CONN_MAX_AGE'] = 0
+        config['OPTIONS']['pool'] = {
+            'min_size': env_int(env, 'DB_POOL_MIN_SIZE', 2),
+            'max_size': env_int(env, 'DB_POOL_MAX_SIZE', 20),
+            'timeout': env_int(env, 'DB_POOL_TIMEOUT', 10),
+        }
+    return config
+
+
+def database_config(base_dir, env=None):
+    """Return the `default` DATABASES entry for the current environment"""
+    env = os.environ if env is None else env
+    engine = env.get('DB_ENGINE', 'sqlite').lower()
+    if engine in ('postgres', 'postgresql'):
+        return postgresql_config(env)
+    if engine in ('sqlite', 'sqlite3'):
+        return sqlite_config(env, base_dir)
+    raise ValueError(f"Unsupported DB_ENGINE '{engine}'. Use 'sqlite' or 'postgresql'.")
@@ -0,0 +1,86 @@
+import gzip
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/msgpack',
+    'text/',
+)
+
+
+def accepted_encodings(header):
+    """Map each coding in an Accept-Encoding header to its q-value"""
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            accepted[coding.lower()] = quality
+    return accepted
+
+
+def choose_encoding(header):
+    """Return 'br', 'gzip' or None for an Accept-Encoding header"""
+    accepted = accepted_encodings(header)
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    wildcard = accepted.get('*', 0.0)
+    scored = [(accepted.get(coding, wildcard), -rank, coding) for rank, coding in enumerate(candidates)]
+    quality, _, coding = max(scored)
+    return coding if quality > 0 else None
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress API responses of at least COMPRESSION_MIN_SIZE bytes with
+    Brotli (when the `brotli` package is installed) or gzip, as negotiated
+    by Accept-Encoding. Small bodies, streams (exports, live events) and
+    already encoded responses are left alone.
+    """
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        content_type = response.get('Content-Type', '')
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        if len(response.content) < getattr(settings, 'COMPRESSION_MIN_SIZE', 1024):
+            return response
+
+        coding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if coding == 'br':
+            compressed = brotli.compress(
+                response.content, quality=getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 4)
+            )
+        elif coding == 'gzip':
+            compressed = gzip.compress(
+                response.content, compresslevel=getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6), mtime=0
+            )
+        else:
+            return response
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = coding
+        # The body now differs byte for byte from the uncompressed one
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,22 @@
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset pagination for list endpoints, like the user list's
+    (users.pagination). Pages are fetched with `WHERE <ordering field> >
+    <cursor> LIMIT n`, so a page costs the same wherever it is in the table,
+    and rows are returned under `results_key` with the next/previous links.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    results_key = 'results'
+
+    def get_paginated_response(self, data):
+        return Response({
+            self.results_key: data,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        })
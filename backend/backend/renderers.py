@@ -0,0 +1,56 @@
+"""
+Fast response renderers. The optional `orjson` and `msgpack` packages are
+used when installed; ORJSONRenderer falls back to DRF's encoder without
+orjson, and MessagePackRenderer is only enabled when msgpack is present.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Values orjson and msgpack do not know (Decimal, lazy strings, querysets...)
+# are converted the way DRF's JSON encoder converts them
+_encoder = JSONEncoder()
+
+
+def _default(obj):
+    return _encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSON renderer backed by orjson, several times faster than the stdlib"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        # Raw datetimes go through _default to keep DRF's millisecond format
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_default, option=options)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """MessagePack renderer, chosen with `Accept: application/msgpack`"""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if msgpack is None:
+            raise ImproperlyConfigured('MessagePackRenderer requires the msgpack package')
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_default, use_bin_type=True)
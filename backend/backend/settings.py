@@ -10,8 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+from importlib.util import find_spec
 from pathlib import Path
 
+from .database import database_config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -57,12 +61,19 @@ INSTALLED_APPS = [
     'attendance',
     'classes',
     'session',
+    'exports',
+    'caching',
+    'sync',
+    'metrics',
+    'jobs',
 
 
 ]
 
 MIDDLEWARE = [
+    'metrics.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'backend.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -95,14 +106,50 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# Configured from DB_* environment variables, see backend/database.py.
+# Defaults to a WAL-mode SQLite file next to manage.py.
 
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+    'default': database_config(BASE_DIR),
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Set CACHE_REDIS_URL to share the cache between worker processes. Model
+# version stamps (caching.tiered), token revocation, claims versions and the
+# login throttle only work across workers on a shared cache, so without
+# Redis a local memory cache is used with DEBUG on only; otherwise the
+# database cache is, after `manage.py createcachetable`. `manage.py check
+# --deploy` reports a cache that is local to each process.
+
+if os.environ.get('CACHE_REDIS_URL'):
+    DEFAULT_CACHE = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['CACHE_REDIS_URL'],
+    }
+elif DEBUG:
+    DEFAULT_CACHE = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
     }
+else:
+    DEFAULT_CACHE = {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'cache_entries',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    }
+
+CACHES = {
+    'default': DEFAULT_CACHE,
 }
 
+# Per-process LRU in front of the default cache (caching.tiered): entry limit
+# and lifetime in seconds. The lifetime also bounds how long other workers
+# keep serving entries invalidated by a write.
+CACHE_L1_MAX_ENTRIES = 2048
+CACHE_L1_TIMEOUT = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -140,6 +187,10 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded and generated files (export job results)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -148,13 +199,33 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # orjson renders JSON; MessagePack is offered to clients sending
+    # `Accept: application/msgpack` when the msgpack package is installed
+    'DEFAULT_RENDERER_CLASSES': [
+        'backend.renderers.ORJSONRenderer',
+        *(['backend.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'backend.parsers.ORJSONParser',
+        *(['backend.parsers.MessagePackParser'] if find_spec('msgpack') else []),
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# Response compression (backend.middleware.CompressionMiddleware): bodies of
+# at least COMPRESSION_MIN_SIZE bytes are sent with Brotli when the brotli
+# package is installed and the client accepts it, otherwise gzip
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 4
+
 # JWT settings
 from datetime import timedelta
 
@@ -178,6 +249,7 @@ SIMPLE_JWT = {
 
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    'TOKEN_REFRESH_SERIALIZER': 'users.tokens.ClaimsTokenRefreshSerializer',
 
     'JTI_CLAIM': 'jti',
 
@@ -185,3 +257,114 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=5),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
+
+# Seconds to cache the claims of users whose tokens predate claims-based auth
+AUTH_USER_CACHE_TIMEOUT = 60
+
+# Write an OutstandingToken row for every issued refresh token. Off by default:
+# blacklisting records the row it needs, and revocation checks use the
+# in-process index in users.revocation. Expired tokens are pruned by the
+# run_jobs workers every JWT_PRUNE_INTERVAL seconds (or `manage.py prune_tokens`).
+JWT_TRACK_OUTSTANDING_TOKENS = False
+JWT_PRUNE_INTERVAL = 86400
+
+# Processes used to hash passwords during bulk user imports (None = CPU count)
+USER_IMPORT_HASH_WORKERS = None
+
+# The user list's default count stops at this many rows (count=exact for more)
+USER_LIST_COUNT_LIMIT = 10000
+
+# Async login (users.async_views): password hashing threads and the number of
+# logins allowed in progress before new ones are rejected with 503 (0 = no limit)
+ASYNC_LOGIN_WORKERS = 4
+ASYNC_LOGIN_MAX_PENDING = 64
+
+# Login throttling (users.throttling): failures allowed per username and per
+# client IP within the window (seconds), and how long unknown usernames are
+# remembered so repeat attempts skip the database
+LOGIN_MAX_FAILURES_PER_USERNAME = 5
+LOGIN_MAX_FAILURES_PER_IP = 50
+LOGIN_FAILURE_WINDOW = 900
+LOGIN_UNKNOWN_USERNAME_TIMEOUT = 300
+
+# Attendance scan ingestion (attendance.ingest): scans are acknowledged
+# immediately and written in bulk every ATTENDANCE_FLUSH_INTERVAL_MS or once
+# ATTENDANCE_FLUSH_MAX_ROWS are waiting. Set ATTENDANCE_BUFFER_WRITES to False
+# to write each scan before responding.
+ATTENDANCE_BUFFER_WRITES = True
+ATTENDANCE_FLUSH_INTERVAL_MS = 50
+ATTENDANCE_FLUSH_MAX_ROWS = 500
+
+# Server-issued QR tokens (session.qr): token lifetime and signing key rotation
+# period in seconds. Consumed nonces are kept in the default cache until their
+# token expires. With ATTENDANCE_REQUIRE_QR_TOKEN, scans must carry a valid
+# `qr_token`.
+QR_TOKEN_TTL = 30
+QR_KEY_ROTATION = 300
+ATTENDANCE_REQUIRE_QR_TOKEN = False
+
+# Class rosters (classes.roster): with ATTENDANCE_REQUIRE_ENROLLMENT, scans
+# are refused unless the student is enrolled in the session's class; turn it
+# off only while rosters are still being imported for existing classes. Rosters
+# are cached as sorted id arrays, loaded when a session opens and dropped on
+# enrollment changes; CLASS_ROSTER_TIMEOUT bounds how long an idle one stays.
+ATTENDANCE_REQUIRE_ENROLLMENT = True
+CLASS_ROSTER_TIMEOUT = 86400
+
+# Live attendance stream (attendance.live): pub/sub backend and seconds
+# between keepalive comments. Use 'attendance.live.RedisBroker' with
+# ATTENDANCE_LIVE_REDIS_URL when running several workers.
+ATTENDANCE_LIVE_BROKER = 'attendance.live.InProcessBroker'
+ATTENDANCE_LIVE_KEEPALIVE = 15
+
+# Data exports (exports app): rows fetched per database round trip while
+# streaming (server-side cursors on PostgreSQL). Background export jobs run
+# on the job queue's `run_jobs` workers and are written under
+# MEDIA_ROOT/exports/; set EXPORT_JOBS_ASYNC to False to run them inside the
+# request instead.
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_JOBS_ASYNC = True
+
+# Delta sync (sync app): rows returned per model and request, seconds the
+# cursor trails the clock so rows committed late are not skipped, how long
+# deletions are remembered (older cursors get a full resync) and how often
+# the run_jobs workers prune older ones, and how many seconds after a
+# session ended, or was finalized if later, offline scans for it are still
+# accepted
+SYNC_PAGE_SIZE = 500
+SYNC_CURSOR_LAG = 5
+SYNC_TOMBSTONE_RETENTION_DAYS = 30
+SYNC_TOMBSTONE_PRUNE_INTERVAL = 86400
+SYNC_OFFLINE_SCAN_GRACE = 1800
+
+# Request metrics (metrics app), served in Prometheus format at /metrics:
+# requests at least this slow, or running at least this many queries, are
+# logged as warnings by metrics.middleware and counted as slow
+METRICS_SLOW_REQUEST_MS = 500
+METRICS_SLOW_REQUEST_QUERIES = 50
+
+# Background jobs (jobs app), run by `manage.py run_jobs`: jobs run at once
+# per worker, seconds between polls of an idle queue, attempts before a job
+# fails, retry backoff (doubled per attempt, capped), and how long a job may
+# stay locked before it is assumed lost with its worker and requeued, which
+# every worker checks for every JOBS_REQUEUE_INTERVAL seconds
+JOBS_WORKER_CONCURRENCY = 4
+JOBS_POLL_INTERVAL = 1.0
+JOBS_MAX_ATTEMPTS = 3
+JOBS_RETRY_BACKOFF = 10
+JOBS_RETRY_BACKOFF_MAX = 3600
+JOBS_LOCK_TIMEOUT = 3600
+JOBS_REQUEUE_INTERVAL = 60
+
+# Session auto-close (session.closing): once a session's window has passed,
+# or it was closed early, and SESSION_CLOSE_GRACE more seconds for buffered
+# scans to land, it is closed and its enrolled students without a scan are
+# recorded absent. Runs on the job queue; `manage.py close_expired_sessions`
+# runs the same sweep without a worker.
+SESSION_AUTO_CLOSE = True
+SESSION_CLOSE_GRACE = 60
+
+# Attendance archival (attendance.archive): `manage.py archive_attendance`
+# moves the records of terms that ended at least this many days ago to the
+# read-only archive table, keeping the attendance table to current terms
+ATTENDANCE_ARCHIVE_AFTER_DAYS = 30
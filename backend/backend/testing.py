@@ -0,0 +1,87 @@
+"""
+Test helpers shared by the apps' test suites.
+
+QueryBudgetMixin is added to an APITestCase to check that an endpoint's
+query count does not grow with the amount of data behind it (the N+1
+pattern a serializer change can introduce silently) and that it answers
+within a latency budget at each size.
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from caching.tiered import invalidate_model, tiered_cache
+
+User = get_user_model()
+
+
+def bulk_users(count, prefix='user', role='STUDENT', start=0):
+    """Insert `count` users in one statement, sharing an unusable password"""
+    password = make_password(None)
+    users = User.objects.bulk_create([
+        User(username=f'{prefix}{i}', email=f'{prefix}{i}@example.com', role=role, password=password)
+        for i in range(start, start + count)
+    ])
+    invalidate_model(User)
+    return users
+
+
+class Grower:
+    """
+    Grow a table to a target size across calls: `create(start, count)`
+    adds `count` rows numbered from `start`, so budgets can be checked at
+    increasing sizes without reseeding.
+    """
+
+    def __init__(self, create):
+        self.create = create
+        self.size = 0
+
+    def __call__(self, size):
+        if size > self.size:
+            self.create(self.size, size - self.size)
+            self.size = size
+
+
+class QueryBudgetMixin:
+    """Query count and latency budgets for APITestCase suites"""
+
+    # Rows behind the endpoint at each measurement
+    budget_sizes = (10, 1000, 10000)
+
+    def assertQueryBudget(self, path, grow, max_queries, max_ms=None, sizes=None, status_code=200):
+        """
+        GET `path` after growing the data to each of `sizes` with
+        `grow(size)`, with cold caches. Fails when a request runs more than
+        `max_queries` queries, when the count differs between sizes, or
+        when it takes longer than `max_ms` milliseconds at any size: the
+        latency budget is flat, as an endpoint whose time grows with the
+        table is what the budget is there to catch.
+        """
+        counts = {}
+        for size in sizes or self.budget_sizes:
+            grow(size)
+            tiered_cache.clear()
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = self.client.get(path)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+            self.assertEqual(response.status_code, status_code, f'{path} at {size} rows')
+            counts[size] = len(queries)
+            self.assertLessEqual(
+                len(queries), max_queries,
+                f'{path} ran {len(queries)} queries at {size} rows (budget {max_queries}):\n'
+                + '\n'.join(query['sql'] for query in queries.captured_queries)
+            )
+            if max_ms is not None:
+                self.assertLessEqual(
+                    elapsed_ms, max_ms,
+                    f'{path} took {elapsed_ms:.0f} ms at {size} rows (budget {max_ms} ms)'
+                )
+        self.assertEqual(len(set(counts.values())), 1, f'{path} query count grows with the data: {counts}')
+        return counts
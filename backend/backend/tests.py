@@ -0,0 +1,264 @@
+import gzip
+import io
+import json
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from attendance.models import Attendance
+from classes.models import Class, Enrollment
+from session.models import Session
+from users.tokens import ClaimsRefreshToken
+
+from . import renderers
+from .database import database_config
+from .middleware import CompressionMiddleware, brotli, choose_encoding
+from .parsers import MessagePackParser, ORJSONParser
+from .renderers import MessagePackRenderer, ORJSONRenderer
+from .testing import Grower, QueryBudgetMixin
+
+User = get_user_model()
+
+
+class DatabaseConfigTest(SimpleTestCase):
+    """Test cases for the environment-driven database settings"""
+    
+    def test_sqlite_default(self):
+        """Test SQLite is tuned for concurrent writers by default"""
+        config = database_config(Path('/srv'), env={})
+        self.assertEqual(config['ENGINE'], 'django.db.backends.sqlite3')
+        init_command = config['OPTIONS']['init_command']
+        for pragma in ('journal_mode=WAL', 'synchronous=NORMAL', 'busy_timeout=5000', 'mmap_size='):
+            self.assertIn(pragma, init_command)
+        self.assertEqual(config['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+    
+    def test_postgresql_persistent(self):
+        """Test PostgreSQL keeps health-checked persistent connections"""
+        config = database_config(Path('/srv'), env={'DB_ENGINE': 'postgresql', 'DB_NAME': 'attendify', 'DB_CONN_MAX_AGE': '120'})
+        self.assertEqual(config['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual(config['CONN_MAX_AGE'], 120)
+        self.assertTrue(config['CONN_HEALTH_CHECKS'])
+        self.assertNotIn('pool', config['OPTIONS'])
+    
+    def test_postgresql_pool(self):
+        """Test pooling replaces persistent connections"""
+        config = database_config(Path('/srv'), env={'DB_ENGINE': 'postgresql', 'DB_POOL': 'true', 'DB_POOL_MAX_SIZE': '40'})
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+        self.assertEqual(config['OPTIONS']['pool']['max_size'], 40)
+    
+    def test_unknown_engine(self):
+        """Test an unsupported engine is refused"""
+        with self.assertRaises(ValueError):
+            database_config(Path('/srv'), env={'DB_ENGINE': 'oracle'})
+
+
+class SqlitePragmaTest(TestCase):
+    """Test cases for the PRAGMAs applied to live connections"""
+    
+    def test_busy_timeout_applied(self):
+        """Test connections wait for the write lock"""
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+
+
+class HomeViewTest(APITestCase):
+    """Test cases for the composite home endpoint"""
+    
+    def setUp(self):
+        cache.clear()
+        self.professor = User.objects.create_user(
+            username='professor',
+            email='prof@example.com',
+            password='ProfPass123!',
+            role=User.roles.PROFESOR
+        )
+        self.student = User.objects.create_user(
+            username='student',
+            email='student@example.com',
+            password='StudentPass123!',
+            role=User.roles.STUDENT
+        )
+        self.classe = Class.objects.create(name='Algorithms', code='ALG101', professor=self.professor)
+        Class.objects.create(name='Databases', code='DB201', professor=self.professor)
+        self.past = Session.objects.create(
+            classe=self.classe,
+            professor=self.professor,
+            start_time=timezone.now() - timedelta(days=1),
+            is_active=False
+        )
+        self.active = Session.objects.create(classe=self.classe, professor=self.professor)
+        Enrollment.objects.create(classe=self.classe, student=self.student)
+        Attendance.objects.create(session=self.past, student=self.student)
+    
+    def get_home(self, user):
+        token = ClaimsRefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.get('/api/home/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+    
+    def test_professor_home(self):
+        """Test a professor gets profile, classes, recent and active sessions"""
+        data = self.get_home(self.professor)
+        self.assertEqual(data['user']['username'], 'professor')
+        self.assertEqual([c['code'] for c in data['classes']], ['ALG101', 'DB201'])
+        self.assertEqual([s['id'] for s in data['recent_sessions']], [self.active.id, self.past.id])
+        self.assertEqual([s['id'] for s in data['active_sessions']], [self.active.id])
+    
+    def test_student_home(self):
+        """Test a student sees the classes they are enrolled in and what is open now"""
+        data = self.get_home(self.student)
+        self.assertEqual([c['code'] for c in data['classes']], ['ALG101'])
+        self.assertEqual([s['id'] for s in data['active_sessions']], [self.active.id])
+    
+    def test_new_student_home(self):
+        """Test a newly enrolled student sees the class before scanning anything"""
+        student = User.objects.create_user(
+            username='newcomer',
+            email='newcomer@example.com',
+            password='StudentPass123!',
+            role=User.roles.STUDENT
+        )
+        Enrollment.objects.create(classe=self.classe, student=student)
+        data = self.get_home(student)
+        self.assertEqual([c['code'] for c in data['classes']], ['ALG101'])
+        self.assertEqual([s['id'] for s in data['active_sessions']], [self.active.id])
+    
+    def test_student_sees_open_session_beyond_recent(self):
+        """Test a student's open session shows up even when newer sessions are scheduled"""
+        Session.objects.bulk_create([
+            Session(classe=self.classe, professor=self.professor, start_time=timezone.now() + timedelta(days=day))
+            for day in range(1, 12)
+        ])
+        data = self.get_home(self.student)
+        self.assertNotIn(self.active.id, [s['id'] for s in data['recent_sessions']])
+        self.assertEqual([s['id'] for s in data['active_sessions']], [self.active.id])
+    
+    def test_warm_home_queries(self):
+        """Test a warm home request runs a fixed, small number of queries"""
+        for user in (self.professor, self.student):
+            self.get_home(user)
+            with self.assertNumQueries(2):
+                self.client.get('/api/home/')
+
+
+class HomeQueryBudgetTest(QueryBudgetMixin, APITestCase):
+    """Query and latency budgets of the home endpoint as a professor's history grows"""
+    
+    def setUp(self):
+        self.professor = User.objects.create_user(
+            username='professor',
+            email='prof@example.com',
+            role=User.roles.PROFESOR
+        )
+        self.classe = Class.objects.create(name='Algorithms', code='ALG101', professor=self.professor)
+        self.grow = Grower(self.create_history)
+        token = ClaimsRefreshToken.for_user(self.professor).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    
+    def create_history(self, start, count):
+        # A class for every ten sessions
+        Class.objects.bulk_create([
+            Class(name=f'Class {i}', code=f'C{i}', professor=self.professor)
+            for i in range(start // 10, (start + count) // 10)
+        ])
+        Session.objects.bulk_create([
+            Session(classe=self.classe, professor=self.professor, is_active=False) for _ in range(count)
+        ])
+    
+    def test_home_budget(self):
+        """Test the home screen runs a fixed number of queries"""
+        self.assertQueryBudget('/api/home/', self.grow, max_queries=4, max_ms=250)
+
+
+class RendererTest(SimpleTestCase):
+    """Test cases for the orjson and MessagePack renderers"""
+    
+    data = {
+        'id': 1,
+        'name': 'Algorithms',
+        'weight': Decimal('1.50'),
+        'created_at': timezone.now(),
+        'sessions': [{'id': 2, 'is_active': True, 'notes': None}],
+    }
+    
+    def test_orjson_matches_drf(self):
+        """Test the orjson renderer produces the same document as DRF's renderer"""
+        self.assertEqual(
+            json.loads(ORJSONRenderer().render(self.data)),
+            json.loads(JSONRenderer().render(self.data))
+        )
+    
+    def test_orjson_round_trip(self):
+        """Test JSON rendered by orjson parses back with ORJSONParser"""
+        body = ORJSONRenderer().render({'scans': [{'session_id': 3}]})
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(body)), {'scans': [{'session_id': 3}]})
+    
+    @skipUnless(renderers.msgpack, 'msgpack is not installed')
+    def test_msgpack_round_trip(self):
+        """Test MessagePack bodies parse back to the rendered data"""
+        body = MessagePackRenderer().render({'id': 1, 'names': ['a', 'b']})
+        self.assertEqual(MessagePackParser().parse(io.BytesIO(body)), {'id': 1, 'names': ['a', 'b']})
+
+
+class CompressionMiddlewareTest(SimpleTestCase):
+    """Test cases for negotiated response compression"""
+    
+    def setUp(self):
+        self.factory = RequestFactory()
+    
+    def process(self, response, accept_encoding='gzip'):
+        request = self.factory.get('/api/users/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+    
+    def json_response(self, size):
+        body = json.dumps([{'username': f'student{i}'} for i in range(size)])
+        response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = '"abc"'
+        return response
+    
+    def test_large_body_gzipped(self):
+        """Test large JSON bodies are gzipped when the client accepts it"""
+        response = self.process(self.json_response(200), 'gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))), 200)
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        self.assertIn('Accept-Encoding', response['Vary'])
+    
+    def test_small_body_untouched(self):
+        """Test bodies under COMPRESSION_MIN_SIZE are sent as they are"""
+        response = self.process(self.json_response(2))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['ETag'], '"abc"')
+    
+    def test_not_accepted(self):
+        """Test nothing is compressed without an Accept-Encoding that allows it"""
+        for accept_encoding in ('', 'identity', 'gzip;q=0'):
+            response = self.process(self.json_response(200), accept_encoding)
+            self.assertFalse(response.has_header('Content-Encoding'), accept_encoding)
+    
+    def test_streaming_untouched(self):
+        """Test streamed responses such as exports are left alone"""
+        response = self.process(StreamingHttpResponse(iter([b'a,b\n'] * 1000), content_type='text/csv'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+    
+    def test_choose_encoding(self):
+        """Test Accept-Encoding q-values decide the coding"""
+        self.assertEqual(choose_encoding('gzip;q=0.5, *;q=0'), 'gzip')
+        self.assertEqual(choose_encoding('*'), 'br' if brotli else 'gzip')
+        self.assertIsNone(choose_encoding('deflate'))
@@ -17,7 +17,18 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from .views import HomeView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('users.urls')),
+    path('api/home/', HomeView.as_view(), name='home'),
+    path('api/attendance/', include('attendance.urls')),
+    path('api/classes/', include('classes.urls')),
+    path('api/sessions/', include('session.urls')),
+    path('api/exports/', include('exports.urls')),
+    path('api/cache/', include('caching.urls')),
+    path('api/sync/', include('sync.urls')),
+    path('api/jobs/', include('jobs.urls')),
+    path('metrics', include('metrics.urls')),
 ]
@@ -0,0 +1,58 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from classes.models import Class
+from classes.serializers import ClassSerializer
+from session.cache import get_active_session, get_active_sessions
+from session.models import Session
+from session.serializers import SessionSerializer
+from users.auth_views import get_profile_data
+
+
+class HomeView(APIView):
+    """
+    API endpoint for everything the app's home screen needs in one request
+    GET /api/home/
+    
+    Returns the profile, the user's classes (taught by a professor, enrolled
+    in for a student), their most recent sessions and the sessions open now.
+    The profile and the active session of a professor, or those of a
+    student's classes (one cache round trip, and one query for the misses),
+    come from the cache, so a warm request runs two queries whatever the
+    role.
+    """
+    permission_classes = [IsAuthenticated]
+    recent_sessions = 10
+    
+    def get_classes(self, user):
+        queryset = Class.objects.order_by('name', 'id')
+        if user.role == 'PROFESSOR':
+            return queryset.filter(professor_id=user.id)
+        if user.role == 'STUDENT':
+            return queryset.filter(enrollments__student_id=user.id)
+        return queryset.none()
+    
+    def get(self, request):
+        user = request.user
+        classes = list(self.get_classes(user))
+        sessions = list(
+            Session.objects.filter(classe_id__in=[classe.id for classe in classes])
+            .order_by('-start_time')[:self.recent_sessions]
+        ) if classes else []
+        
+        if user.role == 'PROFESSOR':
+            active = get_active_session(professor_id=user.id)
+            active_sessions = [active] if active else []
+        else:
+            # Looked up by class: an open session need not be a recent one
+            active = get_active_sessions([classe.id for classe in classes])
+            active_sessions = [active[classe.id] for classe in classes if classe.id in active]
+        
+        return Response({
+            'user': get_profile_data(user),
+            'classes': ClassSerializer(classes, many=True).data,
+            'recent_sessions': SessionSerializer(sessions, many=True).data,
+            'active_sessions': active_sessions,
+        }, status=status.HTTP_200_OK)
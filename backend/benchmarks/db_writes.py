@@ -0,0 +1,146 @@
+"""
+Concurrent write throughput for each database configuration.
+
+    cd backend && python -m benchmarks.db_writes [--threads 8] [--writes 300] [--postgresql]
+
+Every thread runs `--writes` short transactions shaped like an unbuffered
+scan (look up the row, then insert it) and releases its connection the way
+a finished request does under that mode's settings. SQLite modes run
+against a temporary file. PostgreSQL modes run with --postgresql and
+connect with the DB_* environment variables (see backend/database.py);
+the pooled mode needs psycopg[pool]. Each mode runs in its own process
+and the results are printed as JSON.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from backend.database import postgresql_config, sqlite_config
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+TABLE_SQL = (
+    'CREATE TABLE bench_writes ('
+    'worker INTEGER NOT NULL, seq INTEGER NOT NULL, written_at VARCHAR(40) NOT NULL, '
+    'PRIMARY KEY (worker, seq))'
+)
+
+
+def sqlite_modes(directory):
+    return {
+        # Django's defaults before backend/database.py
+        'sqlite-default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': os.path.join(directory, 'default.sqlite3')},
+        'sqlite-tuned': sqlite_config({'DB_NAME': os.path.join(directory, 'tuned.sqlite3')}, BACKEND_DIR),
+    }
+
+
+def postgresql_modes():
+    per_request = postgresql_config({**os.environ, 'DB_CONN_MAX_AGE': '0', 'DB_POOL': ''})
+    persistent = postgresql_config({**os.environ, 'DB_CONN_MAX_AGE': '60', 'DB_POOL': ''})
+    pooled = postgresql_config({**os.environ, 'DB_POOL': '1'})
+    return {
+        'postgresql-per-request': per_request,
+        'postgresql-persistent': persistent,
+        'postgresql-pooled': pooled,
+    }
+
+
+def run_mode(config, threads, writes):
+    """Run one configuration in this process and return its measurements"""
+    import django
+    from django.conf import settings
+
+    settings.configure(DATABASES={'default': config}, INSTALLED_APPS=[], USE_TZ=True)
+    django.setup()
+
+    from django.db import DatabaseError, connection, transaction
+
+    with connection.cursor() as cursor:
+        cursor.execute('DROP TABLE IF EXISTS bench_writes')
+        cursor.execute(TABLE_SQL)
+    connection.close()
+
+    committed = [0] * threads
+    errors = [0] * threads
+
+    def worker(index):
+        for seq in range(writes):
+            try:
+                with transaction.atomic():
+                    with connection.cursor() as cursor:
+                        cursor.execute(
+                            'SELECT 1 FROM bench_writes WHERE worker = %s AND seq = %s', [index, seq]
+                        )
+                        if cursor.fetchone() is None:
+                            cursor.execute(
+                                'INSERT INTO bench_writes (worker, seq, written_at) VALUES (%s, %s, %s)',
+                                [index, seq, str(time.time())]
+                            )
+                committed[index] += 1
+            except DatabaseError:
+                errors[index] += 1
+            # What request_finished does at the end of every request
+            connection.close_if_unusable_or_obsolete()
+        connection.close()
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'committed': sum(committed),
+        'errors': sum(errors),
+        'seconds': round(elapsed, 3),
+        'writes_per_sec': round(sum(committed) / elapsed, 1),
+    }
+
+
+def run_isolated(config, threads, writes):
+    """Run one configuration in a fresh interpreter with its own settings"""
+    completed = subprocess.run(
+        [
+            sys.executable, '-m', 'benchmarks.db_writes',
+            '--config', json.dumps(config, default=str),
+            '--threads', str(threads), '--writes', str(writes),
+        ],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        return {'failed': completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--writes', type=int, default=300, help='transactions per thread')
+    parser.add_argument('--postgresql', action='store_true', help='also benchmark PostgreSQL modes')
+    parser.add_argument('--config', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.config:
+        print(json.dumps(run_mode(json.loads(args.config), args.threads, args.writes)))
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, config in sqlite_modes(tmp).items():
+            results[name] = run_isolated(config, args.threads, args.writes)
+    if args.postgresql:
+        for name, config in postgresql_modes().items():
+            results[name] = run_isolated(config, args.threads, args.writes)
+    print(json.dumps({'threads': args.threads, 'writes_per_thread': args.writes, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+"""
+Throughput and latency of the auth and attendance hot paths.
+
+    cd backend && python -m benchmarks.load [--scenario login ...] [--concurrency 8]
+    cd backend && python -m benchmarks.load --url http://127.0.0.1:8000
+    cd backend && python -m benchmarks.load --baseline /tmp/baseline.json [--save-baseline]
+
+Without --url, requests go through Django's test client in this process,
+against a temporary SQLite database. With --url they go over HTTP to a
+running server; data is then seeded through the ORM, so this process must
+use the server's database settings (the DB_* environment variables, see
+backend/database.py), and is deleted afterwards.
+
+Each scenario (see benchmarks/scenarios.py) reports requests per second,
+errors and p50/p95/p99 latency as JSON. Given --baseline, results are
+compared with that file (recorded earlier with --save-baseline) and the
+exit status is 1 if any scenario's p95 rose, or its throughput fell, by
+more than --tolerance. Baselines are specific to the machine they were
+recorded on, so none is kept in the repository: record one on the same
+machine, e.g. in the CI job before the change under test, and compare
+against it there.
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+
+
+def relative_url(url):
+    """Strip the scheme and host of absolute links such as pagination's `next`"""
+    parts = urlsplit(url)
+    return parts.path + (f'?{parts.query}' if parts.query else '')
+
+
+class InProcessTarget:
+    """Sends requests through Django's test client, one client per thread"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def send(self, method, path, body=None, token=None):
+        from django.test import Client
+
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = Client(HTTP_HOST='localhost')
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        response = client.generic(
+            method, relative_url(path),
+            data=json.dumps(body) if body is not None else '',
+            content_type='application/json',
+            **headers
+        )
+        data = None
+        if response.get('Content-Type', '').startswith('application/json') and response.content:
+            data = json.loads(response.content)
+        return response.status_code, data
+
+
+class HttpTarget:
+    """Sends requests to a running server"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def send(self, method, path, body=None, token=None):
+        headers = {'Accept': 'application/json', 'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        request = urllib.request.Request(
+            self.base_url + relative_url(path),
+            data=json.dumps(body).encode() if body is not None else None,
+            headers=headers,
+            method=method,
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                status, content = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, content = e.code, e.read()
+        try:
+            return status, json.loads(content) if content else None
+        except ValueError:
+            return status, None
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an ascending list"""
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(seconds * 1000 for _, seconds in samples)
+    if not latencies:
+        return {'requests': 0}
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for status, _ in samples if status >= 400),
+        'seconds': round(elapsed, 3),
+        'rps': round(len(samples) / elapsed, 1),
+        'mean_ms': round(sum(latencies) / len(latencies), 2),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'max_ms': round(latencies[-1], 2),
+    }
+
+
+def run_scenario(target, fixtures, name, size, concurrency):
+    from django.db import close_old_connections
+
+    from .scenarios import SCENARIOS
+
+    scenario, default_size = SCENARIOS[name]
+    size = size or default_size
+    jobs = scenario(fixtures, size)
+    samples = []
+
+    def send(method, path, body=None, token=None):
+        started = time.perf_counter()
+        status, data = target.send(method, path, body, token)
+        samples.append((status, time.perf_counter() - started))
+        return status, data
+
+    def run(job):
+        try:
+            job(send)
+        finally:
+            close_old_connections()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(run, jobs))
+    return {'size': size, 'concurrency': concurrency, **summarize(samples, time.perf_counter() - started)}
+
+
+def compare(results, baseline, tolerance, slack_ms=10):
+    """
+    Describe each scenario that is slower than its baseline beyond
+    `tolerance`; p95 changes under `slack_ms` are treated as noise.
+    Scenarios run at another size or concurrency than the
+    baseline are not comparable and are skipped.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or not result.get('requests'):
+            continue
+        if (base['size'], base['concurrency']) != (result['size'], result['concurrency']):
+            continue
+        if result['p95_ms'] > max(base['p95_ms'] * (1 + tolerance), base['p95_ms'] + slack_ms):
+            regressions.append(f"{name}: p95 {result['p95_ms']} ms, baseline {base['p95_ms']} ms")
+        if result['rps'] < base['rps'] * (1 - tolerance):
+            regressions.append(f"{name}: {result['rps']} requests/s, baseline {base['rps']}")
+        if result['errors'] > base['errors']:
+            regressions.append(f"{name}: {result['errors']} errors, baseline {base['errors']}")
+    return regressions
+
+
+def setup_django(url):
+    """Configure Django; in-process runs get a fresh, migrated database"""
+    tmp = None
+    if not url:
+        tmp = tempfile.TemporaryDirectory()
+        os.environ['DB_NAME'] = os.path.join(tmp.name, 'load.sqlite3')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    import django
+    django.setup()
+    if tmp is not None:
+        from django.core.management import call_command
+        call_command('migrate', verbosity=0)
+    # Every storm request would otherwise be logged as slow
+    logging.getLogger('metrics.middleware').setLevel(logging.ERROR)
+    return tmp
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help='benchmark a running server instead of the test client')
+    parser.add_argument('--scenario', action='append', help='login, register, refresh, profile, scans or pagination (default: all)')
+    parser.add_argument('--size', type=int, help="override each scenario's default size")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--baseline', type=Path, help='compare the results with this file')
+    parser.add_argument('--save-baseline', action='store_true', help='write the results to --baseline instead')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='allowed relative slowdown')
+    parser.add_argument('--slack-ms', type=float, default=10, help='p95 increases below this are ignored')
+    args = parser.parse_args(argv)
+    if args.save_baseline and args.baseline is None:
+        parser.error('--save-baseline needs --baseline')
+    if args.baseline is not None and not args.save_baseline and not args.baseline.exists():
+        parser.error(f'baseline {args.baseline} not found')
+
+    tmp = setup_django(args.url)
+    from django.db import connections
+
+    from .scenarios import SCENARIOS, Fixtures
+
+    unknown = set(args.scenario or ()) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario: {', '.join(sorted(unknown))}")
+
+    target = HttpTarget(args.url) if args.url else InProcessTarget()
+    fixtures = Fixtures(prefix=f'bench{uuid.uuid4().hex[:8]}')
+    results = {}
+    try:
+        for name in args.scenario or SCENARIOS:
+            results[name] = run_scenario(target, fixtures, name, args.size, args.concurrency)
+    finally:
+        if args.url:
+            fixtures.cleanup()
+        connections.close_all()
+        if tmp is not None:
+            from attendance.ingest import scan_buffer
+            scan_buffer.clear()
+            tmp.cleanup()
+
+    report = {'target': args.url or 'in-process', 'results': results}
+    regressions = []
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + '\n')
+    elif args.baseline is not None:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance, args.slack_ms)
+        report['baseline'] = str(args.baseline)
+        report['regressions'] = regressions
+    print(json.dumps(report, indent=2))
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
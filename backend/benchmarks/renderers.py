@@ -0,0 +1,88 @@
+"""
+Serialization and compression cost of a large list response.
+
+    cd backend && python -m benchmarks.renderers [--rows 500] [--rounds 50]
+
+Renders a roster shaped like the user list (`--rows` users) with DRF's
+stock JSONRenderer, backend.renderers.ORJSONRenderer and, when msgpack is
+installed, MessagePackRenderer, then reports the mean render time and the
+raw, gzip and (when brotli is installed) Brotli sizes of each body as JSON.
+"""
+import argparse
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+
+def roster(rows):
+    joined = datetime(2024, 9, 1, 8, 0, tzinfo=timezone.utc)
+    return {
+        'count': rows,
+        'next': None,
+        'previous': None,
+        'results': [
+            {
+                'id': index,
+                'username': f'student{index}',
+                'email': f'student{index}@example.com',
+                'first_name': 'Student',
+                'last_name': f'Number {index}',
+                'role': 'STUDENT',
+                'is_active': True,
+                'date_joined': joined + timedelta(minutes=index),
+            }
+            for index in range(rows)
+        ],
+    }
+
+
+def mean_seconds(func, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - started) / rounds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500)
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from rest_framework.renderers import JSONRenderer
+
+    from backend import renderers
+    from backend.middleware import brotli
+
+    renderer_classes = {
+        'drf-json': JSONRenderer,
+        'orjson': renderers.ORJSONRenderer,
+    }
+    if renderers.msgpack is not None:
+        renderer_classes['msgpack'] = renderers.MessagePackRenderer
+
+    data = roster(args.rows)
+    results = {}
+    for name, renderer_class in renderer_classes.items():
+        renderer = renderer_class()
+        body = renderer.render(data, renderer.media_type, {})
+        result = {
+            'render_ms': round(mean_seconds(lambda: renderer.render(data, renderer.media_type, {}), args.rounds) * 1000, 3),
+            'bytes': len(body),
+            'gzip_bytes': len(gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL)),
+        }
+        if brotli is not None:
+            result['brotli_bytes'] = len(brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY))
+        results[name] = result
+    print(json.dumps({'rows': args.rows, 'rounds': args.rounds, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Load scenarios for benchmarks.load. A scenario seeds what it needs through
+the ORM and returns a list of jobs; each job is called with `send(method,
+path, body=None, token=None)`, which performs and times one request and
+returns (status, parsed body). Jobs run concurrently.
+"""
+import itertools
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from caching.tiered import invalidate_model
+from classes.models import Class
+from classes.roster import enroll_students, warm_roster
+from session.models import Session
+from users.tokens import tokens_for_user
+
+User = get_user_model()
+
+PASSWORD = 'BenchPass123!'
+
+
+class Fixtures:
+    """
+    Rows seeded for one run. Usernames and class codes start with `prefix`
+    so everything can be deleted afterwards when running against a shared
+    database.
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self._sequence = itertools.count()
+        self._password = None
+
+    def name(self, kind):
+        return f'{self.prefix}{kind}{next(self._sequence)}'
+
+    def users(self, count, role=User.roles.STUDENT):
+        """Create `count` users who can log in with PASSWORD (hashed once)"""
+        if self._password is None:
+            self._password = make_password(PASSWORD)
+        users = []
+        for _ in range(count):
+            username = self.name(role.lower())
+            users.append(User(username=username, email=f'{username}@example.com', role=role, password=self._password))
+        users = User.objects.bulk_create(users)
+        invalidate_model(User)
+        return users
+
+    def open_session(self, professor):
+        classe = Class.objects.create(name='Benchmark', code=self.name('class'), professor=professor)
+        return Session.objects.create(
+            classe=classe,
+            professor=professor,
+            start_time=timezone.now() - timedelta(minutes=1),
+            duration=3600,
+        )
+
+    def cleanup(self):
+        User.objects.filter(username__startswith=self.prefix).delete()
+        invalidate_model(User)
+
+
+def access_token(user):
+    return tokens_for_user(user)['access']
+
+
+def login_storm(fixtures, count):
+    """Many logins spread over a few accounts, like the start of a lecture"""
+    users = fixtures.users(min(count, 50))
+
+    def job(user):
+        return lambda send: send('POST', '/api/auth/login/', {'username': user.username, 'password': PASSWORD})
+    return [job(users[i % len(users)]) for i in range(count)]
+
+
+def registration_batch(fixtures, count):
+    """New students signing up at the start of a term"""
+    def job(username):
+        return lambda send: send('POST', '/api/auth/register/', {
+            'username': username,
+            'email': f'{username}@example.com',
+            'password': PASSWORD,
+            'password2': PASSWORD,
+            'role': 'STUDENT',
+        })
+    return [job(fixtures.name('signup')) for _ in range(count)]
+
+
+def token_refresh(fixtures, count):
+    """Apps renewing their access tokens"""
+    users = fixtures.users(min(count, 50))
+    refresh_tokens = [tokens_for_user(user)['refresh'] for user in users]
+
+    def job(refresh):
+        return lambda send: send('POST', '/api/auth/token/refresh/', {'refresh': refresh})
+    return [job(refresh_tokens[i % len(refresh_tokens)]) for i in range(count)]
+
+
+def profile_reads(fixtures, count):
+    """Authenticated profile reads, the app's most frequent call"""
+    tokens = [access_token(user) for user in fixtures.users(min(count, 50))]
+
+    def job(token):
+        return lambda send: send('GET', '/api/auth/profile/', token=token)
+    return [job(tokens[i % len(tokens)]) for i in range(count)]
+
+
+def scan_burst(fixtures, count):
+    """A whole class scanning the QR code of an open session at once"""
+    professor = fixtures.users(1, role=User.roles.PROFESOR)[0]
+    session = fixtures.open_session(professor)
+    students = fixtures.users(count)
+    enroll_students(session.classe_id, [student.id for student in students])
+    warm_roster(session.classe_id)
+
+    def job(token):
+        return lambda send: send('POST', '/api/attendance/', {'session_id': session.id}, token=token)
+    return [job(access_token(student)) for student in students]
+
+
+def list_pagination(fixtures, count):
+    """Admins walking the user list page by page; each page is one request"""
+    fixtures.users(count)
+    token = access_token(fixtures.users(1, role=User.roles.ADMIN)[0])
+    walkers = 4
+
+    def job(send):
+        path = '/api/auth/users/?page_size=50'
+        while path:
+            status, data = send('GET', path, token=token)
+            path = data.get('next') if status == 200 and data else None
+    return [job] * walkers
+
+
+# name: (scenario, default size: requests sent, or users listed for pagination)
+SCENARIOS = {
+    'login': (login_storm, 40),
+    'register': (registration_batch, 40),
+    'refresh': (token_refresh, 300),
+    'profile': (profile_reads, 500),
+    'scans': (scan_burst, 300),
+    'pagination': (list_pagination, 2000),
+}
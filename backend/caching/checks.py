@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Backends whose entries other worker processes cannot see
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_BACKENDS:
+        return []
+    return [Error(
+        'The default cache is local to each process.',
+        hint=(
+            'Set CACHE_REDIS_URL or use the database cache: cache invalidation, token '
+            'revocation and the login throttle do not reach other workers otherwise.'
+        ),
+        id='caching.E001',
+    )]
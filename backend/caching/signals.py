@@ -0,0 +1,25 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from .tiered import invalidate_model
+
+# Models whose cached reads are keyed by a version stamp. Bulk writes
+# (bulk_create, QuerySet.update) send no signals and call
+# invalidate_model() themselves.
+VERSIONED_MODELS = (
+    'users.CustomUser',
+    'classes.Class',
+    'classes.Term',
+    'session.Session',
+    'attendance.Attendance',
+)
+
+
+def model_changed(sender, **kwargs):
+    invalidate_model(sender)
+
+
+for label in VERSIONED_MODELS:
+    model = apps.get_model(label)
+    post_save.connect(model_changed, sender=model, dispatch_uid=f'caching-save-{label}')
+    post_delete.connect(model_changed, sender=model, dispatch_uid=f'caching-delete-{label}')
@@ -0,0 +1,141 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from users.tokens import ClaimsRefreshToken
+
+from .checks import check_shared_cache
+from .tiered import MISSING, LRUCache, TieredCache, tiered_cache
+
+User = get_user_model()
+
+
+class LRUCacheTest(SimpleTestCase):
+    """Test cases for the in-process L1 cache"""
+    
+    def test_least_recently_used_evicted(self):
+        """Test the oldest unused entry is dropped at capacity"""
+        lru = LRUCache(max_entries=2, timeout=60)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIs(lru.get('b'), MISSING)
+        self.assertEqual(len(lru), 2)
+    
+    def test_entries_expire(self):
+        """Test entries older than the timeout are not returned"""
+        lru = LRUCache(timeout=0.01)
+        lru.set('a', 1)
+        time.sleep(0.02)
+        self.assertIs(lru.get('a'), MISSING)
+
+
+class TieredCacheTest(TestCase):
+    """Test cases for the two-tier cache"""
+    
+    def setUp(self):
+        cache.clear()
+        self.cache = TieredCache(l1_timeout=60)
+    
+    def test_tiers_and_counters(self):
+        """Test lookups fall through L1, L2 and compute, and are counted"""
+        calls = []
+        compute = lambda: calls.append(1) or 'value'
+        self.assertEqual(self.cache.get_or_set('item:1', compute), 'value')
+        self.assertEqual(self.cache.get_or_set('item:1', compute), 'value')
+        self.cache.l1.clear()
+        self.assertEqual(self.cache.get_or_set('item:1', compute), 'value')
+        self.assertEqual(len(calls), 1)
+        stats = self.cache.stats()['namespaces']['item']
+        self.assertEqual((stats['misses'], stats['l1_hits'], stats['l2_hits']), (1, 1, 1))
+    
+    def test_none_is_cached(self):
+        """Test a computed None is a hit rather than recomputed"""
+        self.cache.set('item:none', None)
+        self.cache.l1.clear()
+        self.assertIs(self.cache.get('item:none', MISSING), None)
+    
+    def test_bump_retires_entries(self):
+        """Test a model version bump hides entries depending on it"""
+        self.cache.set('item:1', 'old', models=[User])
+        self.cache.bump(User)
+        self.assertIsNone(self.cache.get('item:1', models=[User]))
+    
+    def test_bump_seen_by_other_process(self):
+        """Test a bump reaches caches sharing the L2 once their L1 expires"""
+        other = TieredCache(l1_timeout=0.01)
+        other.set('item:1', 'old', models=[User])
+        self.cache.bump(User)
+        time.sleep(0.02)
+        self.assertIsNone(other.get('item:1', models=[User]))
+    
+    def test_signals_bump_version(self):
+        """Test saving and deleting a user bump the user model version"""
+        version = tiered_cache.version(User)
+        user = User.objects.create_user(username='someone', email='someone@example.com')
+        saved = tiered_cache.version(User)
+        self.assertNotEqual(saved, version)
+        user.delete()
+        self.assertNotEqual(tiered_cache.version(User), saved)
+
+
+class SharedCacheCheckTest(SimpleTestCase):
+    """Test cases for the deploy check on the default cache"""
+    
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_local_memory_reported(self):
+        """Test a per-process cache is reported as an error"""
+        self.assertEqual([error.id for error in check_shared_cache(None)], ['caching.E001'])
+    
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache_entries'}})
+    def test_shared_cache_accepted(self):
+        """Test the database cache passes the check"""
+        self.assertEqual(check_shared_cache(None), [])
+
+
+class CachedViewsTest(APITestCase):
+    """Test cases for the cached user endpoints"""
+    
+    def setUp(self):
+        tiered_cache.clear()
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='AdminPass123!', role=User.roles.ADMIN
+        )
+        token = ClaimsRefreshToken.for_user(self.admin).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    
+    def test_profile_cached_until_changed(self):
+        """Test repeat profile reads skip the database until the user changes"""
+        self.client.get('/api/auth/profile/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/auth/profile/')
+        self.assertEqual(response.data['user']['username'], 'admin')
+    
+        self.client.patch('/api/auth/profile/', {'first_name': 'Ada'}, format='json')
+        response = self.client.get('/api/auth/profile/')
+        self.assertEqual(response.data['user']['first_name'], 'Ada')
+    
+    def test_user_list_cached_until_changed(self):
+        """Test user list pages are cached and refreshed by new users"""
+        self.client.get('/api/auth/users/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/auth/users/')
+        self.assertEqual(len(response.data['users']), 1)
+    
+        User.objects.create_user(username='new', email='new@example.com')
+        response = self.client.get('/api/auth/users/')
+        self.assertEqual(len(response.data['users']), 2)
+    
+    def test_stats_endpoint(self):
+        """Test admins can read the hit and miss counters"""
+        self.client.get('/api/auth/profile/')
+        self.client.get('/api/auth/profile/')
+        response = self.client.get('/api/cache/stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['namespaces']['profile']['l1_hits'], 1)
@@ -0,0 +1,204 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+
+MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe in-process cache bounded by entry count and age"""
+
+    def __init__(self, max_entries=2048, timeout=5):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + timeout)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TieredCache:
+    """
+    A per-process LRU (L1) in front of a Django cache shared by every worker
+    (L2). Reads try L1, then L2, then compute and fill both.
+
+    Entries can depend on models: their keys embed each model's version
+    stamp, which signals bump on every write, so stale entries are never
+    read again and simply expire. Other processes see a bump once their L1
+    copy of the stamp expires (CACHE_L1_TIMEOUT seconds at most).
+
+    Cached values are shared between callers and must not be mutated.
+    """
+
+    prefix = 'tiered:'
+
+    def __init__(self, alias='default', max_entries=2048, l1_timeout=5):
+        self.alias = alias
+        self.l1 = LRUCache(max_entries, l1_timeout)
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def l2(self):
+        return caches[self.alias]
+
+    def _version_key(self, model):
+        return f'{self.prefix}version:{model._meta.label_lower}'
+
+    def _modified_key(self, model):
+        return f'{self.prefix}modified:{model._meta.label_lower}'
+
+    def version(self, model):
+        key = self._version_key(model)
+        version = self.l1.get(key)
+        if version is MISSING:
+            version = self.l2.get(key)
+            if version is None:
+                # Start from the clock so a stamp evicted from L2 never
+                # comes back at a value older entries were stored under
+                self.l2.add(key, time.time_ns(), timeout=None)
+                version = self.l2.get(key)
+            self.l1.set(key, version)
+        return version
+
+    def bump(self, model):
+        key = self._version_key(model)
+        try:
+            version = self.l2.incr(key)
+        except ValueError:
+            version = time.time_ns()
+            self.l2.set(key, version, timeout=None)
+        self.l1.set(key, version)
+        modified = time.time()
+        self.l2.set(self._modified_key(model), modified, timeout=None)
+        self.l1.set(self._modified_key(model), modified)
+        return version
+
+    def last_modified(self, model):
+        """Time of the model's latest bump, or of its first lookup if unknown"""
+        key = self._modified_key(model)
+        modified = self.l1.get(key)
+        if modified is MISSING:
+            modified = self.l2.get(key)
+            if modified is None:
+                self.l2.add(key, time.time(), timeout=None)
+                modified = self.l2.get(key)
+            self.l1.set(key, modified)
+        return modified
+
+    def make_key(self, key, models=()):
+        versions = '.'.join(str(self.version(model)) for model in models)
+        return f'{self.prefix}{key}:{versions}' if models else f'{self.prefix}{key}'
+
+    def _count(self, key, outcome):
+        namespace = key.split(':', 1)[0]
+        with self._stats_lock:
+            self._stats.setdefault(namespace, Counter())[outcome] += 1
+
+    def get(self, key, default=None, models=()):
+        full_key = self.make_key(key, models)
+        value = self.l1.get(full_key)
+        if value is not MISSING:
+            self._count(key, 'l1_hits')
+            return value
+        value = self.l2.get(full_key, MISSING)
+        if value is not MISSING:
+            self._count(key, 'l2_hits')
+            self.l1.set(full_key, value)
+            return value
+        self._count(key, 'misses')
+        return default
+
+    def set(self, key, value, timeout=None, models=()):
+        full_key = self.make_key(key, models)
+        if timeout is None:
+            self.l2.set(full_key, value)
+        else:
+            self.l2.set(full_key, value, timeout)
+        self.l1.set(full_key, value, timeout)
+
+    def get_or_set(self, key, compute, timeout=None, models=()):
+        value = self.get(key, MISSING, models)
+        if value is MISSING:
+            value = compute()
+            self.set(key, value, timeout, models)
+        return value
+
+    def delete(self, key, models=()):
+        full_key = self.make_key(key, models)
+        self.l1.delete(full_key)
+        self.l2.delete(full_key)
+
+    def stats(self):
+        """Hit and miss counts per key namespace (the text before the first ':')"""
+        with self._stats_lock:
+            stats = {}
+            for namespace, counts in self._stats.items():
+                lookups = sum(counts.values())
+                hits = counts['l1_hits'] + counts['l2_hits']
+                stats[namespace] = {
+                    'l1_hits': counts['l1_hits'],
+                    'l2_hits': counts['l2_hits'],
+                    'misses': counts['misses'],
+                    'hit_rate': round(hits / lookups, 3) if lookups else None,
+                }
+        return {'l1_entries': len(self.l1), 'namespaces': stats}
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats.clear()
+
+    def clear(self):
+        """Drop this process's L1 entries and counters"""
+        self.l1.clear()
+        self.reset_stats()
+
+
+tiered_cache = TieredCache(
+    max_entries=getattr(settings, 'CACHE_L1_MAX_ENTRIES', 2048),
+    l1_timeout=getattr(settings, 'CACHE_L1_TIMEOUT', 5),
+)
+
+
+def invalidate_model(model):
+    """
+    Retire every cached entry depending on `model`. Inside a transaction the
+    stamp is bumped again on commit, so a reader that cached the pre-commit
+    rows in between is not served afterwards.
+    """
+    tiered_cache.bump(model)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: tiered_cache.bump(model))
@@ -0,0 +1,19 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from users.permissions import IsAdmin
+
+from .tiered import tiered_cache
+
+
+class CacheStatsView(APIView):
+    """
+    API endpoint for this process's cache hit and miss counters (Admin only)
+    GET /api/cache/stats/
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+    
+    def get(self, request):
+        return Response(tiered_cache.stats(), status=status.HTTP_200_OK)
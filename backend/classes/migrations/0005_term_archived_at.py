@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classes', '0004_enrollment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='term',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classes', '0005_term_archived_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='class',
+            index=models.Index(fields=['name', 'id'], name='class_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='class',
+            index=models.Index(fields=['professor', 'name', 'id'], name='class_prof_name_idx'),
+        ),
+    ]
@@ -1,3 +1,80 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
 
-# Create your models here.
+
+class Term(models.Model):
+    code = models.CharField(max_length=20, unique=True)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    # Set once the term's attendance records have moved to the archive table
+    archived_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['start_date']
+
+    def __str__(self):
+        return self.code
+
+    def clean(self):
+        """Terms run forward and never overlap, so each day has one term"""
+        if self.end_date < self.start_date:
+            raise ValidationError({'end_date': 'A term cannot end before it starts.'})
+        overlapping = Term.objects.filter(
+            start_date__lte=self.end_date, end_date__gte=self.start_date
+        ).exclude(pk=self.pk).first()
+        if overlapping is not None:
+            raise ValidationError(f'Term overlaps {overlapping.code} ({overlapping.start_date} to {overlapping.end_date}).')
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'start_date', 'end_date'} & set(update_fields):
+            self.clean()
+        super().save(*args, **kwargs)
+
+
+class Class(models.Model):
+    name = models.CharField(max_length=200)
+    code = models.CharField(max_length=50, unique=True)
+    professor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='classes'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'classes'
+        indexes = [
+            # Delta sync (sync app) walks rows in (updated_at, id) order
+            models.Index(fields=['updated_at', 'id'], name='class_updated_idx'),
+            # The class list, paginated by name, for everyone and per professor
+            models.Index(fields=['name', 'id'], name='class_name_idx'),
+            models.Index(fields=['professor', 'name', 'id'], name='class_prof_name_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class Enrollment(models.Model):
+    classe = models.ForeignKey(Class, on_delete=models.CASCADE, related_name='enrollments')
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='enrollments'
+    )
+    enrolled_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['classe', 'student'], name='unique_class_student'),
+        ]
+        indexes = [
+            # A student's classes; the class side is served by the unique index
+            models.Index(fields=['student', 'classe'], name='enrollment_student_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.student} in {self.classe}'
@@ -0,0 +1,24 @@
+from rest_framework import serializers
+
+from .models import Class
+
+
+class ClassSerializer(serializers.ModelSerializer):
+    """Serializer for classes"""
+    
+    professor_id = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = Class
+        fields = ['id', 'name', 'code', 'professor_id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+class EnrollmentSerializer(serializers.Serializer):
+    """Serializer for a bulk enrollment change"""
+    
+    student_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=5000
+    )
@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+
+from caching.tiered import invalidate_model, tiered_cache
+
+from .models import Term
+
+
+def _load_terms():
+    return tiered_cache.get_or_set(
+        'terms:all',
+        lambda: list(Term.objects.values_list('id', 'start_date', 'end_date')),
+        models=[Term],
+    )
+
+
+def clear_term_cache():
+    """Retire the cached term list in every process"""
+    invalidate_model(Term)
+
+
+def default_term(day):
+    """
+    The code and bounds of the default term around `day`: its half-year,
+    cut short where it meets a defined term so the two never overlap. A
+    term starting late carries its start date in its code (YYYY-S2-1219).
+    """
+    half = 1 if day.month <= 6 else 2
+    code = f'{day.year}-S{half}'
+    if half == 1:
+        start, end = date(day.year, 1, 1), date(day.year, 6, 30)
+    else:
+        start, end = date(day.year, 7, 1), date(day.year, 12, 31)
+    before = Term.objects.filter(end_date__lt=day, end_date__gte=start).order_by('-end_date').first()
+    if before is not None:
+        start = before.end_date + timedelta(days=1)
+        code = f'{code}-{start:%m%d}'
+    after = Term.objects.filter(start_date__gt=day, start_date__lte=end).order_by('start_date').first()
+    if after is not None:
+        end = after.start_date - timedelta(days=1)
+    return code, start, end
+
+
+def term_id_for(day):
+    """
+    Return the id of the term containing `day`. Terms are few and rarely
+    change, so the list is cached under the Term version stamp. Days outside
+    every defined term fall into a default half-year term (YYYY-S1 for
+    January-June, YYYY-S2 after), created on first use and trimmed to the
+    gap between defined terms.
+    """
+    for term_id, start_date, end_date in _load_terms():
+        if start_date <= day <= end_date:
+            return term_id
+    # The list can lag another process's new term by CACHE_L1_TIMEOUT
+    term = Term.objects.filter(start_date__lte=day, end_date__gte=day).first()
+    if term is not None:
+        return term.id
+    code, start, end = default_term(day)
+    term, _ = Term.objects.get_or_create(code=code, defaults={'start_date': start, 'end_date': end})
+    return term.id
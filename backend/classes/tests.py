@@ -1,3 +1,208 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from backend.testing import Grower, QueryBudgetMixin, bulk_users
+from caching.tiered import tiered_cache
+from users.tokens import ClaimsRefreshToken
+
+from .models import Class, Enrollment, Term
+from .roster import get_roster, is_enrolled
+from .terms import clear_term_cache, term_id_for
+
+User = get_user_model()
+
+
+class ClassViewsTest(APITestCase):
+    """Test cases for the class endpoints"""
+    
+    def setUp(self):
+        self.professor = User.objects.create_user(
+            username='professor',
+            email='prof@example.com',
+            password='ProfPass123!',
+            role=User.roles.PROFESOR
+        )
+        other = User.objects.create_user(
+            username='other',
+            email='other@example.com',
+            password='ProfPass123!',
+            role=User.roles.PROFESOR
+        )
+        self.classe = Class.objects.create(name='Algorithms', code='ALG101', professor=self.professor)
+        Class.objects.create(name='Databases', code='DB201', professor=other)
+        token = ClaimsRefreshToken.for_user(self.professor).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    
+    def test_professor_lists_own_classes(self):
+        """Test professors only see the classes they teach"""
+        response = self.client.get('/api/classes/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([c['code'] for c in response.data['classes']], ['ALG101'])
+    
+    def test_class_detail(self):
+        """Test retrieving a class"""
+        response = self.client.get(f'/api/classes/{self.classe.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['professor_id'], self.professor.id)
+    
+    def test_class_list_paginated(self):
+        """Test the class list is served by name, a page at a time"""
+        Class.objects.bulk_create([
+            Class(name=f'Course {i}', code=f'C{i}', professor=self.professor) for i in range(4)
+        ])
+        response = self.client.get('/api/classes/', {'page_size': 3})
+        names = [c['name'] for c in response.data['classes']]
+        response = self.client.get(response.data['next'])
+        names += [c['name'] for c in response.data['classes']]
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(names, ['Algorithms', 'Course 0', 'Course 1', 'Course 2', 'Course 3'])
+    
+    def test_not_modified_until_class_changes(self):
+        """Test conditional GETs return 304 until a class is written"""
+        response = self.client.get('/api/classes/')
+        etag = response['ETag']
+        self.assertIn('private', response['Cache-Control'])
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/classes/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        self.classe.name = 'Advanced Algorithms'
+        self.classe.save()
+        response = self.client.get('/api/classes/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['classes'][0]['name'], 'Advanced Algorithms')
+
+
+class ClassQueryBudgetTest(QueryBudgetMixin, APITestCase):
+    """Query and latency budgets of the class endpoints as classes pile up"""
+    
+    def setUp(self):
+        self.professor = User.objects.create_user(
+            username='professor',
+            email='prof@example.com',
+            password='ProfPass123!',
+            role=User.roles.PROFESOR
+        )
+        self.grow = Grower(lambda start, count: Class.objects.bulk_create([
+            Class(name=f'Class {i}', code=f'C{i}', professor=self.professor) for i in range(start, start + count)
+        ]))
+        token = ClaimsRefreshToken.for_user(self.professor).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    
+    def test_class_list_budget(self):
+        """Test listing classes runs a fixed number of queries"""
+        self.assertQueryBudget('/api/classes/', self.grow, max_queries=1, max_ms=250)
+    
+    def test_class_detail_budget(self):
+        """Test a class detail does not depend on the number of classes"""
+        self.grow(1)
+        classe = Class.objects.get()
+        self.assertQueryBudget(f'/api/classes/{classe.id}/', self.grow, max_queries=1, max_ms=250)
+
+
+class EnrollmentTest(APITestCase):
+    """Test cases for bulk enrollment and the cached class rosters"""
+    
+    def setUp(self):
+        cache.clear()
+        tiered_cache.clear()
+        self.professor = User.objects.create_user(
+            username='professor',
+            email='prof@example.com',
+            role=User.roles.PROFESOR
+        )
+        self.classe = Class.objects.create(name='Algorithms', code='ALG101', professor=self.professor)
+        self.students = bulk_users(5, prefix='student')
+        self.url = f'/api/classes/{self.classe.id}/enrollments/'
+        self.login(self.professor)
+    
+    def login(self, user):
+        token = ClaimsRefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    
+    def test_bulk_enroll(self):
+        """Test enrolling students reports new, existing and invalid ids"""
+        ids = [student.id for student in self.students]
+        Enrollment.objects.create(classe=self.classe, student=self.students[0])
+        response = self.client.post(self.url, {'student_ids': ids + [self.professor.id, 999999]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['enrolled'], ids[1:])
+        self.assertEqual(response.data['already_enrolled'], ids[:1])
+        self.assertEqual(response.data['invalid'], [self.professor.id, 999999])
+        self.assertEqual(Enrollment.objects.filter(classe=self.classe).count(), 5)
+    
+    def test_bulk_enroll_queries(self):
+        """Test enrolling many students runs a fixed number of queries"""
+        students = bulk_users(300, prefix='bulk')
+        with self.assertNumQueries(4):
+            self.client.post(self.url, {'student_ids': [student.id for student in students]}, format='json')
+        self.assertEqual(len(get_roster(self.classe.id)), 300)
+    
+    def test_roster_cached_and_invalidated(self):
+        """Test roster reads hit the cache until enrollments change"""
+        self.client.post(self.url, {'student_ids': [self.students[0].id]}, format='json')
+        self.assertTrue(is_enrolled(self.classe.id, self.students[0].id))
+        with self.assertNumQueries(0):
+            self.assertTrue(is_enrolled(self.classe.id, self.students[0].id))
+            self.assertFalse(is_enrolled(self.classe.id, self.students[1].id))
+        response = self.client.delete(self.url, {'student_ids': [self.students[0].id]}, format='json')
+        self.assertEqual(response.data['removed'], 1)
+        self.assertFalse(is_enrolled(self.classe.id, self.students[0].id))
+    
+    def test_roster_listing(self):
+        """Test the roster endpoint lists the enrolled student ids"""
+        Enrollment.objects.bulk_create([
+            Enrollment(classe=self.classe, student=student) for student in reversed(self.students)
+        ])
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['student_ids'], sorted(student.id for student in self.students))
+        self.assertEqual(response.data['count'], 5)
+    
+    def test_enrollment_permissions(self):
+        """Test only the class's professor and admins manage its roster"""
+        other = User.objects.create_user(username='other', email='other@example.com', role=User.roles.PROFESOR)
+        self.login(other)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+        self.login(self.students[0])
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+        admin = User.objects.create_user(username='admin', email='admin@example.com', role=User.roles.ADMIN)
+        self.login(admin)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
 
-# Create your tests here.
+class TermTest(TestCase):
+    """Test cases for terms and the term lookup"""
+    
+    def setUp(self):
+        clear_term_cache()
+        self.term = Term.objects.create(code='2026-fall', start_date=date(2026, 9, 1), end_date=date(2026, 12, 18))
+    
+    def test_overlap_rejected(self):
+        """Test a term overlapping another is refused"""
+        with self.assertRaises(ValidationError):
+            Term.objects.create(code='2026-winter', start_date=date(2026, 12, 1), end_date=date(2027, 2, 28))
+        with self.assertRaises(ValidationError):
+            Term.objects.create(code='backwards', start_date=date(2027, 3, 1), end_date=date(2027, 2, 1))
+        self.term.end_date = date(2026, 12, 20)
+        self.term.save()
+    
+    def test_default_term_trimmed(self):
+        """Test default terms fill the gaps around defined terms without overlapping them"""
+        after = Term.objects.get(pk=term_id_for(date(2026, 12, 24)))
+        self.assertEqual((after.code, after.start_date, after.end_date), ('2026-S2-1219', date(2026, 12, 19), date(2026, 12, 31)))
+        before = Term.objects.get(pk=term_id_for(date(2026, 8, 10)))
+        self.assertEqual((before.code, before.start_date, before.end_date), ('2026-S2', date(2026, 7, 1), date(2026, 8, 31)))
+        self.assertEqual(term_id_for(date(2026, 10, 1)), self.term.id)
+    
+    def test_new_term_seen_at_once(self):
+        """Test a new term retires the cached term list"""
+        term_id_for(date(2026, 10, 1))
+        spring = Term.objects.create(code='2027-spring', start_date=date(2027, 3, 2), end_date=date(2027, 6, 30))
+        with self.assertNumQueries(1):
+            self.assertEqual(term_id_for(date(2027, 3, 5)), spring.id)
@@ -0,0 +1,9 @@
+from django.urls import path
+from .views import ClassDetailView, ClassEnrollmentView, ClassListView
+
+
+urlpatterns = [
+    path('', ClassListView.as_view(), name='class-list'),
+    path('<int:pk>/', ClassDetailView.as_view(), name='class-detail'),
+    path('<int:pk>/enrollments/', ClassEnrollmentView.as_view(), name='class-enrollments'),
+]
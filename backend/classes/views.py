@@ -1,3 +1,91 @@
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from backend.pagination import KeysetPagination
+from caching.conditional import ConditionalGetMixin
+from users.permissions import IsAdmin, IsProfessor
+
+from .models import Class
+from .roster import enroll_students, get_roster, unenroll_students
+from .serializers import ClassSerializer, EnrollmentSerializer
+
+
+class ClassPagination(KeysetPagination):
+    ordering = ('name', 'id')
+    results_key = 'classes'
+
+
+class ClassListView(ConditionalGetMixin, generics.ListAPIView):
+    """
+    API endpoint for classes
+    GET /api/classes/?cursor=&page_size= - The current professor's classes,
+        or every class for other roles, by name a page at a time
+    """
+    serializer_class = ClassSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = ClassPagination
+    etag_models = [Class]
+    
+    def get_queryset(self):
+        queryset = Class.objects.all()
+        if self.request.user.role == 'PROFESSOR':
+            queryset = queryset.filter(professor_id=self.request.user.id)
+        return queryset
+
+
+class ClassDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
+    """
+    API endpoint for a single class
+    GET /api/classes/<id>/
+    """
+    serializer_class = ClassSerializer
+    permission_classes = [IsAuthenticated]
+    etag_models = [Class]
+    queryset = Class.objects.all()
+
+
+class ClassEnrollmentView(APIView):
+    """
+    API endpoint for a class's roster (the class's professor or an admin)
+    GET /api/classes/<id>/enrollments/ - The enrolled student ids
+    POST /api/classes/<id>/enrollments/ - Enroll {"student_ids": [...]}
+    DELETE /api/classes/<id>/enrollments/ - Unenroll {"student_ids": [...]}
+    """
+    permission_classes = [IsAuthenticated, IsProfessor | IsAdmin]
+    
+    def get_class(self, pk):
+        queryset = Class.objects.only('id', 'professor_id')
+        if self.request.user.role == 'PROFESSOR':
+            queryset = queryset.filter(professor_id=self.request.user.id)
+        return get_object_or_404(queryset, pk=pk)
+    
+    def get(self, request, pk):
+        roster = get_roster(self.get_class(pk).id)
+        return Response({
+            'class_id': pk,
+            'count': len(roster),
+            'student_ids': roster.tolist()
+        }, status=status.HTTP_200_OK)
+    
+    def post(self, request, pk):
+        classe = self.get_class(pk)
+        serializer = EnrollmentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = enroll_students(classe.id, serializer.validated_data['student_ids'])
+        return Response({
+            'message': f"Enrolled {len(result['enrolled'])} students",
+            **result
+        }, status=status.HTTP_200_OK)
+    
+    def delete(self, request, pk):
+        classe = self.get_class(pk)
+        serializer = EnrollmentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        removed = unenroll_students(classe.id, serializer.validated_data['student_ids'])
+        return Response({
+            'message': f'Unenrolled {removed} students',
+            'removed': removed
+        }, status=status.HTTP_200_OK)
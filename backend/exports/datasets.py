@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from attendance.archive import records_for_term
+from attendance.models import Attendance
+from classes.models import Term
+
+User = get_user_model()
+
+ATTENDANCE_COLUMNS = (
+    ('session_id', 'session_id'),
+    ('class', 'session__classe__code'),
+    ('session_start', 'session__start_time'),
+    ('username', 'student__username'),
+    ('matricule', 'student__matricule'),
+    ('first_name', 'student__first_name'),
+    ('last_name', 'student__last_name'),
+    ('status', 'status'),
+    ('scanned_at', 'scanned_at'),
+)
+
+USER_COLUMNS = (
+    ('id', 'id'),
+    ('username', 'username'),
+    ('email', 'email'),
+    ('first_name', 'first_name'),
+    ('last_name', 'last_name'),
+    ('role', 'role'),
+    ('matricule', 'matricule'),
+    ('is_active', 'is_active'),
+    ('date_joined', 'date_joined'),
+)
+
+
+def attendance_queryset(params):
+    """
+    Attendance rows, optionally limited to a class (`class_id`) and a term
+    (`term` code). Without a term only terms not yet archived are included;
+    an archived term is read from the archive table.
+    """
+    queryset = Attendance.objects.all()
+    term_code = params.get('term')
+    if term_code:
+        term = Term.objects.filter(code=term_code).first()
+        if term is None:
+            raise ValueError(f"Unknown term '{term_code}'")
+        queryset = records_for_term(term)
+    class_id = params.get('class_id')
+    if class_id:
+        try:
+            queryset = queryset.filter(session__classe_id=int(class_id))
+        except (TypeError, ValueError):
+            raise ValueError('class_id must be an integer')
+    return queryset.order_by('session__start_time', 'id')
+
+
+def user_queryset(params):
+    """Users, optionally filtered by `role` and `is_active` like the user list"""
+    queryset = User.objects.all()
+    role = params.get('role')
+    if role:
+        queryset = queryset.filter(role=role)
+    is_active = params.get('is_active')
+    if is_active is not None:
+        queryset = queryset.filter(is_active=str(is_active).lower() in ('1', 'true', 'yes'))
+    return queryset.order_by('id')
+
+
+DATASETS = {
+    'attendance': (attendance_queryset, ATTENDANCE_COLUMNS),
+    'users': (user_queryset, USER_COLUMNS),
+}
+
+
+def build_export(dataset, params):
+    """
+    Return (headers, rows) for a dataset. Rows are tuples read in chunks of
+    EXPORT_CHUNK_SIZE; on PostgreSQL each chunk comes from a server-side
+    cursor, so memory stays flat whatever the size of the export.
+    Raises ValueError for an unknown dataset or invalid parameters.
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown export '{dataset}'. Must be one of: {', '.join(DATASETS)}")
+    get_queryset, columns = DATASETS[dataset]
+    queryset = get_queryset(params).values_list(*[field for _, field in columns])
+    chunk_size = getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+    return [header for header, _ in columns], queryset.iterator(chunk_size=chunk_size)
@@ -0,0 +1,54 @@
+import logging
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+
+from jobs.queue import enqueue
+
+from .datasets import build_export
+from .models import ExportJob
+from .writers import write_export
+
+logger = logging.getLogger(__name__)
+
+
+def _counted(rows, counter):
+    for row in rows:
+        counter[0] += 1
+        yield row
+
+
+def run_export_job(job_id):
+    """Write a pending export to storage and record the outcome on the job"""
+    job = ExportJob.objects.get(pk=job_id)
+    job.status = ExportJob.statuses.RUNNING
+    job.save(update_fields=['status'])
+    counter = [0]
+    try:
+        headers, rows = build_export(job.dataset, job.params)
+        with tempfile.TemporaryFile() as tmp:
+            write_export(job.format, headers, _counted(rows, counter), tmp)
+            tmp.seek(0)
+            job.file.save(f'{job.dataset}-{job.id}.{job.format}', File(tmp), save=False)
+        job.status = ExportJob.statuses.DONE
+        job.row_count = counter[0]
+    except Exception as e:
+        logger.exception('Export job %s failed', job_id)
+        job.status = ExportJob.statuses.FAILED
+        job.error = str(e)
+    job.finished_at = timezone.now()
+    job.save()
+
+
+def enqueue_export(job):
+    """
+    Hand a job to the job queue, to be run by a `run_jobs` worker once the
+    transaction creating it commits, or run it inline when EXPORT_JOBS_ASYNC
+    is off. A job whose worker is lost is requeued and written again.
+    """
+    if not getattr(settings, 'EXPORT_JOBS_ASYNC', True):
+        run_export_job(job.id)
+        return
+    enqueue('exports.run', {'job_id': job.id}, created_by_id=job.created_by_id)
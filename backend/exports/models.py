@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.db import models
+
+
+class ExportJob(models.Model):
+    """An export written to storage in the background (see exports.jobs)"""
+
+    class statuses(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='export_jobs'
+    )
+    dataset = models.CharField(max_length=20)
+    format = models.CharField(max_length=10)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=statuses.choices, default=statuses.PENDING)
+    file = models.FileField(upload_to='exports/', blank=True)
+    row_count = models.PositiveIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.dataset}.{self.format} ({self.status})'
@@ -0,0 +1,43 @@
+from django.urls import reverse
+from rest_framework import serializers
+
+from .datasets import DATASETS, build_export
+from .models import ExportJob
+from .writers import CONTENT_TYPES, xlsx_available
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    """Serializer for background export jobs"""
+    
+    dataset = serializers.ChoiceField(choices=list(DATASETS))
+    format = serializers.ChoiceField(choices=list(CONTENT_TYPES), default='csv')
+    params = serializers.DictField(child=serializers.CharField(), required=False)
+    download_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ExportJob
+        fields = [
+            'id', 'dataset', 'format', 'params', 'status', 'row_count',
+            'error', 'created_at', 'finished_at', 'download_url'
+        ]
+        read_only_fields = ['id', 'status', 'row_count', 'error', 'created_at', 'finished_at']
+    
+    def get_download_url(self, obj):
+        if obj.status != ExportJob.statuses.DONE:
+            return None
+        url = reverse('export-job-download', args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+    
+    def validate_format(self, value):
+        if value == 'xlsx' and not xlsx_available():
+            raise serializers.ValidationError('XLSX exports require the openpyxl package')
+        return value
+    
+    def validate(self, attrs):
+        """Reject invalid filters now rather than in the background job"""
+        try:
+            build_export(attrs['dataset'], attrs.get('params', {}))
+        except ValueError as e:
+            raise serializers.ValidationError({'params': str(e)})
+        return attrs
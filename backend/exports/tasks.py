@@ -0,0 +1,10 @@
+from jobs.queue import task
+
+from .jobs import run_export_job
+
+
+@task('exports.run')
+def run_export(job_id):
+    # The export records its own outcome on the ExportJob, so only a lost
+    # worker makes the queue retry it
+    run_export_job(job_id)
@@ -0,0 +1,152 @@
+import csv
+import io
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from attendance.models import Attendance
+from classes.models import Class, Term
+from classes.terms import clear_term_cache
+from jobs.models import Job
+from jobs.queue import claim_jobs, run_job
+from session.models import Session
+from users.tokens import ClaimsRefreshToken
+
+from .models import ExportJob
+from .writers import csv_chunks
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def read_csv(content):
+    return list(csv.reader(io.StringIO(content.decode('utf-8'))))
+
+
+class CsvChunksTest(SimpleTestCase):
+    """Test cases for the CSV stream writer"""
+    
+    def test_rows_batched(self):
+        """Test rows are emitted in bounded chunks"""
+        rows = ([i, f'name{i}'] for i in range(1200))
+        chunks = list(csv_chunks(['id', 'name'], rows, batch_size=500))
+        self.assertEqual(len(chunks), 3)
+        parsed = read_csv(b''.join(chunks))
+        self.assertEqual(parsed[0], ['id', 'name'])
+        self.assertEqual(len(parsed), 1201)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, EXPORT_JOBS_ASYNC=False, EXPORT_CHUNK_SIZE=2)
+class ExportViewsTest(APITestCase):
+    """Test cases for the export endpoints"""
+    
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+    
+    def setUp(self):
+        clear_term_cache()
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='AdminPass123!', role=User.roles.ADMIN
+        )
+        self.professor = User.objects.create_user(
+            username='professor', email='prof@example.com', role=User.roles.PROFESOR
+        )
+        self.classe = Class.objects.create(name='Algorithms', code='ALG101', professor=self.professor)
+        other = Class.objects.create(name='Databases', code='DB201', professor=self.professor)
+        Term.objects.create(code='2026-S1', start_date=date(2026, 1, 1), end_date=date(2026, 6, 30))
+        self.students = [
+            User.objects.create_user(username=f'student{i}', email=f's{i}@example.com', role=User.roles.STUDENT)
+            for i in range(5)
+        ]
+        for classe, day in ((self.classe, 10), (self.classe, 200), (other, 10)):
+            start = timezone.make_aware(datetime(2026, 1, 1)) + timedelta(days=day)
+            session = Session.objects.create(classe=classe, professor=self.professor, start_time=start)
+            Attendance.objects.bulk_create([
+                Attendance(session=session, student=student, scanned_at=start) for student in self.students
+            ])
+        token = ClaimsRefreshToken.for_user(self.admin).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    
+    def test_attendance_csv_streamed(self):
+        """Test the attendance export streams the filtered rows"""
+        response = self.client.get(
+            '/api/exports/attendance/csv/', {'class_id': self.classe.id, 'term': '2026-S1'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment', response['Content-Disposition'])
+        rows = read_csv(b''.join(response.streaming_content))
+        self.assertEqual(rows[0][:2], ['session_id', 'class'])
+        self.assertEqual(len(rows), 6)
+        self.assertEqual({row[1] for row in rows[1:]}, {'ALG101'})
+    
+    def test_users_csv_filtered(self):
+        """Test the user export applies the role filter"""
+        response = self.client.get('/api/exports/users/csv/', {'role': 'STUDENT'})
+        rows = read_csv(b''.join(response.streaming_content))
+        self.assertEqual([row[1] for row in rows[1:]], [s.username for s in self.students])
+    
+    def test_invalid_requests(self):
+        """Test unknown datasets, formats and terms are rejected"""
+        for url in ('/api/exports/grades/csv/', '/api/exports/users/pdf/'):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/exports/attendance/csv/', {'term': '1999-S1'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Unknown term', response.data['error'])
+    
+    def test_admin_only(self):
+        """Test non-admins cannot export"""
+        token = ClaimsRefreshToken.for_user(self.professor).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.get('/api/exports/users/csv/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+    
+    def test_background_job(self):
+        """Test a queued export is written to storage and downloadable"""
+        response = self.client.post('/api/exports/jobs/', {
+            'dataset': 'attendance', 'format': 'csv', 'params': {'class_id': str(self.classe.id)}
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = response.data['job']
+        self.assertEqual(job['status'], ExportJob.statuses.DONE)
+        self.assertEqual(job['row_count'], 10)
+    
+        response = self.client.get(f"/api/exports/jobs/{job['id']}/download/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = read_csv(b''.join(response.streaming_content))
+        self.assertEqual(len(rows), 11)
+    
+    @override_settings(EXPORT_JOBS_ASYNC=True)
+    def test_background_job_on_queue(self):
+        """Test background exports are handed to the job queue's workers"""
+        response = self.client.post('/api/exports/jobs/', {'dataset': 'users', 'format': 'csv'}, format='json')
+        self.assertEqual(response.data['job']['status'], ExportJob.statuses.PENDING)
+        queued = Job.objects.get(task='exports.run')
+        self.assertEqual(queued.created_by_id, self.admin.id)
+        # Sessions in the fixtures queue their auto-close sweeps too
+        for claimed in claim_jobs('test', 10):
+            run_job(claimed)
+        self.assertEqual(ExportJob.objects.get(pk=response.data['job']['id']).status, ExportJob.statuses.DONE)
+    
+    def test_job_params_validated(self):
+        """Test invalid job parameters are rejected before queueing"""
+        response = self.client.post('/api/exports/jobs/', {
+            'dataset': 'attendance', 'params': {'term': 'nope'}
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ExportJob.objects.exists())
+    
+    def test_unfinished_job_not_downloadable(self):
+        """Test downloading a pending job is refused"""
+        job = ExportJob.objects.create(created_by=self.admin, dataset='users', format='csv')
+        response = self.client.get(f'/api/exports/jobs/{job.id}/download/')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
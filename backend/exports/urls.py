@@ -0,0 +1,10 @@
+from django.urls import path
+from .views import ExportJobDetailView, ExportJobDownloadView, ExportJobListView, ExportView
+
+
+urlpatterns = [
+    path('jobs/', ExportJobListView.as_view(), name='export-job-list'),
+    path('jobs/<int:pk>/', ExportJobDetailView.as_view(), name='export-job-detail'),
+    path('jobs/<int:pk>/download/', ExportJobDownloadView.as_view(), name='export-job-download'),
+    path('<slug:dataset>/<slug:file_format>/', ExportView.as_view(), name='export'),
+]
@@ -0,0 +1,109 @@
+import tempfile
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import generics, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from users.permissions import IsAdmin
+
+from .datasets import build_export
+from .jobs import enqueue_export
+from .models import ExportJob
+from .serializers import ExportJobSerializer
+from .writers import CONTENT_TYPES, csv_chunks, write_xlsx, xlsx_available
+
+
+class ExportView(APIView):
+    """
+    API endpoint for streamed exports (Admin only)
+    GET /api/exports/attendance/<csv|xlsx>/?class_id=&term= - Attendance records
+    GET /api/exports/users/<csv|xlsx>/?role=&is_active= - User roster
+    
+    CSV is streamed as rows are read. XLSX is assembled in a temporary file
+    before the first byte is sent; use /api/exports/jobs/ for large ones.
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+    
+    def get(self, request, dataset, file_format):
+        if file_format not in CONTENT_TYPES:
+            return Response({
+                'error': f"Unsupported format '{file_format}'. Must be 'csv' or 'xlsx'."
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if file_format == 'xlsx' and not xlsx_available():
+            return Response({
+                'error': 'XLSX exports require the openpyxl package'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            headers, rows = build_export(dataset, request.query_params)
+        except ValueError as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+    
+        filename = f'{dataset}-{timezone.localdate().isoformat()}.{file_format}'
+        if file_format == 'xlsx':
+            tmp = tempfile.TemporaryFile()
+            write_xlsx(headers, rows, tmp)
+            tmp.seek(0)
+            return FileResponse(tmp, as_attachment=True, filename=filename, content_type=CONTENT_TYPES['xlsx'])
+        response = StreamingHttpResponse(csv_chunks(headers, rows), content_type=CONTENT_TYPES['csv'])
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class ExportJobListView(generics.ListCreateAPIView):
+    """
+    API endpoint for background exports (Admin only)
+    GET /api/exports/jobs/ - List the current admin's export jobs
+    POST /api/exports/jobs/ - Queue an export: {"dataset", "format", "params"}
+    """
+    serializer_class = ExportJobSerializer
+    permission_classes = [IsAuthenticated, IsAdmin]
+    
+    def get_queryset(self):
+        return ExportJob.objects.filter(created_by_id=self.request.user.id).order_by('-created_at')
+    
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = serializer.save(created_by_id=request.user.id)
+        enqueue_export(job)
+        job.refresh_from_db()
+        return Response({
+            'job': self.get_serializer(job).data,
+            'message': 'Export queued'
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class ExportJobDetailView(generics.RetrieveAPIView):
+    """
+    API endpoint for an export job's status (Admin only)
+    GET /api/exports/jobs/<id>/
+    """
+    serializer_class = ExportJobSerializer
+    permission_classes = [IsAuthenticated, IsAdmin]
+    
+    def get_queryset(self):
+        return ExportJob.objects.filter(created_by_id=self.request.user.id)
+
+
+class ExportJobDownloadView(ExportJobDetailView):
+    """
+    API endpoint for downloading a finished export (Admin only)
+    GET /api/exports/jobs/<id>/download/
+    """
+    
+    def retrieve(self, request, *args, **kwargs):
+        job = self.get_object()
+        if job.status != ExportJob.statuses.DONE:
+            return Response({
+                'error': f'Export is {job.status}'
+            }, status=status.HTTP_409_CONFLICT)
+        filename = f'{job.dataset}-{job.created_at.date().isoformat()}.{job.format}'
+        return FileResponse(
+            job.file.open('rb'), as_attachment=True, filename=filename,
+            content_type=CONTENT_TYPES[job.format]
+        )
@@ -0,0 +1,69 @@
+import csv
+import importlib.util
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.exceptions import ImproperlyConfigured
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def xlsx_available():
+    return importlib.util.find_spec('openpyxl') is not None
+
+
+class Echo:
+    """File-like object handing back what csv.writer writes to it"""
+
+    def write(self, value):
+        return value
+
+
+def csv_chunks(headers, rows, batch_size=500):
+    """
+    Yield CSV as UTF-8 chunks of up to `batch_size` rows, so only one chunk
+    is held in memory however many rows `rows` produces.
+    """
+    writer = csv.writer(Echo())
+    lines = [writer.writerow(headers)]
+    for row in rows:
+        lines.append(writer.writerow(row))
+        if len(lines) >= batch_size:
+            yield ''.join(lines).encode('utf-8')
+            lines = []
+    if lines:
+        yield ''.join(lines).encode('utf-8')
+
+
+def _excel_value(value):
+    # Excel has no time zones; datetimes are written in UTC
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(dt_timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def write_xlsx(headers, rows, fileobj):
+    """
+    Write an XLSX workbook to `fileobj`. openpyxl's write-only mode spools
+    rows to a temporary file instead of building the sheet in memory.
+    """
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ImproperlyConfigured('XLSX exports require the openpyxl package')
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('export')
+    sheet.append(headers)
+    for row in rows:
+        sheet.append([_excel_value(value) for value in row])
+    workbook.save(fileobj)
+
+
+def write_export(file_format, headers, rows, fileobj):
+    if file_format == 'xlsx':
+        write_xlsx(headers, rows, fileobj)
+    else:
+        for chunk in csv_chunks(headers, rows):
+            fileobj.write(chunk)
@@ -0,0 +1,22 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs until stopped (SIGTERM or Ctrl-C lets running jobs finish)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, help='jobs run at once (default JOBS_WORKER_CONCURRENCY)')
+        parser.add_argument('--poll-interval', type=float, help='seconds between polls of an idle queue')
+        parser.add_argument('--burst', action='store_true', help='exit once no job is due')
+
+    def handle(self, *args, **options):
+        worker = Worker(concurrency=options['concurrency'], poll_interval=options['poll_interval'])
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: worker.stop())
+        self.stdout.write(f'Worker {worker.worker_id} running {worker.concurrency} jobs at a time')
+        processed = worker.run(burst=options['burst'])
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} jobs'))
@@ -0,0 +1,178 @@
+"""
+A job queue kept in the database, so deferred work needs no broker.
+
+Tasks are plain functions registered with @task in an app's tasks.py and
+called with the job's JSON payload as keyword arguments; what they return
+is stored as the job's result and must be JSON serializable:
+
+    @task('exports.run')
+    def run(job_id): ...
+
+    enqueue('exports.run', {'job_id': 42})
+
+Tasks registered with `every=<seconds>` are periodic: running workers
+queue them again that long after their last run (see schedule_periodic),
+so maintenance such as token pruning needs no cron entry. Two workers may
+occasionally queue the same run, so periodic tasks must be idempotent.
+
+The `run_jobs` command claims due jobs and runs them (see jobs.worker).
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+# Periodic tasks: name -> seconds between runs
+PERIODIC = {}
+
+
+def task(name, max_attempts=None, every=None):
+    """Register a function as the task `name`, run every `every` seconds if given"""
+    def register(func):
+        if name in TASKS and TASKS[name][0] is not func:
+            raise ValueError(f"Task '{name}' is already registered")
+        TASKS[name] = (func, max_attempts)
+        if every:
+            PERIODIC[name] = every
+        return func
+    return register
+
+
+def enqueue(name, payload=None, run_after=None, max_attempts=None, created_by_id=None, unique=False):
+    """
+    Queue a run of task `name`. Inside a transaction the job becomes
+    visible to workers only when it commits, like the rows it works on.
+    With `unique`, a queued job with the same task, payload and run_after
+    is returned instead of queueing another.
+    """
+    if name not in TASKS:
+        raise ValueError(f"Unknown task '{name}'")
+    payload = payload or {}
+    run_after = run_after or timezone.now()
+    if unique:
+        queued = Job.objects.filter(
+            task=name, payload=payload, run_after=run_after, status=Job.statuses.QUEUED
+        ).first()
+        if queued is not None:
+            return queued
+    attempts = max_attempts or TASKS[name][1] or getattr(settings, 'JOBS_MAX_ATTEMPTS', 3)
+    return Job.objects.create(
+        task=name,
+        payload=payload,
+        run_after=run_after,
+        max_attempts=attempts,
+        created_by_id=created_by_id,
+    )
+
+
+def claim_jobs(worker_id, limit):
+    """
+    Lock up to `limit` due jobs for this worker and mark them running.
+
+    On PostgreSQL concurrent workers skip each other's rows with
+    SELECT ... FOR UPDATE SKIP LOCKED. SQLite ignores the clause, but its
+    write transactions (IMMEDIATE, see backend/database.py) already run
+    one at a time, and the status condition on the update keeps a job
+    from being claimed twice either way.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.statuses.QUEUED, run_after__lte=now)
+            .order_by('run_after', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        Job.objects.filter(id__in=ids, status=Job.statuses.QUEUED).update(
+            status=Job.statuses.RUNNING, locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1
+        )
+        return list(Job.objects.filter(id__in=ids, locked_by=worker_id, locked_at=now))
+
+
+def schedule_periodic():
+    """
+    Queue every periodic task that has no queued or running job, due its
+    interval after its last run finished (now if it never ran). Returns
+    the jobs queued.
+    """
+    if not PERIODIC:
+        return []
+    pending = set(Job.objects.filter(
+        task__in=PERIODIC, status__in=[Job.statuses.QUEUED, Job.statuses.RUNNING]
+    ).values_list('task', flat=True))
+    last_runs = dict(
+        Job.objects.filter(task__in=PERIODIC, finished_at__isnull=False)
+        .values('task').annotate(last=Max('finished_at')).values_list('task', 'last')
+    )
+    now = timezone.now()
+    queued = []
+    for name, every in PERIODIC.items():
+        if name in pending:
+            continue
+        last = last_runs.get(name)
+        run_after = max(now, last + timedelta(seconds=every)) if last else now
+        queued.append(enqueue(name, run_after=run_after))
+    return queued
+
+
+def has_due_jobs():
+    return Job.objects.filter(status=Job.statuses.QUEUED, run_after__lte=timezone.now()).exists()
+
+
+def retry_delay(attempts):
+    """Exponential backoff: JOBS_RETRY_BACKOFF seconds, doubled per failed attempt"""
+    base = getattr(settings, 'JOBS_RETRY_BACKOFF', 10)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), getattr(settings, 'JOBS_RETRY_BACKOFF_MAX', 3600)))
+
+
+def run_job(job):
+    """Run a claimed job and record its result, its retry or its failure"""
+    entry = TASKS.get(job.task)
+    try:
+        if entry is None:
+            raise LookupError(f"Unknown task '{job.task}'")
+        job.result = entry[0](**job.payload)
+        job.status = Job.statuses.DONE
+        job.error = ''
+        job.finished_at = timezone.now()
+    except Exception:
+        logger.exception('Job %s (%s) failed, attempt %s of %s', job.pk, job.task, job.attempts, job.max_attempts)
+        job.error = traceback.format_exc(limit=5)
+        if entry is not None and job.attempts < job.max_attempts:
+            job.status = Job.statuses.QUEUED
+            job.run_after = timezone.now() + retry_delay(job.attempts)
+        else:
+            job.status = Job.statuses.FAILED
+            job.finished_at = timezone.now()
+    job.locked_by = ''
+    job.locked_at = None
+    job.save(update_fields=[
+        'result', 'status', 'error', 'run_after', 'finished_at', 'locked_by', 'locked_at'
+    ])
+    return job
+
+
+def requeue_stale(timeout=None):
+    """
+    Return jobs locked for longer than JOBS_LOCK_TIMEOUT seconds, whose
+    worker died, to the queue; those out of attempts are marked failed.
+    Returns the number of jobs requeued.
+    """
+    timeout = timeout or getattr(settings, 'JOBS_LOCK_TIMEOUT', 3600)
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.statuses.RUNNING, locked_at__lt=now - timedelta(seconds=timeout))
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.statuses.FAILED, locked_by='', locked_at=None, finished_at=now, error='Worker lost'
+    )
+    return stale.update(status=Job.statuses.QUEUED, locked_by='', locked_at=None)
@@ -0,0 +1,15 @@
+from rest_framework import serializers
+
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Serializer for background jobs"""
+    
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'task', 'status', 'attempts', 'max_attempts', 'run_after',
+            'result', 'error', 'created_at', 'finished_at'
+        ]
+        read_only_fields = fields
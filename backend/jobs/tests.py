@@ -0,0 +1,180 @@
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from users.tokens import ClaimsRefreshToken
+
+from .models import Job
+from .queue import PERIODIC, claim_jobs, enqueue, requeue_stale, run_job, schedule_periodic, task
+from .worker import Worker
+
+User = get_user_model()
+
+
+@task('tests.add')
+def add(a, b):
+    return a + b
+
+
+@task('tests.fail', max_attempts=2)
+def fail():
+    raise RuntimeError('boom')
+
+
+class JobQueueTest(TestCase):
+    """Test cases for queueing, claiming and running jobs"""
+    
+    def run_due(self, limit=10):
+        return [run_job(job) for job in claim_jobs('test-worker', limit)]
+    
+    def test_job_runs(self):
+        """Test a queued job runs once and stores its result"""
+        job = enqueue('tests.add', {'a': 1, 'b': 2})
+        self.run_due()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.statuses.DONE)
+        self.assertEqual(job.result, 3)
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(self.run_due(), [])
+    
+    def test_unknown_task_rejected(self):
+        """Test only registered tasks can be queued"""
+        with self.assertRaises(ValueError):
+            enqueue('tests.missing')
+    
+    def test_unique_enqueue(self):
+        """Test a unique job is queued once per task, payload and run time"""
+        run_after = timezone.now() + timedelta(minutes=5)
+        first = enqueue('tests.add', {'a': 1, 'b': 2}, run_after=run_after, unique=True)
+        self.assertEqual(enqueue('tests.add', {'a': 1, 'b': 2}, run_after=run_after, unique=True), first)
+        enqueue('tests.add', {'a': 1, 'b': 3}, run_after=run_after, unique=True)
+        enqueue('tests.add', {'a': 1, 'b': 2}, run_after=run_after + timedelta(seconds=1), unique=True)
+        self.assertEqual(Job.objects.count(), 3)
+    
+    @override_settings(JOBS_RETRY_BACKOFF=10)
+    def test_retry_with_backoff(self):
+        """Test failed jobs are retried later until they run out of attempts"""
+        job = enqueue('tests.fail')
+        before = timezone.now()
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            self.run_due()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.statuses.QUEUED)
+        self.assertIn('boom', job.error)
+        self.assertGreaterEqual(job.run_after, before + timedelta(seconds=10))
+        self.assertEqual(self.run_due(), [])
+    
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            self.run_due()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.statuses.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertIsNotNone(job.finished_at)
+    
+    def test_claim_order_and_limit(self):
+        """Test claims take the oldest due jobs and skip claimed or future ones"""
+        first = enqueue('tests.add', {'a': 1, 'b': 1}, run_after=timezone.now() - timedelta(minutes=1))
+        second = enqueue('tests.add', {'a': 2, 'b': 2})
+        enqueue('tests.add', {'a': 3, 'b': 3}, run_after=timezone.now() + timedelta(hours=1))
+        self.assertEqual([job.id for job in claim_jobs('a', 1)], [first.id])
+        self.assertEqual([job.id for job in claim_jobs('b', 10)], [second.id])
+        self.assertEqual(claim_jobs('c', 10), [])
+    
+    def test_periodic_tasks_scheduled(self):
+        """Test periodic tasks are queued once, then again their interval after the last run"""
+        with mock.patch.dict(PERIODIC, {'tests.add': 3600}, clear=True):
+            first = schedule_periodic()
+            self.assertEqual([job.task for job in first], ['tests.add'])
+            self.assertEqual(schedule_periodic(), [])
+            Job.objects.filter(pk=first[0].pk).update(
+                status=Job.statuses.DONE, finished_at=timezone.now() - timedelta(minutes=10)
+            )
+            second = schedule_periodic()
+        self.assertEqual(len(second), 1)
+        self.assertAlmostEqual(
+            (second[0].run_after - timezone.now()).total_seconds(), 3000, delta=60
+        )
+    
+    def test_stale_jobs_requeued(self):
+        """Test jobs locked by a lost worker return to the queue"""
+        job = enqueue('tests.add', {'a': 1, 'b': 2})
+        claim_jobs('lost-worker', 1)
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(requeue_stale(timeout=3600), 1)
+        self.run_due()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.statuses.DONE)
+        self.assertEqual(job.attempts, 2)
+
+
+class WorkerTest(TransactionTestCase):
+    """Test cases for the run_jobs worker"""
+    
+    def test_burst_runs_due_jobs(self):
+        """Test a burst worker runs every due job and exits"""
+        for i in range(3):
+            enqueue('tests.add', {'a': i, 'b': i})
+        processed = Worker(concurrency=1, poll_interval=0.01).run(burst=True)
+        self.assertEqual(processed, 3)
+        self.assertEqual(
+            sorted(Job.objects.values_list('result', flat=True)), [0, 2, 4]
+        )
+    
+    def test_stale_jobs_requeued_while_running(self):
+        """Test a running worker picks up the jobs of a worker lost after it started"""
+        job = enqueue('tests.add', {'a': 1, 'b': 2})
+        worker = Worker(concurrency=1, poll_interval=0.01, requeue_interval=0.01)
+        thread = threading.Thread(target=worker.run)
+        with mock.patch('jobs.worker.claim_jobs', wraps=claim_jobs) as claim:
+            # The job is held by a dead worker until this worker has started
+            claim_jobs('lost-worker', 1)
+            thread.start()
+            while claim.call_count < 2:
+                time.sleep(0.01)
+            Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=2))
+            deadline = time.monotonic() + 5
+            while not Job.objects.filter(pk=job.pk, status=Job.statuses.DONE).exists() and time.monotonic() < deadline:
+                time.sleep(0.01)
+        worker.stop()
+        thread.join()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.statuses.DONE)
+
+
+class JobViewsTest(APITestCase):
+    """Test cases for the job status endpoints"""
+    
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com', role=User.roles.PROFESOR)
+        self.other = User.objects.create_user(username='other', email='other@example.com', role=User.roles.PROFESOR)
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com', role=User.roles.ADMIN)
+        self.job = enqueue('tests.add', {'a': 1, 'b': 2}, created_by_id=self.owner.id)
+    
+    def login(self, user):
+        token = ClaimsRefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    
+    def test_owner_sees_job(self):
+        """Test users can follow the jobs they started"""
+        self.login(self.owner)
+        response = self.client.get(f'/api/jobs/{self.job.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], Job.statuses.QUEUED)
+        self.assertEqual(len(self.client.get('/api/jobs/').data), 1)
+    
+    def test_jobs_scoped_to_owner(self):
+        """Test other users cannot see a job while admins see all of them"""
+        self.login(self.other)
+        self.assertEqual(self.client.get(f'/api/jobs/{self.job.id}/').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get('/api/jobs/').data, [])
+        self.login(self.admin)
+        self.assertEqual(len(self.client.get('/api/jobs/?status=queued').data), 1)
+        self.assertEqual(self.client.get('/api/jobs/?status=done').data, [])
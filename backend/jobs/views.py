@@ -0,0 +1,41 @@
+from rest_framework import generics
+from rest_framework.permissions import IsAuthenticated
+
+from .models import Job
+from .serializers import JobSerializer
+
+
+class JobScopeMixin:
+    """Admins see every job, other users the jobs they started"""
+    
+    def get_queryset(self):
+        queryset = Job.objects.order_by('-created_at', '-id')
+        if self.request.user.role != 'ADMIN':
+            queryset = queryset.filter(created_by_id=self.request.user.id)
+        return queryset
+
+
+class JobListView(JobScopeMixin, generics.ListAPIView):
+    """
+    API endpoint for background jobs
+    GET /api/jobs/?status=&task= - The latest 100 jobs, newest first
+    """
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        for field in ('status', 'task'):
+            value = self.request.query_params.get(field)
+            if value:
+                queryset = queryset.filter(**{field: value})
+        return queryset[:100]
+
+
+class JobDetailView(JobScopeMixin, generics.RetrieveAPIView):
+    """
+    API endpoint for the status of a background job
+    GET /api/jobs/<id>/
+    """
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
@@ -0,0 +1,94 @@
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .queue import claim_jobs, has_due_jobs, requeue_stale, run_job, schedule_periodic
+
+
+def _run_in_thread(job):
+    try:
+        run_job(job)
+    finally:
+        close_old_connections()
+
+
+class Worker:
+    """
+    Claims due jobs and runs up to `concurrency` of them at once on a
+    thread pool, polling every `poll_interval` seconds while the queue is
+    idle. Every `requeue_interval` seconds it also returns the jobs of lost
+    workers to the queue, so a dead worker's jobs do not wait for a restart,
+    and, unless it runs in burst mode, queues the periodic tasks that are due.
+    stop() lets running jobs finish and claims nothing more.
+    """
+
+    def __init__(self, concurrency=None, poll_interval=None, requeue_interval=None):
+        self.concurrency = concurrency or getattr(settings, 'JOBS_WORKER_CONCURRENCY', 4)
+        self.poll_interval = poll_interval or getattr(settings, 'JOBS_POLL_INTERVAL', 1.0)
+        self.requeue_interval = requeue_interval or getattr(settings, 'JOBS_REQUEUE_INTERVAL', 60)
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self._stopping = threading.Event()
+        self._slots = threading.Semaphore(self.concurrency)
+        self.processed = 0
+        self._processed_lock = threading.Lock()
+
+    def stop(self):
+        self._stopping.set()
+
+    def _release(self, future):
+        with self._processed_lock:
+            self.processed += 1
+        self._slots.release()
+
+    def _free_slots(self):
+        """Take every free slot, waiting for at least one"""
+        self._slots.acquire()
+        taken = 1
+        while taken < self.concurrency and self._slots.acquire(blocking=False):
+            taken += 1
+        return taken
+
+    def run(self, burst=False):
+        """
+        Process jobs until stop() is called, or with `burst` until no job is
+        due. Returns the number of jobs run.
+        """
+        next_requeue = 0
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix='job') as pool:
+            while not self._stopping.is_set():
+                slots = self._free_slots()
+                try:
+                    if time.monotonic() >= next_requeue:
+                        requeue_stale()
+                        if not burst:
+                            schedule_periodic()
+                        next_requeue = time.monotonic() + self.requeue_interval
+                    jobs = claim_jobs(self.worker_id, slots)
+                finally:
+                    close_old_connections()
+                for _ in range(slots - len(jobs)):
+                    self._slots.release()
+                for job in jobs:
+                    pool.submit(_run_in_thread, job).add_done_callback(self._release)
+                if not jobs:
+                    if burst and self._idle():
+                        # A job that just finished may have queued another
+                        if not has_due_jobs():
+                            break
+                        continue
+                    self._stopping.wait(self.poll_interval)
+        return self.processed
+
+    def _idle(self):
+        """Whether every slot is free, i.e. no job is still running"""
+        taken = 0
+        while self._slots.acquire(blocking=False):
+            taken += 1
+        for _ in range(taken):
+            self._slots.release()
+        return taken == self.concurrency
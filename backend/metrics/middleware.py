@@ -0,0 +1,112 @@
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .registry import request_metrics
+
+logger = logging.getLogger(__name__)
+
+# The counter of the request being handled. Context variables follow a
+# request into the threads sync_to_async runs its sync parts on, where
+# thread-local connection wrappers would not reach.
+current_counter = ContextVar('metrics_query_counter', default=None)
+
+
+class QueryCounter:
+    """Database execute wrapper counting the queries of one request and their time"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+def count_query(execute, sql, params, many, context):
+    counter = current_counter.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    return counter(execute, sql, params, many, context)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """connection_created receiver adding count_query to every connection once"""
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, count_query)
+
+
+def view_label(request):
+    """The resolved URL name of a request, namespaced like reverse() expects"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match.route
+
+
+class MetricsMiddleware:
+    """
+    Record the latency, query count and database time of every request
+    under its URL name, and log requests slower than METRICS_SLOW_REQUEST_MS
+    or running more than METRICS_SLOW_REQUEST_QUERIES queries. Queries run
+    while a streamed response is consumed are not counted.
+
+    Works in both sync and async chains, like Django's MiddlewareMixin, so
+    under ASGI async views are not pushed onto the thread pool.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        counter = QueryCounter()
+        token = current_counter.set(counter)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_counter.reset(token)
+        self.record(request, response, time.perf_counter() - started, counter)
+        return response
+
+    async def __acall__(self, request):
+        counter = QueryCounter()
+        token = current_counter.set(counter)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_counter.reset(token)
+        self.record(request, response, time.perf_counter() - started, counter)
+        return response
+
+    def record(self, request, response, elapsed, counter):
+        view = view_label(request)
+        slow = (
+            elapsed * 1000 >= getattr(settings, 'METRICS_SLOW_REQUEST_MS', 500)
+            or counter.count >= getattr(settings, 'METRICS_SLOW_REQUEST_QUERIES', 50)
+        )
+        request_metrics.observe(
+            view, request.method, response.status_code, elapsed, counter.count, counter.seconds, slow=slow
+        )
+        if slow:
+            logger.warning(
+                'Slow request %s %s (%s): %d in %.0f ms, %d queries in %.0f ms',
+                request.method, request.path, view, response.status_code,
+                elapsed * 1000, counter.count, counter.seconds * 1000
+            )
@@ -0,0 +1,152 @@
+import threading
+from bisect import bisect_left
+
+from caching.tiered import tiered_cache
+
+# Upper bounds of the latency buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in pairs) + '}'
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """A monotonically increasing count per combination of label values"""
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+
+    def inc(self, *label_values, amount=1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def samples(self):
+        for label_values, value in sorted(self._values.items()):
+            yield self.name, format_labels(self.labels, label_values), value
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per combination of label values"""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+
+    def observe(self, value, *label_values):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = {'buckets': [0] * len(self.buckets), 'sum': 0, 'count': 0}
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series['buckets'][index] += 1
+        series['sum'] += value
+        series['count'] += 1
+
+    def count(self, *label_values):
+        series = self._series.get(label_values)
+        return series['count'] if series else 0
+
+    def samples(self):
+        for label_values, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, hits in zip(self.buckets, series['buckets']):
+                cumulative += hits
+                yield f'{self.name}_bucket', format_labels(self.labels, label_values, [('le', format_value(bound))]), cumulative
+            yield f'{self.name}_bucket', format_labels(self.labels, label_values, [('le', '+Inf')]), series['count']
+            yield f'{self.name}_sum', format_labels(self.labels, label_values), series['sum']
+            yield f'{self.name}_count', format_labels(self.labels, label_values), series['count']
+
+
+class RequestMetrics:
+    """
+    Per-process request metrics, labelled by resolved URL name. Every
+    worker process keeps its own counters, so scrape each worker (or run
+    one) to see the whole picture.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._create()
+
+    def _create(self):
+        self.requests = Counter(
+            'attendify_http_requests_total', 'Requests handled', ('view', 'method', 'status')
+        )
+        self.latency = Histogram(
+            'attendify_http_request_duration_seconds', 'Time spent handling requests', ('view', 'method')
+        )
+        self.queries = Histogram(
+            'attendify_http_request_queries', 'Database queries run per request', ('view', 'method'),
+            buckets=QUERY_BUCKETS
+        )
+        self.db_time = Histogram(
+            'attendify_http_request_db_seconds', 'Time spent in the database per request', ('view', 'method')
+        )
+        self.slow = Counter(
+            'attendify_http_slow_requests_total', 'Requests over the slow request thresholds', ('view', 'method')
+        )
+
+    def observe(self, view, method, status, seconds, queries, db_seconds, slow=False):
+        with self._lock:
+            self.requests.inc(view, method, str(status))
+            self.latency.observe(seconds, view, method)
+            self.queries.observe(queries, view, method)
+            self.db_time.observe(db_seconds, view, method)
+            if slow:
+                self.slow.inc(view, method)
+
+    def render(self):
+        with self._lock:
+            return render_metrics([self.requests, self.latency, self.queries, self.db_time, self.slow])
+
+    def reset(self):
+        with self._lock:
+            self._create()
+
+
+request_metrics = RequestMetrics()
+
+
+def cache_metrics():
+    """The tiered cache's lookup counters as a Prometheus counter"""
+    lookups = Counter('attendify_cache_lookups_total', 'Tiered cache lookups', ('namespace', 'outcome'))
+    for namespace, counts in tiered_cache.stats()['namespaces'].items():
+        for outcome in ('l1_hits', 'l2_hits', 'misses'):
+            lookups.inc(namespace, outcome, amount=counts[outcome])
+    return [lookups]
+
+
+def render_metrics(metrics):
+    """Prometheus text exposition format (version 0.0.4)"""
+    lines = []
+    for metric in metrics:
+        lines.append(f'# HELP {metric.name} {metric.help_text}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        for name, labels, value in metric.samples():
+            lines.append(f'{name}{labels} {format_value(value)}')
+    return '\n'.join(lines) + '\n'
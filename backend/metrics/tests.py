@@ -0,0 +1,110 @@
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import SimpleTestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from users.tokens import ClaimsRefreshToken
+
+from .middleware import MetricsMiddleware
+from .registry import Counter, Histogram, render_metrics, request_metrics
+
+User = get_user_model()
+
+
+class RegistryTest(SimpleTestCase):
+    """Test cases for the Prometheus counters and histograms"""
+    
+    def test_histogram_buckets_cumulative(self):
+        """Test histogram buckets are cumulative and end with +Inf"""
+        histogram = Histogram('latency_seconds', 'Latency', ('view',), buckets=(0.1, 1))
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value, 'home')
+        text = render_metrics([histogram])
+        self.assertIn('# TYPE latency_seconds histogram', text)
+        self.assertIn('latency_seconds_bucket{view="home",le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{view="home",le="1"} 2', text)
+        self.assertIn('latency_seconds_bucket{view="home",le="+Inf"} 3', text)
+        self.assertIn('latency_seconds_count{view="home"} 3', text)
+    
+    def test_label_values_escaped(self):
+        """Test quotes and backslashes in label values are escaped"""
+        counter = Counter('requests_total', 'Requests', ('view',))
+        counter.inc('a"b\\c')
+        self.assertIn('requests_total{view="a\\"b\\\\c"} 1', render_metrics([counter]))
+
+
+class MetricsMiddlewareTest(APITestCase):
+    """Test cases for per-endpoint request metrics"""
+    
+    def setUp(self):
+        request_metrics.reset()
+        self.admin = User.objects.create_user(
+            username='admin',
+            email='admin@example.com',
+            password='AdminPass123!',
+            role=User.roles.ADMIN
+        )
+        self.student = User.objects.create_user(
+            username='student',
+            email='student@example.com',
+            password='StudentPass123!',
+            role=User.roles.STUDENT
+        )
+    
+    def login(self, user):
+        token = ClaimsRefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    
+    def test_requests_recorded_by_url_name(self):
+        """Test latency and query counts are recorded under the URL name"""
+        self.login(self.student)
+        self.client.get('/api/auth/profile/')
+        self.client.get('/api/auth/profile/')
+        self.client.get('/api/unknown/')
+        self.assertEqual(request_metrics.requests.value('profile', 'GET', '200'), 2)
+        self.assertEqual(request_metrics.latency.count('profile', 'GET'), 2)
+        self.assertEqual(request_metrics.requests.value('unresolved', 'GET', '404'), 1)
+        self.assertGreater(request_metrics.queries._series[('profile', 'GET')]['sum'], 0)
+    
+    @override_settings(METRICS_SLOW_REQUEST_QUERIES=1)
+    def test_slow_request_logged(self):
+        """Test requests over the query threshold are logged and counted"""
+        self.login(self.student)
+        with self.assertLogs('metrics.middleware', 'WARNING') as logs:
+            self.client.get('/api/auth/profile/')
+        self.assertIn('/api/auth/profile/', logs.output[0])
+        self.assertEqual(request_metrics.slow.value('profile', 'GET'), 1)
+    
+    def test_metrics_endpoint(self):
+        """Test admins can scrape metrics in Prometheus text format"""
+        self.login(self.admin)
+        self.client.get('/api/auth/profile/')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        text = response.content.decode()
+        self.assertIn('attendify_http_requests_total{view="profile",method="GET",status="200"} 1', text)
+        self.assertIn('# TYPE attendify_cache_lookups_total counter', text)
+    
+    def test_async_capable(self):
+        """Test the middleware stays async in an async chain and sync in a sync one"""
+        async def get_response(request):
+            return HttpResponse()
+        self.assertTrue(iscoroutinefunction(MetricsMiddleware(get_response)))
+        self.assertFalse(iscoroutinefunction(MetricsMiddleware(lambda request: HttpResponse())))
+    
+    async def test_asgi_request_recorded(self):
+        """Test requests served under ASGI are recorded with their queries"""
+        token = ClaimsRefreshToken.for_user(self.student).access_token
+        response = await self.async_client.get('/api/auth/profile/', headers={'authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(request_metrics.requests.value('profile', 'GET', '200'), 1)
+        self.assertGreater(request_metrics.queries._series[('profile', 'GET')]['sum'], 0)
+    
+    def test_metrics_admin_only(self):
+        """Test non-admin users cannot read metrics"""
+        self.login(self.student)
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,22 @@
+from django.http import HttpResponse
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+
+from users.permissions import IsAdmin
+
+from .registry import cache_metrics, render_metrics, request_metrics
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class MetricsView(APIView):
+    """
+    API endpoint for this process's request and cache metrics in Prometheus
+    text format (Admin only)
+    GET /metrics
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+    
+    def get(self, request):
+        body = request_metrics.render() + render_metrics(cache_metrics())
+        return HttpResponse(body, content_type=PROMETHEUS_CONTENT_TYPE)
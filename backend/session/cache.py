@@ -0,0 +1,128 @@
+from django.core.cache import cache
+from django.utils import timezone
+
+from classes.roster import warm_class_professor, warm_roster
+
+from .models import Session
+from .serializers import SessionSerializer
+
+# Cached "no active session" marker, kept briefly so idle polling stays cheap
+NO_SESSION = {}
+NO_SESSION_TIMEOUT = 30
+
+
+def professor_key(professor_id):
+    return f'session:active:professor:{professor_id}'
+
+
+def class_key(class_id):
+    return f'session:active:class:{class_id}'
+
+
+def window_key(session_id):
+    return f'session:window:{session_id}'
+
+
+def remaining_seconds(session, now=None):
+    return int((session.end_time - (now or timezone.now())).total_seconds())
+
+
+def get_active_session(professor_id=None, class_id=None):
+    """
+    Return the serialized active session of a professor or class, or None.
+
+    Entries are written when a session opens and expire on their own when
+    its duration elapses, so polling clients hit the cache, not the table.
+    """
+    if class_id is not None:
+        key, lookup = class_key(class_id), {'classe_id': class_id}
+    else:
+        key, lookup = professor_key(professor_id), {'professor_id': professor_id}
+
+    data = cache.get(key)
+    if data is not None:
+        return data or None
+
+    now = timezone.now()
+    session = Session.objects.filter(
+        is_active=True, start_time__lte=now, **lookup
+    ).order_by('-start_time').first()
+    if session is None or remaining_seconds(session, now) <= 0:
+        cache.set(key, NO_SESSION, NO_SESSION_TIMEOUT)
+        return None
+    data = SessionSerializer(session).data
+    cache.set(key, data, remaining_seconds(session, now))
+    return data
+
+
+def get_active_sessions(class_ids):
+    """
+    Return {class_id: serialized active session} for the classes that have
+    one open. The same cache entries as get_active_session(class_id=...),
+    read in one round trip; the misses are resolved with one query.
+    """
+    keys = {class_key(class_id): class_id for class_id in class_ids}
+    cached = cache.get_many(list(keys))
+    active = {keys[key]: data for key, data in cached.items() if data}
+    missing = [class_id for key, class_id in keys.items() if key not in cached]
+    if not missing:
+        return active
+
+    now = timezone.now()
+    latest = {}
+    for session in Session.objects.filter(
+        is_active=True, start_time__lte=now, classe_id__in=missing
+    ).order_by('classe_id', '-start_time'):
+        latest.setdefault(session.classe_id, session)
+    idle = {}
+    for class_id in missing:
+        session = latest.get(class_id)
+        if session is None or remaining_seconds(session, now) <= 0:
+            idle[class_key(class_id)] = NO_SESSION
+            continue
+        active[class_id] = SessionSerializer(session).data
+        cache.set(class_key(class_id), active[class_id], remaining_seconds(session, now))
+    if idle:
+        cache.set_many(idle, NO_SESSION_TIMEOUT)
+    return active
+
+
+def get_open_session(session_id):
+    """
+    Return (start_time, end_time, class_id) of an active session, or None.
+    Cached until the session ends so a burst of scans costs one query.
+    """
+    window = cache.get(window_key(session_id))
+    if window is None:
+        session = Session.objects.filter(pk=session_id, is_active=True).only(
+            'start_time', 'duration', 'classe_id'
+        ).first()
+        if session is None or remaining_seconds(session) <= 0:
+            cache.set(window_key(session_id), (), NO_SESSION_TIMEOUT)
+            return None
+        window = (session.start_time, session.end_time, session.classe_id)
+        cache.set(window_key(session_id), window, remaining_seconds(session))
+    return window or None
+
+
+def refresh_session_cache(session):
+    """
+    Update the cache entries of a session that was opened, changed or
+    closed. Opening a session also loads its class roster and professor,
+    so enrollment and ownership checks while it is open are answered from
+    the cache.
+    """
+    keys = [professor_key(session.professor_id), class_key(session.classe_id), window_key(session.pk)]
+    timeout = remaining_seconds(session)
+    if session.is_active and timeout > 0 and session.start_time <= timezone.now():
+        data = SessionSerializer(session).data
+        cache.set_many({
+            professor_key(session.professor_id): data,
+            class_key(session.classe_id): data,
+            window_key(session.pk): (session.start_time, session.end_time, session.classe_id),
+        }, timeout)
+        warm_roster(session.classe_id)
+        warm_class_professor(session.classe)
+    else:
+        # Recomputed on the next read in case another session is still open
+        cache.delete_many(keys)
@@ -0,0 +1,120 @@
+"""
+Closing sessions once their scanning window has passed.
+
+A session is finalized once: it is marked inactive, and every student
+enrolled in its class without an attendance record gets an absent one.
+Both the records and the absence summaries are written with a single
+INSERT ... SELECT each, so the cost does not grow with the roster. These
+absences are stamped with the session's finalized_at as scanned_at, so a
+scan from the window uploaded later replaces them (attendance.ingest).
+
+Finalization waits SESSION_CLOSE_GRACE seconds after a session ends, or
+is closed early, so scans still buffered by other processes (see
+attendance.ingest) are written first. The 'session.close_expired' task is
+queued for that moment whenever a session is saved; the
+`close_expired_sessions` command runs the same sweep, e.g. from cron.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from attendance.ingest import scan_buffer
+from attendance.models import Attendance
+from attendance.summary import upsert_summaries
+from caching.tiered import invalidate_model
+from classes.models import Enrollment
+from classes.terms import term_id_for
+
+from .cache import refresh_session_cache
+from .models import Session
+
+# Enrolled students of the class with no record for the session
+ABSENTEES_SQL = """
+FROM {enrollment} e
+WHERE e.classe_id = %s AND NOT EXISTS (
+    SELECT 1 FROM {attendance} a WHERE a.session_id = %s AND a.student_id = e.student_id
+)
+"""
+
+INSERT_ABSENT_SQL = """
+INSERT INTO {attendance} (session_id, student_id, status, scanned_at, updated_at)
+SELECT %s, e.student_id, %s, %s, %s
+"""
+
+SUMMARY_ROWS_SQL = """
+SELECT e.student_id, %s, %s, 0, 0, 1, 1, 1, %s
+"""
+
+
+def close_grace():
+    return timedelta(seconds=getattr(settings, 'SESSION_CLOSE_GRACE', 60))
+
+
+def close_time(session):
+    """When a session is due to be finalized"""
+    if session.is_active:
+        return session.end_time + close_grace()
+    return max(session.updated_at or timezone.now(), session.start_time) + close_grace()
+
+
+def finalize_session(session, now=None):
+    """
+    Close a session and record its absences. Returns the number of
+    absent records written, or None if it was already finalized.
+    """
+    now = now or timezone.now()
+    # Scans this process still holds must not be recorded as absences
+    scan_buffer.flush()
+
+    quote = connection.ops.quote_name
+    absentees = ABSENTEES_SQL.format(
+        enrollment=quote(Enrollment._meta.db_table), attendance=quote(Attendance._meta.db_table)
+    )
+    timestamp = connection.ops.adapt_datetimefield_value(now)
+    term_id = term_id_for(timezone.localdate(session.start_time))
+    with transaction.atomic():
+        claimed = Session.objects.filter(pk=session.pk, finalized_at__isnull=True).update(
+            is_active=False, finalized_at=now, updated_at=now
+        )
+        if not claimed:
+            return None
+        # Summaries first: the records written next would hide the absentees
+        upsert_summaries(
+            SUMMARY_ROWS_SQL + absentees,
+            [session.classe_id, term_id, timestamp, session.classe_id, session.pk]
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                INSERT_ABSENT_SQL.format(attendance=quote(Attendance._meta.db_table)) + absentees,
+                [session.pk, Attendance.statuses.ABSENT.value, timestamp, timestamp, session.classe_id, session.pk]
+            )
+            absent = cursor.rowcount
+        # QuerySet.update and raw inserts send no post_save
+        invalidate_model(Session)
+        invalidate_model(Attendance)
+
+    session.is_active, session.finalized_at, session.updated_at = False, now, now
+    refresh_session_cache(session)
+    scan_buffer.forget_session(session.pk)
+    return absent
+
+
+def due_sessions(now=None):
+    """Sessions past their close time that are not finalized yet"""
+    now = now or timezone.now()
+    candidates = Session.objects.filter(
+        finalized_at__isnull=True, start_time__lte=now - close_grace()
+    ).order_by('start_time')
+    return [session for session in candidates if close_time(session) <= now]
+
+
+def close_expired_sessions(now=None):
+    """Finalize every due session; returns {session_id: absent records written}"""
+    closed = {}
+    for session in due_sessions(now):
+        absent = finalize_session(session, now)
+        if absent is not None:
+            closed[session.pk] = absent
+    return closed
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from session.closing import close_expired_sessions
+
+
+class Command(BaseCommand):
+    help = 'Close sessions whose window has passed and record absences for students who did not scan'
+
+    def handle(self, *args, **options):
+        closed = close_expired_sessions()
+        self.stdout.write(self.style.SUCCESS(
+            f'Closed {len(closed)} sessions, recorded {sum(closed.values())} absences'
+        ))
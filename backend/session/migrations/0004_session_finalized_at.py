@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:05
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def mark_ended_sessions_finalized(apps, schema_editor):
+    """
+    Sessions that ended before auto-close existed keep their records as they
+    are instead of being given absences retroactively on the first sweep.
+    """
+    Session = apps.get_model('session', 'Session')
+    now = timezone.now()
+    ended = [
+        session_id for session_id, start_time, duration, is_active
+        in Session.objects.values_list('id', 'start_time', 'duration', 'is_active').iterator()
+        if not is_active or start_time + timedelta(seconds=duration) <= now
+    ]
+    for i in range(0, len(ended), 500):
+        Session.objects.filter(id__in=ended[i:i + 500]).update(is_active=False, finalized_at=now)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classes', '0004_enrollment'),
+        ('session', '0003_session_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='session',
+            name='finalized_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(mark_ended_sessions_finalized, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(condition=models.Q(('finalized_at__isnull', True)), fields=['start_time'], name='session_unfinalized_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classes', '0005_term_archived_at'),
+        ('session', '0004_session_finalized_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['professor', 'start_time', 'id'], name='session_prof_start_idx'),
+        ),
+    ]
@@ -1,3 +1,44 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+
+
+class Session(models.Model):
+    classe = models.ForeignKey('classes.Class', on_delete=models.CASCADE, related_name='sessions')
+    professor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='sessions'
+    )
+    start_time = models.DateTimeField(default=timezone.now)
+    # Length of the scanning window in seconds
+    duration = models.PositiveIntegerField(default=600)
+    is_active = models.BooleanField(default=True)
+    # Set once the session is closed and its absences recorded (session.closing)
+    finalized_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Active-session lookups by class and by professor
+            models.Index(fields=['classe', 'start_time', 'is_active'], name='session_class_start_idx'),
+            models.Index(fields=['professor', 'is_active', 'start_time'], name='session_prof_active_idx'),
+            # A professor's session list, paginated newest first
+            models.Index(fields=['professor', 'start_time', 'id'], name='session_prof_start_idx'),
+            # Delta sync (sync app) walks rows in (updated_at, id) order
+            models.Index(fields=['updated_at', 'id'], name='session_updated_idx'),
+            # Sessions still to be finalized, scanned by the auto-close sweep
+            models.Index(
+                fields=['start_time'], name='session_unfinalized_idx',
+                condition=models.Q(finalized_at__isnull=True)
+            ),
+        ]
+
+    @property
+    def end_time(self):
+        return self.start_time + timedelta(seconds=self.duration)
 
-# Create your models here.
+    def __str__(self):
+        return f'{self.classe} @ {self.start_time:%Y-%m-%d %H:%M}'
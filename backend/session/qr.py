@@ -0,0 +1,123 @@
+import base64
+import hashlib
+import hmac
+import math
+import secrets
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class QrTokenError(Exception):
+    """Raised when a QR token is malformed, forged, expired or replayed"""
+
+
+class QrKeyRing:
+    """
+    Rotating HMAC keys for QR tokens.
+
+    Keys are derived from SECRET_KEY and the rotation epoch, so every worker
+    computes the same key ring without sharing state. Tokens signed with the
+    current or the previous key are accepted.
+    """
+
+    def __init__(self, secret, rotation):
+        self.secret = secret.encode() if isinstance(secret, str) else secret
+        self.rotation = rotation
+        self._keys = {}
+
+    def current_kid(self, now=None):
+        return int((now or time.time()) // self.rotation)
+
+    def key(self, kid):
+        key = self._keys.get(kid)
+        if key is None:
+            key = hmac.new(self.secret, f'attendify-qr:{kid}'.encode(), hashlib.sha256).digest()
+            # Only the current and previous epochs are in use
+            keys = {other: value for other, value in self._keys.items() if abs(other - kid) <= 1}
+            keys[kid] = key
+            self._keys = keys
+        return key
+
+    def is_accepted(self, kid, now=None):
+        return 0 <= self.current_kid(now) - kid <= 1
+
+
+class ReplayCache:
+    """
+    Record of consumed token nonces, shared by every worker through a Django
+    cache (the default one is shared outside DEBUG, see caching.checks).
+    Each key is stored with `add()` until its token expires, so it is
+    accepted once whichever worker sees it, and never evicted early.
+    """
+
+    prefix = 'qr:replay:'
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+
+    def consume(self, key, expires_at, now=None):
+        """Record a key, returning False if it was already consumed"""
+        now = now or time.time()
+        timeout = max(1, math.ceil(expires_at - now))
+        return caches[self.alias].add(self.prefix + ':'.join(map(str, key)), True, timeout)
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+class QrTokenService:
+    """
+    Issues and verifies short-lived signed QR tokens for a session.
+
+    A token is `<session_id>.<expires_at>.<nonce>.<kid>.<signature>`.
+    Verification is pure CPU: signature, key epoch and expiry are checked
+    without touching the database, then the (nonce, scanner) pair is
+    consumed in the shared replay cache.
+    """
+
+    def __init__(self, secret, ttl=30, rotation=300):
+        self.ttl = ttl
+        self.keys = QrKeyRing(secret, rotation)
+        self.replays = ReplayCache()
+
+    def _sign(self, kid, message):
+        return _b64(hmac.new(self.keys.key(kid), message.encode(), hashlib.sha256).digest()[:16])
+
+    def issue(self, session_id, now=None):
+        now = now or time.time()
+        kid = self.keys.current_kid(now)
+        message = f'{int(session_id)}.{int(now + self.ttl)}.{secrets.token_urlsafe(9)}.{kid}'
+        return f'{message}.{self._sign(kid, message)}'
+
+    def verify(self, token, scanner_id=None, now=None):
+        """
+        Return the session id of a valid token. When `scanner_id` is
+        given the token is consumed for that scanner and cannot be reused.
+        """
+        now = now or time.time()
+        try:
+            message, signature = token.rsplit('.', 1)
+            session_id, expires_at, nonce, kid = message.split('.')
+            session_id, expires_at, kid = int(session_id), int(expires_at), int(kid)
+        except (AttributeError, ValueError):
+            raise QrTokenError('Malformed QR token')
+
+        if not self.keys.is_accepted(kid, now):
+            raise QrTokenError('QR token signed with a retired key')
+        if not hmac.compare_digest(signature, self._sign(kid, message)):
+            raise QrTokenError('Invalid QR token signature')
+        if expires_at < now:
+            raise QrTokenError('QR token has expired')
+        if scanner_id is not None and not self.replays.consume((nonce, scanner_id), expires_at, now):
+            raise QrTokenError('QR token already used')
+        return session_id
+
+
+qr_tokens = QrTokenService(
+    settings.SECRET_KEY,
+    ttl=getattr(settings, 'QR_TOKEN_TTL', 30),
+    rotation=getattr(settings, 'QR_KEY_ROTATION', 300),
+)
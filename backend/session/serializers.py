@@ -0,0 +1,25 @@
+from rest_framework import serializers
+
+from classes.models import Class
+
+from .models import Session
+
+
+class SessionSerializer(serializers.ModelSerializer):
+    """Serializer for attendance sessions"""
+    
+    class_id = serializers.PrimaryKeyRelatedField(source='classe', queryset=Class.objects.all())
+    professor_id = serializers.IntegerField(read_only=True)
+    end_time = serializers.DateTimeField(read_only=True)
+    
+    class Meta:
+        model = Session
+        fields = ['id', 'class_id', 'professor_id', 'start_time', 'duration', 'end_time', 'is_active', 'updated_at']
+        read_only_fields = ['id', 'start_time', 'updated_at']
+    
+    def validate_class_id(self, value):
+        """Validate the class is taught by the requesting professor"""
+        request = self.context.get('request')
+        if request and value.professor_id != request.user.id:
+            raise serializers.ValidationError("You do not teach this class.")
+        return value
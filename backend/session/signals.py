@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from jobs.queue import enqueue
+
+from .cache import refresh_session_cache
+from .closing import close_time
+from .models import Session
+
+
+@receiver(post_save, sender=Session)
+def session_saved(sender, instance, **kwargs):
+    refresh_session_cache(instance)
+
+
+# Fields that decide when a session is due to close (see closing.close_time)
+CLOSE_FIELDS = ('start_time', 'duration', 'is_active')
+
+
+@receiver(pre_save, sender=Session)
+def note_close_change(sender, instance, update_fields=None, **kwargs):
+    """Whether this save moves the session's close time"""
+    instance._close_changed = True
+    if instance.pk is None or instance._state.adding:
+        return
+    if update_fields is not None and not set(update_fields) & set(CLOSE_FIELDS):
+        instance._close_changed = False
+        return
+    stored = Session.objects.filter(pk=instance.pk).values(*CLOSE_FIELDS).first()
+    instance._close_changed = stored is None or any(
+        stored[field] != getattr(instance, field) for field in CLOSE_FIELDS
+    )
+
+
+@receiver(post_save, sender=Session)
+def schedule_close(sender, instance, created=False, **kwargs):
+    """Queue the auto-close sweep when a session opens or its close time moves"""
+    if instance.finalized_at is not None or not getattr(settings, 'SESSION_AUTO_CLOSE', True):
+        return
+    if created or getattr(instance, '_close_changed', True):
+        enqueue('session.close_expired', run_after=close_time(instance), unique=True)
+
+
+@receiver(post_delete, sender=Session)
+def session_deleted(sender, instance, **kwargs):
+    instance.is_active = False
+    refresh_session_cache(instance)
@@ -0,0 +1,9 @@
+from jobs.queue import task
+
+from .closing import close_expired_sessions
+
+
+@task('session.close_expired')
+def close_expired():
+    closed = close_expired_sessions()
+    return {'closed': len(closed), 'absent': sum(closed.values())}
@@ -1,3 +1,413 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from attendance.ingest import write_attendances
+from attendance.models import AbsenceSummary, Attendance
+from classes.models import Class
+from classes.roster import enroll_students
+from classes.terms import clear_term_cache, term_id_for
+from backend.testing import Grower, QueryBudgetMixin, bulk_users
+from jobs.models import Job
+from users.tokens import ClaimsRefreshToken
+
+from .cache import get_active_sessions
+from .closing import close_expired_sessions, finalize_session
+from .models import Session
+from .qr import QrTokenError, QrTokenService, ReplayCache, qr_tokens
+
+User = get_user_model()
+
+
+class QrTokenServiceTest(SimpleTestCase):
+    """Test cases for QR token issuance and verification"""
+    
+    def setUp(self):
+        self.service = QrTokenService('test-secret', ttl=30, rotation=300)
+        self.now = 1_000_000_000
+    
+    def test_issue_and_verify(self):
+        """Test a fresh token verifies to its session"""
+        token = self.service.issue(42, now=self.now)
+        self.assertEqual(self.service.verify(token, now=self.now + 5), 42)
+    
+    def test_expired_token(self):
+        """Test tokens are refused after their lifetime"""
+        token = self.service.issue(42, now=self.now)
+        with self.assertRaises(QrTokenError):
+            self.service.verify(token, now=self.now + 31)
+    
+    def test_tampered_token(self):
+        """Test changing the session id invalidates the signature"""
+        token = self.service.issue(42, now=self.now)
+        with self.assertRaises(QrTokenError):
+            self.service.verify('43' + token[2:], now=self.now)
+        with self.assertRaises(QrTokenError):
+            self.service.verify('garbage', now=self.now)
+    
+    def test_foreign_secret(self):
+        """Test tokens signed with another secret are refused"""
+        token = QrTokenService('other-secret').issue(42, now=self.now)
+        with self.assertRaises(QrTokenError):
+            self.service.verify(token, now=self.now)
+    
+    def test_key_rotation(self):
+        """Test the previous key is still accepted but older ones are not"""
+        service = QrTokenService('test-secret', ttl=1000, rotation=300)
+        token = service.issue(42, now=self.now)
+        self.assertEqual(service.verify(token, now=self.now + 300), 42)
+        with self.assertRaises(QrTokenError):
+            service.verify(token, now=self.now + 600)
+    
+    def test_replay_rejected_per_scanner(self):
+        """Test a token can be used once per scanner"""
+        token = self.service.issue(42, now=self.now)
+        self.service.verify(token, scanner_id=1, now=self.now)
+        self.service.verify(token, scanner_id=2, now=self.now)
+        with self.assertRaises(QrTokenError):
+            self.service.verify(token, scanner_id=1, now=self.now)
+    
+    def test_replay_rejected_across_workers(self):
+        """Test a token consumed by one worker is refused by another"""
+        other_worker = QrTokenService('test-secret', ttl=30, rotation=300)
+        token = self.service.issue(42, now=self.now)
+        self.service.verify(token, scanner_id=1, now=self.now)
+        with self.assertRaises(QrTokenError):
+            other_worker.verify(token, scanner_id=1, now=self.now)
+    
+    def test_replay_entries_kept_until_expiry(self):
+        """Test consumed nonces are not evicted by later ones"""
+        replays = ReplayCache()
+        self.assertTrue(replays.consume(('first', 1), self.now + 30, now=self.now))
+        for i in range(10):
+            replays.consume((f'nonce{i}', 1), self.now + 30, now=self.now)
+        self.assertFalse(replays.consume(('first', 1), self.now + 30, now=self.now))
+
+
+class SessionQrViewTest(APITestCase):
+    """Test cases for the QR issuance endpoint"""
+    
+    def setUp(self):
+        self.professor = User.objects.create_user(
+            username='professor',
+            email='prof@example.com',
+            password='ProfPass123!',
+            role=User.roles.PROFESOR
+        )
+        classe = Class.objects.create(name='Algorithms', code='ALG101', professor=self.professor)
+        self.session = Session.objects.create(classe=classe, professor=self.professor)
+        token = ClaimsRefreshToken.for_user(self.professor).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    
+    def test_issue_qr_token(self):
+        """Test the session's professor can issue a QR token"""
+        response = self.client.post(f'/api/sessions/{self.session.id}/qr/')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(qr_tokens.verify(response.data['qr_token']), self.session.id)
+    
+    def test_issue_qr_token_other_professor(self):
+        """Test professors cannot issue tokens for someone else's session"""
+        other = User.objects.create_user(
+            username='other',
+            email='other@example.com',
+            password='ProfPass123!',
+            role=User.roles.PROFESOR
+        )
+        token = ClaimsRefreshToken.for_user(other).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.post(f'/api/sessions/{self.session.id}/qr/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class SessionViewsTest(APITestCase):
+    """Test cases for session endpoints and the active-session cache"""
+    
+    def setUp(self):
+        cache.clear()
+        self.professor = User.objects.create_user(
+            username='professor',
+            email='prof@example.com',
+            password='ProfPass123!',
+            role=User.roles.PROFESOR
+        )
+        self.classe = Class.objects.create(name='Algorithms', code='ALG101', professor=self.professor)
+        token = ClaimsRefreshToken.for_user(self.professor).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    
+    def test_create_and_list_sessions(self):
+        """Test opening a session and listing it"""
+        response = self.client.post('/api/sessions/', {'class_id': self.classe.id, 'duration': 600}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(response.data['is_active'])
+        response = self.client.get('/api/sessions/')
+        self.assertEqual(len(response.data['sessions']), 1)
+    
+    def test_session_list_paginated(self):
+        """Test the session list is served newest first, a page at a time"""
+        start = timezone.now() - timedelta(days=10)
+        Session.objects.bulk_create([
+            Session(classe=self.classe, professor=self.professor, start_time=start + timedelta(hours=i), is_active=False)
+            for i in range(5)
+        ])
+        response = self.client.get('/api/sessions/', {'page_size': 3})
+        first = [session['id'] for session in response.data['sessions']]
+        self.assertEqual(len(first), 3)
+        response = self.client.get(response.data['next'])
+        second = [session['id'] for session in response.data['sessions']]
+        self.assertEqual(len(second), 2)
+        self.assertIsNone(response.data['next'])
+        listed = Session.objects.filter(id__in=first + second).order_by('-start_time')
+        self.assertEqual(first + second, [session.id for session in listed])
+    
+    def test_create_session_for_foreign_class(self):
+        """Test professors can only open sessions for their own classes"""
+        other = User.objects.create_user(
+            username='other',
+            email='other@example.com',
+            password='ProfPass123!',
+            role=User.roles.PROFESOR
+        )
+        classe = Class.objects.create(name='Compilers', code='CMP201', professor=other)
+        response = self.client.post('/api/sessions/', {'class_id': classe.id, 'duration': 600}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_active_session_served_from_cache(self):
+        """Test opening a session primes the cache used by polling clients"""
+        response = self.client.post('/api/sessions/', {'class_id': self.classe.id, 'duration': 600}, format='json')
+        session_id = response.data['id']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/sessions/active/')
+            self.assertEqual(response.data['id'], session_id)
+            response = self.client.get('/api/sessions/active/', {'class_id': self.classe.id})
+            self.assertEqual(response.data['id'], session_id)
+    
+    def test_active_session_of_class_requires_access(self):
+        """Test only the class's professor and enrolled students see its open session"""
+        session = Session.objects.create(classe=self.classe, professor=self.professor)
+        other = User.objects.create_user(
+            username='other',
+            email='other@example.com',
+            role=User.roles.PROFESOR
+        )
+        student, outsider = bulk_users(2, role=User.roles.STUDENT)
+        enroll_students(self.classe.id, [student.id])
+        for user, expected in ((other, status.HTTP_403_FORBIDDEN), (outsider, status.HTTP_403_FORBIDDEN),
+                               (student, status.HTTP_200_OK), (self.professor, status.HTTP_200_OK)):
+            token = ClaimsRefreshToken.for_user(user).access_token
+            self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+            response = self.client.get('/api/sessions/active/', {'class_id': self.classe.id})
+            self.assertEqual(response.status_code, expected, user.username)
+        self.assertEqual(response.data['id'], session.id)
+    
+    def test_active_sessions_of_classes(self):
+        """Test the open sessions of many classes cost one query cold and none warm"""
+        classes = [self.classe] + [
+            Class.objects.create(name=f'Class {i}', code=f'C{i}', professor=self.professor) for i in range(3)
+        ]
+        open_sessions = [
+            Session.objects.create(classe=classe, professor=self.professor) for classe in classes[:2]
+        ]
+        expected = {session.classe_id: session.id for session in open_sessions}
+        cache.clear()
+        class_ids = [classe.id for classe in classes]
+        with self.assertNumQueries(1):
+            active = get_active_sessions(class_ids)
+        self.assertEqual({class_id: data['id'] for class_id, data in active.items()}, expected)
+        with self.assertNumQueries(0):
+            active = get_active_sessions(class_ids)
+        self.assertEqual({class_id: data['id'] for class_id, data in active.items()}, expected)
+    
+    def test_closing_session_clears_cache(self):
+        """Test a closed session is no longer reported as active"""
+        session = Session.objects.create(classe=self.classe, professor=self.professor)
+        self.assertEqual(self.client.get('/api/sessions/active/').data['id'], session.id)
+        response = self.client.patch(f'/api/sessions/{session.id}/', {'is_active': False}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(self.client.get('/api/sessions/active/').data)
+    
+    def test_expired_session_not_active(self):
+        """Test sessions whose duration elapsed are not reported"""
+        Session.objects.create(
+            classe=self.classe,
+            professor=self.professor,
+            start_time=timezone.now() - timedelta(hours=1)
+        )
+        self.assertIsNone(self.client.get('/api/sessions/active/').data)
+    
+    def test_no_active_session_cached(self):
+        """Test idle polling hits the database once"""
+        self.client.get('/api/sessions/active/')
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.client.get('/api/sessions/active/').data)
+    
+    def test_session_list_not_modified(self):
+        """Test the session list honours If-None-Match until a session changes"""
+        etag = self.client.get('/api/sessions/')['ETag']
+        response = self.client.get('/api/sessions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        Session.objects.create(classe=self.classe, professor=self.professor)
+        response = self.client.get('/api/sessions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['sessions']), 1)
+
+
+class SessionCloseTest(APITestCase):
+    """Test cases for closing sessions and finalizing their absences"""
+    
+    def setUp(self):
+        cache.clear()
+        clear_term_cache()
+        self.professor = User.objects.create_user(
+            username='professor',
+            email='prof@example.com',
+            password='ProfPass123!',
+            role=User.roles.PROFESOR
+        )
+        self.classe = Class.objects.create(name='Algorithms', code='ALG101', professor=self.professor)
+        self.students = bulk_users(500, prefix='student')
+        enroll_students(self.classe.id, [student.id for student in self.students])
+    
+    def expired_session(self, **kwargs):
+        return Session.objects.create(
+            classe=self.classe,
+            professor=self.professor,
+            start_time=timezone.now() - timedelta(hours=1),
+            **kwargs
+        )
+    
+    def test_expired_session_finalized(self):
+        """Test enrolled students without a scan are recorded absent"""
+        session = self.expired_session()
+        present = self.students[:100]
+        write_attendances([Attendance(session=session, student=student) for student in present])
+        
+        self.assertEqual(close_expired_sessions(), {session.id: 400})
+        session.refresh_from_db()
+        self.assertFalse(session.is_active)
+        self.assertIsNotNone(session.finalized_at)
+        records = Attendance.objects.filter(session=session)
+        self.assertEqual(records.filter(status=Attendance.statuses.ABSENT).count(), 400)
+        self.assertEqual(records.filter(status=Attendance.statuses.PRESENT).count(), 100)
+        
+        absentee = AbsenceSummary.objects.get(student=self.students[-1], classe=self.classe)
+        self.assertEqual((absentee.absent_count, absentee.current_streak), (1, 1))
+        attendee = AbsenceSummary.objects.get(student=present[0], classe=self.classe)
+        self.assertEqual((attendee.present_count, attendee.absent_count), (1, 0))
+    
+    def test_finalize_cost_independent_of_roster(self):
+        """Test a 500-student session is finalized in a fixed number of statements"""
+        session = self.expired_session()
+        day = timezone.localdate(session.start_time)
+        # Create the term and cache the term list beforehand
+        term_id_for(day)
+        term_id_for(day)
+        # The claim, summaries and records, inside a savepoint
+        with self.assertNumQueries(5):
+            self.assertEqual(finalize_session(session), 500)
+    
+    def test_finalize_once(self):
+        """Test a finalized session is not finalized again"""
+        session = self.expired_session()
+        finalize_session(session)
+        self.assertIsNone(finalize_session(session))
+        self.assertEqual(close_expired_sessions(), {})
+        self.assertEqual(Attendance.objects.filter(session=session).count(), 500)
+        summary = AbsenceSummary.objects.get(student=self.students[0], classe=self.classe)
+        self.assertEqual(summary.absent_count, 1)
+    
+    def test_open_session_not_closed(self):
+        """Test sessions still within their window, or the grace period, stay open"""
+        Session.objects.create(classe=self.classe, professor=self.professor)
+        Session.objects.create(
+            classe=self.classe,
+            professor=self.professor,
+            start_time=timezone.now() - timedelta(seconds=630),
+        )
+        self.assertEqual(close_expired_sessions(), {})
+        self.assertEqual(Attendance.objects.count(), 0)
+    
+    def test_closed_early_finalized(self):
+        """Test a session closed by its professor is finalized after the grace period"""
+        session = self.expired_session(is_active=False)
+        session.start_time = timezone.now() - timedelta(minutes=5)
+        session.save()
+        self.assertEqual(close_expired_sessions(), {})
+        later = timezone.now() + timedelta(minutes=2)
+        self.assertEqual(close_expired_sessions(now=later), {session.id: 500})
+    
+    def test_session_save_schedules_close(self):
+        """Test opening a session queues the sweep for its end"""
+        token = ClaimsRefreshToken.for_user(self.professor).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.post('/api/sessions/', {'class_id': self.classe.id, 'duration': 600}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        session = Session.objects.get(pk=response.data['id'])
+        job = Job.objects.get(task='session.close_expired')
+        self.assertEqual(job.run_after, session.end_time + timedelta(seconds=60))
+    
+    def test_unchanged_close_time_not_rescheduled(self):
+        """Test saves that do not move a session's close time queue nothing more"""
+        session = Session.objects.create(classe=self.classe, professor=self.professor)
+        session.save()
+        session.save(update_fields=['updated_at'])
+        self.assertEqual(Job.objects.filter(task='session.close_expired').count(), 1)
+        session.duration = 1200
+        session.save()
+        run_after = list(Job.objects.order_by('id').values_list('run_after', flat=True))
+        self.assertEqual(run_after, [
+            session.start_time + timedelta(seconds=660), session.start_time + timedelta(seconds=1260)
+        ])
+    
+    def test_finalized_session_not_scheduled(self):
+        """Test saving a finalized session queues nothing"""
+        session = self.expired_session()
+        finalize_session(session)
+        Job.objects.all().delete()
+        session.refresh_from_db()
+        session.save()
+        self.assertFalse(Job.objects.exists())
+    
+    def test_close_expired_sessions_command(self):
+        """Test the command runs the sweep"""
+        self.expired_session()
+        call_command('close_expired_sessions', stdout=StringIO())
+        self.assertEqual(Attendance.objects.filter(status=Attendance.statuses.ABSENT).count(), 500)
+
+
+class SessionQueryBudgetTest(QueryBudgetMixin, APITestCase):
+    """Query and latency budgets of the session endpoints as sessions pile up"""
+    
+    def setUp(self):
+        self.professor = User.objects.create_user(
+            username='professor',
+            email='prof@example.com',
+            password='ProfPass123!',
+            role=User.roles.PROFESOR
+        )
+        classe = Class.objects.create(name='Algorithms', code='ALG101', professor=self.professor)
+        self.grow = Grower(lambda start, count: Session.objects.bulk_create([
+            Session(classe=classe, professor=self.professor, is_active=False) for _ in range(count)
+        ]))
+        token = ClaimsRefreshToken.for_user(self.professor).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    
+    def test_session_list_budget(self):
+        """Test listing sessions runs a fixed number of queries"""
+        self.assertQueryBudget('/api/sessions/', self.grow, max_queries=1, max_ms=250)
+    
+    def test_session_detail_budget(self):
+        """Test a session detail does not depend on the number of sessions"""
+        self.grow(1)
+        session = Session.objects.get()
+        self.assertQueryBudget(f'/api/sessions/{session.id}/', self.grow, max_queries=1, max_ms=250)
+    
+    def test_active_session_budget(self):
+        """Test the active session lookup stays flat"""
+        self.assertQueryBudget('/api/sessions/active/', self.grow, max_queries=1, max_ms=250)
@@ -0,0 +1,10 @@
+from django.urls import path
+from .views import ActiveSessionView, SessionDetailView, SessionListView, SessionQrView
+
+
+urlpatterns = [
+    path('', SessionListView.as_view(), name='session-list'),
+    path('active/', ActiveSessionView.as_view(), name='session-active'),
+    path('<int:pk>/', SessionDetailView.as_view(), name='session-detail'),
+    path('<int:pk>/qr/', SessionQrView.as_view(), name='session-qr'),
+]
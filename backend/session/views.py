@@ -1,3 +1,111 @@
-from django.shortcuts import render
+from rest_framework import generics, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from backend.pagination import KeysetPagination
+from caching.conditional import ConditionalGetMixin
+from classes.roster import class_professor_id, is_enrolled
+from users.permissions import IsProfessor
+
+from .cache import get_active_session
+from .models import Session
+from .qr import qr_tokens
+from .serializers import SessionSerializer
+
+
+class SessionPagination(KeysetPagination):
+    ordering = ('-start_time', '-id')
+    results_key = 'sessions'
+
+
+class SessionListView(ConditionalGetMixin, generics.ListCreateAPIView):
+    """
+    API endpoint for a professor's sessions
+    GET /api/sessions/?cursor=&page_size= - List the current professor's
+        sessions, newest first, a page at a time
+    POST /api/sessions/ - Open a session for one of the professor's classes
+    """
+    serializer_class = SessionSerializer
+    permission_classes = [IsAuthenticated, IsProfessor]
+    pagination_class = SessionPagination
+    etag_models = [Session]
+    
+    def get_queryset(self):
+        return Session.objects.filter(professor_id=self.request.user.id)
+    
+    def perform_create(self, serializer):
+        serializer.save(professor_id=self.request.user.id, is_active=True)
+
+
+class SessionDetailView(ConditionalGetMixin, generics.RetrieveUpdateAPIView):
+    """
+    API endpoint for viewing and updating a session
+    GET /api/sessions/<id>/
+    PATCH /api/sessions/<id>/ - e.g. {"is_active": false} closes the session
+    """
+    serializer_class = SessionSerializer
+    permission_classes = [IsAuthenticated, IsProfessor]
+    etag_models = [Session]
+    
+    def get_queryset(self):
+        return Session.objects.filter(professor_id=self.request.user.id)
+
+
+class ActiveSessionView(APIView):
+    """
+    API endpoint for the currently open session
+    GET /api/sessions/active/ - The current professor's open session
+    GET /api/sessions/active/?class_id=<id> - The open session of a class
+        the user teaches or is enrolled in
+    
+    Served from a cache entry that is refreshed when sessions open or close
+    and expires when the session's duration elapses. Sessions end without a
+    write, so this view sends no ETag.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def can_view_class(self, user, class_id):
+        """Ownership and enrollment are both answered from the cache"""
+        if user.role == 'PROFESSOR':
+            return class_professor_id(class_id) == user.id
+        if user.role == 'STUDENT':
+            return is_enrolled(class_id, user.id)
+        return True
+    
+    def get(self, request):
+        class_id = request.query_params.get('class_id')
+        if class_id is not None:
+            if not class_id.isdigit():
+                return Response({
+                    'error': 'class_id must be an integer'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            class_id = int(class_id)
+            if not self.can_view_class(request.user, class_id):
+                return Response({
+                    'error': 'You do not teach or attend this class'
+                }, status=status.HTTP_403_FORBIDDEN)
+            session = get_active_session(class_id=class_id)
+        else:
+            session = get_active_session(professor_id=request.user.id)
+        return Response(session, status=status.HTTP_200_OK)
+
+
+class SessionQrView(APIView):
+    """
+    API endpoint for issuing a short-lived QR token for a session
+    POST /api/sessions/<id>/qr/
+    """
+    permission_classes = [IsAuthenticated, IsProfessor]
+    
+    def post(self, request, pk):
+        if not Session.objects.filter(pk=pk, professor_id=request.user.id, is_active=True).exists():
+            return Response({
+                'error': 'Active session not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response({
+            'session_id': pk,
+            'qr_token': qr_tokens.issue(pk),
+            'expires_in': qr_tokens.ttl
+        }, status=status.HTTP_201_CREATED)
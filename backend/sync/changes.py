@@ -0,0 +1,174 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+
+from attendance.models import Attendance
+from attendance.serializers import AttendanceSerializer
+from classes.models import Class, Enrollment
+from classes.serializers import ClassSerializer
+from session.models import Session
+from session.serializers import SessionSerializer
+
+from .models import Tombstone
+
+CURSOR_SALT = 'attendify.sync'
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def class_scope(user):
+    if user.role == 'STUDENT':
+        return Class.objects.filter(enrollments__student_id=user.id)
+    if user.role == 'PROFESSOR':
+        return Class.objects.filter(professor_id=user.id)
+    return Class.objects.all()
+
+
+def session_scope(user):
+    if user.role == 'STUDENT':
+        return Session.objects.filter(classe__enrollments__student_id=user.id)
+    if user.role == 'PROFESSOR':
+        return Session.objects.filter(professor_id=user.id)
+    return Session.objects.all()
+
+
+def attendance_scope(user):
+    if user.role == 'STUDENT':
+        return Attendance.objects.filter(student_id=user.id)
+    if user.role == 'PROFESSOR':
+        return Attendance.objects.filter(session__professor_id=user.id)
+    return Attendance.objects.all()
+
+
+def prune_tombstones():
+    """Delete tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS; returns how many"""
+    days = getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 30)
+    removed, _ = Tombstone.objects.filter(deleted_at__lt=timezone.now() - timedelta(days=days)).delete()
+    return removed
+
+
+def tombstone_scope(user):
+    """
+    The deletions a user is told about, matching the streams' scopes: a
+    professor's own rows; for a student, their records and unenrollments
+    plus the classes and sessions of the classes they are enrolled in.
+    """
+    if user.role == 'STUDENT':
+        return Tombstone.objects.filter(
+            Q(student_id=user.id)
+            | Q(student_id__isnull=True, classe_id__in=Enrollment.objects.filter(student_id=user.id).values('classe_id'))
+        )
+    if user.role == 'PROFESSOR':
+        return Tombstone.objects.filter(professor_id=user.id)
+    return Tombstone.objects.all()
+
+
+# Synced collections: (model, rows visible to a user, serializer)
+STREAMS = {
+    'classes': (Class, class_scope, ClassSerializer),
+    'sessions': (Session, session_scope, SessionSerializer),
+    'attendance': (Attendance, attendance_scope, AttendanceSerializer),
+}
+
+
+def to_micros(moment):
+    return int((moment - EPOCH) / timedelta(microseconds=1))
+
+
+def from_micros(micros):
+    return EPOCH + timedelta(microseconds=micros)
+
+
+def encode_cursor(positions, issued_at):
+    return signing.dumps({'t': to_micros(issued_at), 'p': positions}, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(token):
+    """Return (issued_at, positions) of a cursor; raises ValueError if it was not issued here"""
+    try:
+        state = signing.loads(token, salt=CURSOR_SALT)
+        return from_micros(state['t']), state['p']
+    except (signing.BadSignature, KeyError, TypeError):
+        raise ValueError('Invalid sync cursor')
+
+
+def read_stream(queryset, field, position, limit, horizon):
+    """
+    Read the next `limit` rows after `position`, an (updated_at, id) pair in
+    microseconds, in that order. Returns (rows, next position, has_more).
+
+    Once a stream is drained the position is held back to `horizon`, so a
+    transaction that commits a few seconds after stamping its rows is still
+    picked up next time; clients upsert by id, so the overlap is harmless.
+    """
+    if position is not None:
+        moment, last_id = from_micros(position[0]), position[1]
+        queryset = queryset.filter(Q(**{f'{field}__gt': moment}) | Q(**{field: moment, 'id__gt': last_id}))
+    rows = list(queryset.order_by(field, 'id')[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return rows, position, False
+    last = [to_micros(getattr(rows[-1], field)), rows[-1].id]
+    if not has_more:
+        last = max(min(last, [to_micros(horizon), 0]), position or [0, 0])
+    return rows, last, has_more
+
+
+def collect_changes(user, cursor=None):
+    """
+    Return the rows visible to `user` that changed after `cursor`, the ids
+    deleted since then, and the cursor to send next time. Without a cursor,
+    or with one older than the tombstone retention, everything is sent and
+    `reset` tells the client to drop its local copy first. So is it for a
+    student enrolled in a class since the cursor was issued, whose older
+    rows would not show up as changes.
+    """
+    now = timezone.now()
+    limit = getattr(settings, 'SYNC_PAGE_SIZE', 500)
+    horizon = now - timedelta(seconds=getattr(settings, 'SYNC_CURSOR_LAG', 5))
+    retention = timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+
+    positions = {}
+    if cursor:
+        issued_at, positions = decode_cursor(cursor)
+        if issued_at < now - retention:
+            positions = {}
+        elif user.role == 'STUDENT' and Enrollment.objects.filter(
+            student_id=user.id, enrolled_at__gte=issued_at
+        ).exists():
+            positions = {}
+    reset = not positions
+
+    changes, has_more = {}, False
+    next_positions = {}
+    for name, (_, scope, serializer_class) in STREAMS.items():
+        rows, next_positions[name], more = read_stream(
+            scope(user), 'updated_at', positions.get(name), limit, horizon
+        )
+        changes[name] = serializer_class(rows, many=True).data
+        has_more = has_more or more
+
+    deleted = {name: [] for name in STREAMS}
+    if reset:
+        # A full resync has nothing to delete
+        next_positions['deleted'] = [to_micros(horizon), 0]
+    else:
+        labels = {model._meta.label_lower: name for name, (model, _, _) in STREAMS.items()}
+        tombstones, next_positions['deleted'], more = read_stream(
+            tombstone_scope(user), 'deleted_at', positions.get('deleted'), limit, horizon
+        )
+        for tombstone in tombstones:
+            if tombstone.model in labels:
+                deleted[labels[tombstone.model]].append(tombstone.object_id)
+        has_more = has_more or more
+
+    return {
+        'cursor': encode_cursor(next_positions, now),
+        'has_more': has_more,
+        'reset': reset,
+        'changes': changes,
+        'deleted': deleted,
+    }
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from sync.changes import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete sync tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS '
+        '(run_jobs workers also do this every SYNC_TOMBSTONE_PRUNE_INTERVAL seconds)'
+    )
+
+    def handle(self, *args, **options):
+        removed = prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(f'Pruned {removed} tombstones'))
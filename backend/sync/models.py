@@ -0,0 +1,32 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Tombstone(models.Model):
+    """
+    Record of a deleted synced row, so offline clients can drop their copy.
+    Pruned by `manage.py prune_tombstones` after SYNC_TOMBSTONE_RETENTION_DAYS.
+
+    The owner columns copy the deleted row's professor, class and student
+    (plain ids, as those rows may be gone too), so a delta sync only sends
+    the deletions of rows the client could see (see sync.changes).
+    """
+    # Lowercase model label, e.g. 'session.session'
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+    professor_id = models.BigIntegerField(null=True, blank=True)
+    classe_id = models.BigIntegerField(null=True, blank=True)
+    student_id = models.BigIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='tombstone_deleted_idx'),
+            # Per-owner reads of the delta sync
+            models.Index(fields=['professor_id', 'deleted_at', 'id'], name='tombstone_professor_idx'),
+            models.Index(fields=['classe_id', 'deleted_at', 'id'], name='tombstone_class_idx'),
+            models.Index(fields=['student_id', 'deleted_at', 'id'], name='tombstone_student_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.model}#{self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}'
@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from attendance.ingest import write_attendances
+from attendance.live import publish_scans
+from attendance.models import Attendance
+from classes.roster import is_enrolled
+from session.models import Session
+from session.qr import QrTokenError, qr_tokens
+
+# Tolerated drift between a phone's clock and the server's
+CLOCK_SKEW = timedelta(minutes=2)
+
+
+def rejected(index, error):
+    return {'index': index, 'result': 'rejected', 'error': error}
+
+
+def apply_offline_scans(student_id, scans):
+    """
+    Record scans a student's phone queued while offline. Each scan names its
+    session directly or through the QR token shown at the time, which is
+    verified as of `scanned_at`. Since that time is the client's word, a
+    session takes uploads only until SYNC_OFFLINE_SCAN_GRACE seconds after
+    it ended or was finalized, whichever is later, by the server's clock.
+    Scans are idempotent: a (session, student) pair already stored is
+    reported as a duplicate, unless it is the absence recorded when the
+    session closed, which the scan replaces. Returns one result per scan,
+    in order.
+    """
+    now = timezone.now()
+    grace = timedelta(seconds=getattr(settings, 'SYNC_OFFLINE_SCAN_GRACE', 1800))
+    require_token = getattr(settings, 'ATTENDANCE_REQUIRE_QR_TOKEN', False)
+    require_enrollment = getattr(settings, 'ATTENDANCE_REQUIRE_ENROLLMENT', True)
+
+    results = [None] * len(scans)
+    accepted = []
+    for index, scan in enumerate(scans):
+        scanned_at = scan['scanned_at']
+        if scanned_at > now + CLOCK_SKEW:
+            results[index] = rejected(index, 'scanned_at is in the future')
+            continue
+        session_id = scan.get('session_id')
+        if scan.get('qr_token'):
+            try:
+                token_session_id = qr_tokens.verify(
+                    scan['qr_token'], scanner_id=student_id, now=scanned_at.timestamp()
+                )
+            except QrTokenError as e:
+                results[index] = rejected(index, str(e))
+                continue
+            if session_id is not None and session_id != token_session_id:
+                results[index] = rejected(index, 'QR token is for another session')
+                continue
+            session_id = token_session_id
+        elif require_token:
+            results[index] = rejected(index, 'qr_token is required')
+            continue
+        accepted.append((index, session_id, scan))
+
+    windows = {}
+    for session in Session.objects.filter(
+        id__in={session_id for _, session_id, _ in accepted}
+    ).values('id', 'start_time', 'duration', 'finalized_at', 'classe_id'):
+        end = session['start_time'] + timedelta(seconds=session['duration'])
+        windows[session['id']] = (
+            session['start_time'],
+            end,
+            max(end, session['finalized_at'] or end) + grace,
+            session['classe_id'],
+        )
+    pending = {}
+    for index, session_id, scan in accepted:
+        window = windows.get(session_id)
+        if window is None:
+            results[index] = rejected(index, 'Session not found')
+        elif now > window[2]:
+            results[index] = rejected(index, 'Session closed to offline scans')
+        elif not window[0] <= scan['scanned_at'] <= window[1]:
+            results[index] = rejected(index, 'Scan is outside the session window')
+        elif require_enrollment and not is_enrolled(window[3], student_id):
+            results[index] = rejected(index, 'Not enrolled in this class')
+        elif session_id in pending:
+            results[index] = {'index': index, 'session_id': session_id, 'result': 'duplicate'}
+        else:
+            pending[session_id] = (index, Attendance(
+                session_id=session_id,
+                student_id=student_id,
+                status=scan['status'],
+                scanned_at=scan['scanned_at'],
+            ))
+
+    written = write_attendances([attendance for _, attendance in pending.values()])
+    recorded = {attendance.session_id for attendance in written}
+    for session_id, (index, _) in pending.items():
+        results[index] = {
+            'index': index,
+            'session_id': session_id,
+            'result': 'recorded' if session_id in recorded else 'duplicate',
+        }
+    publish_scans(written)
+    return results
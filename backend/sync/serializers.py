@@ -0,0 +1,16 @@
+from rest_framework import serializers
+
+from attendance.serializers import ScanSerializer
+
+
+class OfflineScanSerializer(ScanSerializer):
+    """Serializer for a scan recorded while the phone was offline"""
+    
+    scanned_at = serializers.DateTimeField()
+
+
+class SyncRequestSerializer(serializers.Serializer):
+    """Serializer for a delta sync request"""
+    
+    cursor = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+    scans = OfflineScanSerializer(many=True, required=False, max_length=1000)
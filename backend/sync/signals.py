@@ -0,0 +1,41 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from attendance.models import Attendance
+from classes.models import Class, Enrollment
+from session.models import Session
+
+from .models import Tombstone
+
+
+def tombstone_owners(instance):
+    """The professor, class and student a deleted row was visible to"""
+    if isinstance(instance, Class):
+        return {'professor_id': instance.professor_id, 'classe_id': instance.id}
+    if isinstance(instance, Session):
+        return {'professor_id': instance.professor_id, 'classe_id': instance.classe_id}
+    # Cascades delete records before their session, so it can still be read
+    session = Session.objects.filter(pk=instance.session_id).values('professor_id', 'classe_id').first()
+    return {'student_id': instance.student_id, **(session or {})}
+
+
+@receiver(post_delete, sender=Class)
+@receiver(post_delete, sender=Session)
+@receiver(post_delete, sender=Attendance)
+def record_tombstone(sender, instance, **kwargs):
+    """Remember deleted rows for the next delta sync of the clients that saw them"""
+    Tombstone.objects.create(model=sender._meta.label_lower, object_id=instance.pk, **tombstone_owners(instance))
+
+
+@receiver(post_delete, sender=Enrollment)
+def record_unenrollment(sender, instance, **kwargs):
+    """
+    Tell the student to drop the class, along with its sessions and records.
+    This is also how students learn of a deleted class, whose enrollments
+    are gone by the time they sync.
+    """
+    Tombstone.objects.create(
+        model=Class._meta.label_lower,
+        object_id=instance.classe_id,
+        student_id=instance.student_id,
+    )
@@ -0,0 +1,10 @@
+from django.conf import settings
+
+from jobs.queue import task
+
+from .changes import prune_tombstones
+
+
+@task('sync.prune_tombstones', every=getattr(settings, 'SYNC_TOMBSTONE_PRUNE_INTERVAL', 86400))
+def prune():
+    return {'removed': prune_tombstones()}
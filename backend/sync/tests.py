@@ -0,0 +1,251 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from attendance.ingest import scan_buffer
+from attendance.models import AbsenceSummary, Attendance
+from classes.models import Class, Enrollment
+from classes.roster import enroll_students
+from classes.terms import clear_term_cache
+from session.closing import finalize_session
+from session.models import Session
+from session.qr import qr_tokens
+from users.tokens import ClaimsRefreshToken
+
+from .changes import encode_cursor
+from .models import Tombstone
+
+User = get_user_model()
+
+
+@override_settings(SYNC_CURSOR_LAG=0)
+class SyncViewTest(APITestCase):
+    """Test cases for the delta sync endpoint"""
+    
+    def setUp(self):
+        scan_buffer.clear()
+        clear_term_cache()
+        self.professor = User.objects.create_user(
+            username='professor',
+            email='prof@example.com',
+            password='ProfPass123!',
+            role=User.roles.PROFESOR
+        )
+        self.student = User.objects.create_user(
+            username='student',
+            email='student@example.com',
+            password='StudentPass123!',
+            role=User.roles.STUDENT
+        )
+        self.classe = Class.objects.create(name='Algorithms', code='ALG101', professor=self.professor)
+        # Ended ten minutes ago, within the grace for offline uploads
+        self.session = Session.objects.create(
+            classe=self.classe,
+            professor=self.professor,
+            start_time=timezone.now() - timedelta(minutes=70),
+            duration=3600,
+            is_active=False
+        )
+        Enrollment.objects.create(classe=self.classe, student=self.student)
+        self.login(self.student)
+    
+    def login(self, user):
+        token = ClaimsRefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    
+    def sync(self, cursor=None, scans=None):
+        body = {'cursor': cursor}
+        if scans is not None:
+            body['scans'] = scans
+        response = self.client.post('/api/sync/', body, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response.data
+    
+    def test_full_then_delta(self):
+        """Test the first sync sends everything and the next only changes"""
+        first = self.sync()
+        self.assertTrue(first['reset'])
+        self.assertEqual([c['id'] for c in first['changes']['classes']], [self.classe.id])
+        self.assertEqual([s['id'] for s in first['changes']['sessions']], [self.session.id])
+    
+        second = self.sync(first['cursor'])
+        self.assertFalse(second['reset'])
+        self.assertEqual(second['changes'], {'classes': [], 'sessions': [], 'attendance': []})
+    
+        self.session.duration = 1800
+        self.session.save()
+        third = self.sync(second['cursor'])
+        self.assertEqual([s['duration'] for s in third['changes']['sessions']], [1800])
+        self.assertEqual(third['changes']['classes'], [])
+    
+    def test_student_sees_enrolled_classes(self):
+        """Test students only sync their own classes, and a new enrollment resyncs them"""
+        other = Class.objects.create(name='Databases', code='DB201', professor=self.professor)
+        other_session = Session.objects.create(classe=other, professor=self.professor, is_active=False)
+        first = self.sync()
+        self.assertEqual([c['id'] for c in first['changes']['classes']], [self.classe.id])
+        self.assertEqual([s['id'] for s in first['changes']['sessions']], [self.session.id])
+        
+        Enrollment.objects.create(classe=other, student=self.student)
+        second = self.sync(first['cursor'])
+        self.assertTrue(second['reset'])
+        self.assertEqual({c['id'] for c in second['changes']['classes']}, {self.classe.id, other.id})
+        self.assertEqual({s['id'] for s in second['changes']['sessions']}, {self.session.id, other_session.id})
+        self.assertFalse(self.sync(second['cursor'])['reset'])
+    
+    def test_deletions_reported(self):
+        """Test deleted rows are sent as tombstones"""
+        cursor = self.sync()['cursor']
+        session_id = self.session.id
+        self.session.delete()
+        data = self.sync(cursor)
+        self.assertEqual(data['deleted']['sessions'], [session_id])
+    
+    def test_deletions_scoped_to_visible_rows(self):
+        """Test clients only receive the deletions of rows they could see"""
+        other_professor = User.objects.create_user(
+            username='other_professor',
+            email='other@example.com',
+            role=User.roles.PROFESOR
+        )
+        other_student = User.objects.create_user(
+            username='other_student',
+            email='other_student@example.com',
+            role=User.roles.STUDENT
+        )
+        other = Class.objects.create(name='Databases', code='DB201', professor=other_professor)
+        other_session = Session.objects.create(classe=other, professor=other_professor, is_active=False)
+        classmate = Attendance.objects.create(session=self.session, student=other_student)
+        cursor = self.sync()['cursor']
+        self.login(self.professor)
+        professor_cursor = self.sync()['cursor']
+        
+        classmate_id = classmate.id
+        other_session.delete()
+        classmate.delete()
+        self.login(self.student)
+        self.assertEqual(self.sync(cursor)['deleted'], {'classes': [], 'sessions': [], 'attendance': []})
+        self.login(self.professor)
+        data = self.sync(professor_cursor)
+        self.assertEqual(data['deleted'], {'classes': [], 'sessions': [], 'attendance': [classmate_id]})
+    
+    def test_class_deletion_reaches_students(self):
+        """Test students learn of a deleted class through their enrollment"""
+        cursor = self.sync()['cursor']
+        classe_id = self.classe.id
+        self.classe.delete()
+        self.assertEqual(self.sync(cursor)['deleted']['classes'], [classe_id])
+    
+    def test_delta_cost_independent_of_dataset(self):
+        """Test a delta sync runs a fixed number of queries"""
+        cursor = self.sync()['cursor']
+        Session.objects.bulk_create([
+            Session(classe=self.classe, professor=self.professor) for _ in range(20)
+        ])
+        # The student's new enrollments, then one query a stream and tombstones
+        with self.assertNumQueries(5):
+            data = self.sync(cursor)
+        self.assertEqual(len(data['changes']['sessions']), 20)
+    
+    @override_settings(SYNC_PAGE_SIZE=2)
+    def test_paged_catch_up(self):
+        """Test large deltas are returned in pages until has_more is false"""
+        Session.objects.bulk_create([
+            Session(classe=self.classe, professor=self.professor) for _ in range(4)
+        ])
+        seen, cursor, has_more = [], None, True
+        while has_more:
+            data = self.sync(cursor)
+            seen.extend(s['id'] for s in data['changes']['sessions'])
+            cursor, has_more = data['cursor'], data['has_more']
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+    
+    def test_expired_cursor_resets(self):
+        """Test a cursor older than the tombstone retention forces a resync"""
+        cursor = encode_cursor({'classes': [0, 0]}, timezone.now() - timedelta(days=365))
+        self.assertTrue(self.sync(cursor)['reset'])
+    
+    def test_invalid_cursor(self):
+        """Test a forged cursor is rejected"""
+        response = self.client.post('/api/sync/', {'cursor': 'forged'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_offline_scans_idempotent(self):
+        """Test offline scans are recorded once and retries report duplicates"""
+        scanned_at = self.session.start_time + timedelta(minutes=5)
+        token = qr_tokens.issue(self.session.id, now=scanned_at.timestamp())
+        scans = [{'qr_token': token, 'scanned_at': scanned_at.isoformat()}]
+        data = self.sync(scans=scans)
+        self.assertEqual(data['scans'][0]['result'], 'recorded')
+        self.assertEqual([a['session_id'] for a in data['changes']['attendance']], [self.session.id])
+    
+        retry = self.sync(scans=[{'session_id': self.session.id, 'scanned_at': scanned_at.isoformat()}])
+        self.assertEqual(retry['scans'][0]['result'], 'duplicate')
+        self.assertEqual(Attendance.objects.filter(student=self.student).count(), 1)
+    
+    def test_offline_scan_after_auto_close(self):
+        """Test an offline scan uploaded after the session closed replaces the recorded absence"""
+        enroll_students(self.classe.id, [self.student.id])
+        self.assertEqual(finalize_session(self.session), 1)
+        scanned_at = self.session.start_time + timedelta(minutes=5)
+        data = self.sync(scans=[{'session_id': self.session.id, 'scanned_at': scanned_at.isoformat()}])
+        self.assertEqual(data['scans'][0]['result'], 'recorded')
+        attendance = Attendance.objects.get(student=self.student)
+        self.assertEqual((attendance.status, attendance.scanned_at), (Attendance.statuses.PRESENT, scanned_at))
+        summary = AbsenceSummary.objects.get(student=self.student)
+        self.assertEqual((summary.present_count, summary.absent_count), (1, 0))
+        
+        retry = self.sync(scans=[{'session_id': self.session.id, 'scanned_at': scanned_at.isoformat()}])
+        self.assertEqual(retry['scans'][0]['result'], 'duplicate')
+    
+    def test_professor_absence_kept(self):
+        """Test an absence set by a professor is not overwritten by a later upload"""
+        Attendance.objects.create(
+            session=self.session, student=self.student, status=Attendance.statuses.ABSENT,
+            scanned_at=self.session.start_time
+        )
+        scanned_at = self.session.start_time + timedelta(minutes=5)
+        data = self.sync(scans=[{'session_id': self.session.id, 'scanned_at': scanned_at.isoformat()}])
+        self.assertEqual(data['scans'][0]['result'], 'duplicate')
+        self.assertEqual(Attendance.objects.get(student=self.student).status, Attendance.statuses.ABSENT)
+    
+    def test_offline_scan_outside_window(self):
+        """Test scans outside the session or with a stale token are rejected"""
+        late = self.session.start_time + timedelta(hours=1, minutes=5)
+        expired = qr_tokens.issue(self.session.id, now=(late - timedelta(minutes=10)).timestamp())
+        data = self.sync(scans=[
+            {'session_id': self.session.id, 'scanned_at': late.isoformat()},
+            {'qr_token': expired, 'scanned_at': late.isoformat()},
+        ])
+        self.assertEqual([scan['result'] for scan in data['scans']], ['rejected', 'rejected'])
+        self.assertFalse(Attendance.objects.exists())
+    
+    def test_offline_scan_after_grace(self):
+        """Test a session stops taking offline scans a grace period after it ended"""
+        scanned_at = self.session.start_time + timedelta(minutes=5)
+        token = qr_tokens.issue(self.session.id, now=scanned_at.timestamp())
+        with override_settings(SYNC_OFFLINE_SCAN_GRACE=60):
+            data = self.sync(scans=[{'qr_token': token, 'scanned_at': scanned_at.isoformat()}])
+        self.assertEqual(data['scans'][0]['error'], 'Session closed to offline scans')
+        self.assertEqual(Attendance.objects.filter(status=Attendance.statuses.PRESENT).count(), 0)
+    
+    def test_scans_students_only(self):
+        """Test professors cannot upload scans"""
+        self.login(self.professor)
+        response = self.client.post('/api/sync/', {
+            'scans': [{'session_id': self.session.id, 'scanned_at': timezone.now().isoformat()}]
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+    
+    def test_tombstone_written_on_delete(self):
+        """Test deleting a class leaves tombstones for it and its sessions"""
+        self.classe.delete()
+        self.assertEqual(
+            set(Tombstone.objects.values_list('model', flat=True)),
+            {'classes.class', 'session.session'}
+        )
@@ -0,0 +1,46 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .changes import collect_changes, decode_cursor
+from .scans import apply_offline_scans
+from .serializers import SyncRequestSerializer
+
+
+class SyncView(APIView):
+    """
+    API endpoint for offline-first clients
+    POST /api/sync/ - {"cursor": "<from the last sync>", "scans": [...]}
+    
+    Applies the scans queued offline (students only; each has `scanned_at`
+    and a `qr_token` or `session_id`), then returns the classes, sessions
+    and attendance records changed since `cursor` and the ids deleted since
+    then, with the cursor for the next call. Keep calling while `has_more`
+    is true. When `reset` is true, drop the local copy before applying.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        serializer = SyncRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        scans = serializer.validated_data.get('scans') or []
+        if scans and request.user.role != 'STUDENT':
+            return Response({
+                'error': 'Only students can upload scans'
+            }, status=status.HTTP_403_FORBIDDEN)
+        
+        cursor = serializer.validated_data.get('cursor')
+        if cursor:
+            try:
+                decode_cursor(cursor)
+            except ValueError as e:
+                return Response({
+                    'error': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Apply uploads first so the changes below already include them
+        results = apply_offline_scans(request.user.id, scans) if scans else []
+        payload = collect_changes(request.user, cursor)
+        payload['scans'] = results
+        return Response(payload, status=status.HTTP_200_OK)
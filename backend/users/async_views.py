@@ -0,0 +1,172 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, make_password
+from django.db import close_old_connections
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from .serializers import UserSerializer
+from .throttling import get_client_ip, login_throttle
+from .tokens import tokens_for_user
+
+User = get_user_model()
+
+
+class LoginGate:
+    """
+    Admission control for password verification.
+
+    Hashes are checked in a fixed-size thread pool so a login storm can use
+    at most `workers` threads, and at most `max_pending` logins may be
+    in progress at once; the rest are turned away immediately instead of
+    queueing behind the hash work; a `max_pending` of 0 or None admits every
+    login. Outdated hashes are re-encoded on a separate single-thread pool,
+    off the request path.
+    """
+
+    def __init__(self, workers, max_pending):
+        if max_pending is not None and max_pending < 0:
+            raise ValueError('max_pending must be 0 (unbounded) or more')
+        self.workers = workers
+        self.max_pending = max_pending or None
+        self._slots = threading.BoundedSemaphore(max_pending) if max_pending else None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='login-hash')
+        self._upgrade_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='login-rehash')
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.upgrades = 0
+
+    def admit(self):
+        """Reserve a login slot, returning False when the gate is full"""
+        if self._slots is not None and not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            return False
+        with self._lock:
+            self.in_flight += 1
+            self.admitted += 1
+            self.peak = max(self.peak, self.in_flight)
+        return True
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        if self._slots is not None:
+            self._slots.release()
+
+    async def verify(self, user, password):
+        """Check a password on the hashing pool without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._check, user, password)
+
+    def _check(self, user, password):
+        def setter(raw_password):
+            self.schedule_upgrade(user.pk, raw_password)
+        return check_password(password, user.password, setter)
+
+    def schedule_upgrade(self, user_id, raw_password):
+        with self._lock:
+            self.upgrades += 1
+        self._upgrade_executor.submit(_upgrade_hash, user_id, raw_password)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'in_flight': self.in_flight,
+                'queued': max(0, self.in_flight - self.workers),
+                'peak': self.peak,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'hash_upgrades': self.upgrades,
+            }
+
+
+def _upgrade_hash(user_id, raw_password):
+    """Re-encode a password with the current hasher settings"""
+    try:
+        User.objects.filter(pk=user_id).update(password=make_password(raw_password))
+    finally:
+        close_old_connections()
+
+
+_login_gate = None
+_login_gate_lock = threading.Lock()
+
+
+def get_login_gate():
+    global _login_gate
+    if _login_gate is None:
+        with _login_gate_lock:
+            if _login_gate is None:
+                _login_gate = LoginGate(
+                    workers=getattr(settings, 'ASYNC_LOGIN_WORKERS', 4),
+                    max_pending=getattr(settings, 'ASYNC_LOGIN_MAX_PENDING', 64),
+                )
+    return _login_gate
+
+
+@csrf_exempt
+@require_POST
+async def async_login(request):
+    """
+    Async API endpoint for user login
+    POST /api/auth/login/async/
+
+    Same contract as LoginView. Runs natively on the event loop when served
+    through backend/asgi.py; returns 503 when too many logins are in progress.
+    """
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+
+    errors = {
+        field: ['This field is required.']
+        for field in ('username', 'password')
+        if not isinstance(data.get(field), str) or not data.get(field)
+    }
+    if errors:
+        return JsonResponse(errors, status=400)
+
+    username, password = data['username'], data['password']
+    ip = get_client_ip(request)
+    if await sync_to_async(login_throttle.is_blocked)(username, ip):
+        return JsonResponse({'error': 'Too many failed login attempts. Try again later.'}, status=429)
+
+    gate = get_login_gate()
+    if not gate.admit():
+        response = JsonResponse({'error': 'Too many login attempts in progress, retry shortly'}, status=503)
+        response['Retry-After'] = '1'
+        return response
+
+    try:
+        user = await sync_to_async(login_throttle.get_user)(username)
+        if user is not None and not user.is_active:
+            return JsonResponse({'error': 'Account is disabled'}, status=403)
+        if user is None or not await gate.verify(user, password):
+            await sync_to_async(login_throttle.record_failure)(username, ip, request)
+            return JsonResponse({'error': 'Invalid username or password'}, status=401)
+    finally:
+        gate.release()
+
+    await sync_to_async(login_throttle.reset)(username)
+    # Writes an OutstandingToken row with JWT_TRACK_OUTSTANDING_TOKENS on
+    tokens = await sync_to_async(tokens_for_user)(user)
+
+    return JsonResponse({
+        'user': UserSerializer(user).data,
+        'message': 'Login successful',
+        'tokens': tokens
+    }, status=200)
@@ -1,9 +1,20 @@
+import hashlib
+
 from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
-from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth import get_user_model
+from caching.conditional import ConditionalGetMixin
+from caching.tiered import tiered_cache
+from .async_views import get_login_gate
+from .authentication import get_db_user
+from .importers import import_users, parse_rows
+from .pagination import UserCursorPagination, estimate_count
+from .permissions import IsAdmin
+from .tokens import ClaimsRefreshToken, tokens_for_user
+from .throttling import get_client_ip, login_throttle
 from .serializers import (
     UserRegistrationSerializer,
     UserLoginSerializer,
@@ -28,16 +39,10 @@ class RegisterView(generics.CreateAPIView):
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
         
-        # Generate JWT tokens for the new user
-        refresh = RefreshToken.for_user(user)
-        
         return Response({
             'user': UserSerializer(user).data,
             'message': 'User registered successfully',
-            'tokens': {
-                'refresh': str(refresh),
-                'access': str(refresh.access_token),
-            }
+            'tokens': tokens_for_user(user)
         }, status=status.HTTP_201_CREATED)
 
 
@@ -55,39 +60,50 @@ class LoginView(APIView):
         
         username = serializer.validated_data['username']
         password = serializer.validated_data['password']
+        ip = get_client_ip(request)
         
-        # Check if user exists first
-        try:
-            user = User.objects.get(username=username)
-            # Check if user is active before authenticating
-            if not user.is_active:
-                return Response({
-                    'error': 'Account is disabled'
-                }, status=status.HTTP_403_FORBIDDEN)
-            
-            # Authenticate user
-            user = authenticate(username=username, password=password)
-            
-            if user is not None:
-                # Generate JWT tokens
-                refresh = RefreshToken.for_user(user)
-                
-                return Response({
-                    'user': UserSerializer(user).data,
-                    'message': 'Login successful',
-                    'tokens': {
-                        'refresh': str(refresh),
-                        'access': str(refresh.access_token),
-                    }
-                }, status=status.HTTP_200_OK)
-            else:
-                return Response({
-                    'error': 'Invalid username or password'
-                }, status=status.HTTP_401_UNAUTHORIZED)
-        except User.DoesNotExist:
+        # Refuse repeat offenders before any database or hashing work
+        if login_throttle.is_blocked(username, ip):
+            return Response({
+                'error': 'Too many failed login attempts. Try again later.'
+            }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        
+        # Fetch the user once and reuse the row for every check
+        user = login_throttle.get_user(username)
+        if user is None:
+            login_throttle.record_failure(username, ip, request)
+            return Response({
+                'error': 'Invalid username or password'
+            }, status=status.HTTP_401_UNAUTHORIZED)
+        
+        if not user.is_active:
+            return Response({
+                'error': 'Account is disabled'
+            }, status=status.HTTP_403_FORBIDDEN)
+        
+        if not user.check_password(password):
+            login_throttle.record_failure(username, ip, request)
             return Response({
                 'error': 'Invalid username or password'
             }, status=status.HTTP_401_UNAUTHORIZED)
+        
+        login_throttle.reset(username)
+        return Response({
+            'user': UserSerializer(user).data,
+            'message': 'Login successful',
+            'tokens': tokens_for_user(user)
+        }, status=status.HTTP_200_OK)
+
+
+class LoginStatsView(APIView):
+    """
+    API endpoint for async login admission metrics (Admin only)
+    GET /api/auth/login/async/stats/
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+    
+    def get(self, request):
+        return Response(get_login_gate().stats(), status=status.HTTP_200_OK)
 
 
 class LogoutView(APIView):
@@ -101,7 +117,7 @@ class LogoutView(APIView):
         try:
             refresh_token = request.data.get('refresh_token')
             if refresh_token:
-                token = RefreshToken(refresh_token)
+                token = ClaimsRefreshToken(refresh_token)
                 token.blacklist()
                 return Response({
                     'message': 'Logout successful'
@@ -116,7 +132,16 @@ class LogoutView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserProfileView(generics.RetrieveUpdateAPIView):
+def get_profile_data(user):
+    """The serialized profile of `user`, cached until a user row changes"""
+    return tiered_cache.get_or_set(
+        f'profile:{user.id}',
+        lambda: dict(UserSerializer(get_db_user(user)).data),
+        models=[User]
+    )
+
+
+class UserProfileView(ConditionalGetMixin, generics.RetrieveUpdateAPIView):
     """
     API endpoint for viewing and updating user profile
     GET /api/auth/profile/ - Get current user profile
@@ -124,15 +149,15 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     """
     permission_classes = [IsAuthenticated]
     serializer_class = UserSerializer
+    etag_models = [User]
     
     def get_object(self):
-        return self.request.user
+        return get_db_user(self.request.user)
     
     def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        serializer = self.get_serializer(instance)
+        data = get_profile_data(request.user)
         return Response({
-            'user': serializer.data
+            'user': data
         }, status=status.HTTP_200_OK)
     
     def update(self, request, *args, **kwargs):
@@ -157,11 +182,11 @@ class ChangePasswordView(APIView):
     serializer_class = ChangePasswordSerializer
     
     def post(self, request):
-        serializer = ChangePasswordSerializer(data=request.data, context={'request': request})
+        user = get_db_user(request.user)
+        serializer = ChangePasswordSerializer(data=request.data, context={'request': request, 'user': user})
         serializer.is_valid(raise_exception=True)
         
         # Set new password
-        user = request.user
         user.set_password(serializer.validated_data['new_password'])
         user.save()
         
@@ -170,19 +195,96 @@ class ChangePasswordView(APIView):
         }, status=status.HTTP_200_OK)
 
 
-class UserListView(generics.ListAPIView):
+class UserListView(ConditionalGetMixin, generics.ListAPIView):
     """
     API endpoint for listing all users (Admin only)
     GET /api/auth/users/
+    
+    Query parameters:
+        role, is_active - filter the list
+        fields - comma separated subset of user fields to return
+        ordering - id, -id, date_joined or -date_joined (default -id)
+        cursor, page_size - keyset pagination
+        count - estimate (default; exact up to USER_LIST_COUNT_LIMIT rows,
+                see estimate_count), exact (a full COUNT) or none
     """
-    queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = UserCursorPagination
+    etag_models = [User]
+    
+    def get_requested_fields(self):
+        requested = self.request.query_params.get('fields')
+        if not requested:
+            return None
+        allowed = UserSerializer.Meta.fields
+        return [field for field in requested.split(',') if field in allowed] or None
+    
+    def get_queryset(self):
+        queryset = User.objects.all()
+        role = self.request.query_params.get('role')
+        if role:
+            queryset = queryset.filter(role=role)
+        is_active = self.request.query_params.get('is_active')
+        if is_active is not None:
+            queryset = queryset.filter(is_active=is_active.lower() in ('1', 'true', 'yes'))
+        fields = self.get_requested_fields()
+        if fields:
+            # Ordering fields must stay loaded for the pagination cursor
+            queryset = queryset.only('id', 'date_joined', *fields)
+        return queryset
     
     def list(self, request, *args, **kwargs):
+        # Pages are cached per URL until a user row changes
+        url_hash = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+        data = tiered_cache.get_or_set(f'user-list:{url_hash}', self.get_page_data, models=[User])
+        return Response(data, status=status.HTTP_200_OK)
+    
+    def get_page_data(self):
+        request = self.request
         queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True, fields=self.get_requested_fields())
+        
+        count_mode = request.query_params.get('count', 'estimate')
+        count, exact = None, True
+        if count_mode == 'exact':
+            count = queryset.count()
+        elif count_mode != 'none':
+            count, exact = estimate_count(queryset)
+        return self.paginator.get_paginated_response(serializer.data, count=count, exact=exact).data
+
+
+class UserImportView(APIView):
+    """
+    API endpoint for bulk importing users (Admin only)
+    POST /api/auth/users/import/
+    
+    Accepts a multipart `file` (CSV with a header row or JSON) or a JSON
+    body of the form {"users": [...]}. Returns the number of users created
+    and the errors of every rejected row.
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+    parser_classes = [JSONParser, MultiPartParser]
+    
+    def post(self, request):
+        upload = request.FILES.get('file')
+        try:
+            if upload is not None:
+                fmt = request.data.get('format') or upload.name.rsplit('.', 1)[-1].lower()
+                rows = parse_rows(upload.read(), fmt)
+            else:
+                rows = request.data.get('users')
+                if not isinstance(rows, list):
+                    raise ValueError("Provide a roster file or a 'users' list")
+        except ValueError as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        report = import_users(rows)
         return Response({
-            'users': serializer.data,
-            'count': queryset.count()
-        }, status=status.HTTP_200_OK)
+            'message': f"Imported {report['created']} users",
+            'created': report['created'],
+            'errors': report['errors']
+        }, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,98 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import CLAIMS_VERSION_CLAIM, USER_CLAIMS, claims_version
+
+User = get_user_model()
+
+
+class ClaimsUser(TokenUser):
+    """
+    Lightweight user built from token claims instead of a database row.
+    Exposes what permissions need (id, username, role, is_active); views
+    that need the full row should load it with `get_db_user`.
+    """
+
+    @cached_property
+    def id(self):
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def role(self):
+        return self.token.get('role')
+
+    @cached_property
+    def is_active(self):
+        return self.token.get('is_active', False)
+
+    def __str__(self):
+        return self.username
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the claims embedded in the token.
+
+    Tokens issued by `tokens_for_user` carry the user's role, username and
+    active flag, so no query is made for them as long as the user's claims
+    version (one cache read) still matches the token's: a user deactivated
+    or given another role since the token was issued is read from the
+    database instead. Older tokens without the claims fall back to the same
+    lookup, whose result is cached for `AUTH_USER_CACHE_TIMEOUT` seconds.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = int(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, TypeError, ValueError):
+            raise AuthenticationFailed('Token contained no recognizable user identification')
+
+        if (
+            all(claim in validated_token for claim in USER_CLAIMS)
+            and validated_token.get(CLAIMS_VERSION_CLAIM, 0) == claims_version(user_id)
+        ):
+            claims = validated_token
+        else:
+            claims = get_user_claims(user_id)
+
+        user = ClaimsUser(claims)
+        if not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        return user
+
+
+def user_claims_cache_key(user_id):
+    return f'auth:user-claims:{user_id}'
+
+
+def get_user_claims(user_id):
+    """Return the authorization claims of a user, cached for a short time"""
+    key = user_claims_cache_key(user_id)
+    claims = cache.get(key)
+    if claims is None:
+        user = User.objects.filter(pk=user_id).only('id', *USER_CLAIMS).first()
+        if user is None:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        claims = {claim: getattr(user, claim) for claim in USER_CLAIMS}
+        claims[api_settings.USER_ID_CLAIM] = user.pk
+        timeout = getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60)
+        if timeout:
+            cache.set(key, claims, timeout)
+    return claims
+
+
+def get_db_user(user):
+    """Return the database row behind an authenticated request user"""
+    if isinstance(user, User):
+        return user
+    try:
+        return User.objects.get(pk=user.pk)
+    except User.DoesNotExist:
+        # Deleted after the token was issued
+        raise AuthenticationFailed('User not found', code='user_not_found')
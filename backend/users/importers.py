@@ -0,0 +1,188 @@
+import csv
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+
+from caching.tiered import invalidate_model
+
+from .throttling import login_throttle
+
+User = get_user_model()
+
+IMPORT_FIELDS = ('username', 'email', 'password', 'matricule', 'role', 'first_name', 'last_name')
+REQUIRED_FIELDS = ('username', 'email', 'password')
+UNIQUE_FIELDS = ('username', 'email', 'matricule')
+VALIDATED_FIELDS = ('username', 'email', 'matricule', 'first_name', 'last_name')
+
+
+def parse_rows(content, fmt):
+    """Parse CSV or JSON roster content into a list of dicts"""
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+    if fmt == 'csv':
+        return [dict(row) for row in csv.DictReader(io.StringIO(content))]
+    if fmt == 'json':
+        data = json.loads(content)
+        if isinstance(data, dict):
+            data = data.get('users', [])
+        if not isinstance(data, list):
+            raise ValueError("JSON roster must be a list of users or {'users': [...]}")
+        return data
+    raise ValueError(f"Unsupported format '{fmt}'. Use 'csv' or 'json'.")
+
+
+def import_users(rows, chunk_size=500, workers=None):
+    """
+    Create users from roster rows in bulk.
+
+    Uniqueness of username, email and matricule is checked with one
+    `IN` query per field and chunk instead of one query per row,
+    passwords are hashed across a process pool and rows are inserted
+    with `bulk_create`. Returns a report with the number of users created
+    and the errors of every rejected row (rows are numbered from 1).
+    """
+    errors = {}
+    candidates = []
+    for number, raw in enumerate(rows, start=1):
+        row, row_errors = clean_row(raw)
+        if row_errors:
+            errors[number] = row_errors
+        else:
+            candidates.append((number, row))
+
+    find_duplicates(candidates, errors)
+    candidates = [(number, row) for number, row in candidates if number not in errors]
+
+    passwords = hash_passwords([row['password'] for _, row in candidates], workers)
+    users = []
+    for (number, row), password in zip(candidates, passwords):
+        row['password'] = password
+        users.append((number, User(**row)))
+
+    created = 0
+    for start in range(0, len(users), chunk_size):
+        created += insert_chunk(users[start:start + chunk_size], errors)
+    # bulk_create sends no post_save, so clear negative login lookups and
+    # retire cached user reads here
+    login_throttle.forget_unknown([user.username for _, user in users])
+    if created:
+        invalidate_model(User)
+
+    return {
+        'created': created,
+        'errors': [{'row': number, 'errors': errors[number]} for number in sorted(errors)],
+    }
+
+
+def clean_row(raw):
+    """Normalize a roster row and return (row, errors)"""
+    if not isinstance(raw, dict):
+        return None, {'non_field_errors': ['Row must be an object.']}
+
+    row = {}
+    errors = {}
+    for field in IMPORT_FIELDS:
+        value = raw.get(field)
+        if isinstance(value, str):
+            value = value.strip()
+        elif value is not None:
+            errors[field] = ['Not a valid string.']
+            value = None
+        row[field] = value
+
+    for field in REQUIRED_FIELDS:
+        if not row[field] and field not in errors:
+            errors[field] = ['This field is required.']
+
+    row['email'] = User.objects.normalize_email(row['email'] or '')
+    row['matricule'] = row['matricule'] or None
+    row['role'] = row['role'] or User.roles.PROFESOR
+    row['first_name'] = row['first_name'] or ''
+    row['last_name'] = row['last_name'] or ''
+
+    if row['role'] not in User.roles.values:
+        errors['role'] = ["Invalid role. Must be 'ADMIN', 'PROFESSOR' or 'STUDENT'."]
+    # The model's own validators: username characters, max_length, email
+    for field in VALIDATED_FIELDS:
+        if field in errors:
+            continue
+        try:
+            User._meta.get_field(field).run_validators(row[field])
+        except ValidationError as e:
+            errors[field] = list(e.messages)
+    if 'password' not in errors:
+        try:
+            validate_password(row['password'])
+        except ValidationError as e:
+            errors['password'] = list(e.messages)
+    return row, errors
+
+
+def find_duplicates(candidates, errors, batch_size=1000):
+    """Flag rows whose unique fields repeat within the roster or already exist"""
+    for field in UNIQUE_FIELDS:
+        seen = {}
+        for number, row in candidates:
+            value = row[field]
+            if value is None:
+                continue
+            if value in seen:
+                errors.setdefault(number, {})[field] = [f'Duplicate {field} in roster (row {seen[value]}).']
+            else:
+                seen[value] = number
+
+        values = list(seen)
+        existing = set()
+        for start in range(0, len(values), batch_size):
+            lookup = {f'{field}__in': values[start:start + batch_size]}
+            existing.update(User.objects.filter(**lookup).values_list(field, flat=True))
+        for value in existing:
+            errors.setdefault(seen[value], {})[field] = [f'A user with that {field} already exists.']
+
+
+def hash_passwords(passwords, workers=None):
+    """Hash passwords with the configured hasher, in parallel when possible"""
+    if workers is None:
+        workers = getattr(settings, 'USER_IMPORT_HASH_WORKERS', None) or os.cpu_count() or 1
+    workers = min(workers, len(passwords))
+    if workers <= 1:
+        return [make_password(password) for password in passwords]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_setup_worker) as executor:
+        chunksize = max(1, len(passwords) // (workers * 4))
+        return list(executor.map(make_password, passwords, chunksize=chunksize))
+
+
+def _setup_worker():
+    import django
+    django.setup()
+
+
+def insert_chunk(users, errors):
+    """Insert a chunk of users, falling back to row-by-row on a database error"""
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create([user for _, user in users])
+        return len(users)
+    except DatabaseError:
+        pass
+
+    # Another writer created a conflicting account since validation, or a
+    # value the database rejects slipped through; report it on its row
+    created = 0
+    for number, user in users:
+        user.pk = None
+        try:
+            with transaction.atomic():
+                user.save(force_insert=True)
+            created += 1
+        except DatabaseError as e:
+            errors[number] = {'non_field_errors': [str(e)]}
+    return created
@@ -0,0 +1,32 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.importers import import_users, parse_rows
+
+
+class Command(BaseCommand):
+    help = 'Bulk import users from a CSV or JSON roster'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file with a header row, or JSON list of users')
+        parser.add_argument('--format', choices=['csv', 'json'], help='Defaults to the file extension')
+        parser.add_argument('--workers', type=int, help='Password hashing processes (default: CPU count)')
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        fmt = options['format'] or path.suffix.lstrip('.').lower()
+        try:
+            rows = parse_rows(path.read_bytes(), fmt)
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        report = import_users(rows, chunk_size=options['chunk_size'], workers=options['workers'])
+
+        for error in report['errors']:
+            self.stderr.write(f"Row {error['row']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created']} users, {len(report['errors'])} rows rejected"
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from users.revocation import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired outstanding and blacklisted JWT tokens in batches '
+        '(run_jobs workers also do this every JWT_PRUNE_INTERVAL seconds)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        removed = prune_expired_tokens(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Pruned {removed} expired tokens'))
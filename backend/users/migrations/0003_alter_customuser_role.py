@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customuser',
+            name='role',
+            field=models.CharField(choices=[('ADMIN', 'Admin'), ('PROFESSOR', 'professor'), ('STUDENT', 'student')], default='ADMIN', max_length=20),
+        ),
+    ]
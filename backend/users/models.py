@@ -7,11 +7,18 @@ class CustomUser(AbstractUser):
     class roles(models.TextChoices):
         ADMIN = 'ADMIN', 'Admin'
         PROFESOR = 'PROFESSOR', 'professor'
+        STUDENT = 'STUDENT', 'student'
 
     role = models.CharField(max_length=20, choices=roles.choices, default=roles.ADMIN)
     email = models.EmailField(unique=True)
     matricule = models.CharField(max_length=100, unique=True, null=True, blank=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Back the role/is_active filters and keyset pages of the user list
+            models.Index(fields=['role', 'is_active', 'id'], name='user_role_active_idx'),
+            models.Index(fields=['date_joined', 'id'], name='user_date_joined_idx'),
+        ]
 
     def __str__(self):
         return self.username
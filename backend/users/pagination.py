@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.db import connection
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class UserCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the user list.
+    Pages are fetched with `WHERE <ordering field> > <cursor> LIMIT n`, so
+    every page costs the same whatever its position in the table.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = '-id'
+    ordering_query_param = 'ordering'
+    allowed_orderings = ('id', '-id', 'date_joined', '-date_joined')
+
+    def get_ordering(self, request, queryset, view):
+        ordering = request.query_params.get(self.ordering_query_param)
+        if ordering not in self.allowed_orderings:
+            ordering = self.ordering
+        if ordering.lstrip('-') == 'id':
+            return (ordering,)
+        # id breaks ties between accounts created in the same instant
+        return (ordering, '-id' if ordering.startswith('-') else 'id')
+
+    def get_paginated_response(self, data, count=None, exact=True):
+        response = {
+            'users': data,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        }
+        if count is not None:
+            response['count'] = count
+            response['count_exact'] = exact
+        return Response(response)
+
+
+def estimate_count(queryset, limit=None):
+    """
+    Return (count, exact) for a queryset without an unbounded scan. Unfiltered
+    PostgreSQL tables use the planner's estimate, which is not exact. Anything
+    else is counted over a `LIMIT limit + 1` subquery (USER_LIST_COUNT_LIMIT
+    by default): exact below the limit, otherwise `limit` and not exact.
+    """
+    if connection.vendor == 'postgresql' and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 until the table has been analyzed
+        if row and row[0] >= 0:
+            return row[0], False
+    if limit is None:
+        limit = getattr(settings, 'USER_LIST_COUNT_LIMIT', 10000)
+    count = queryset.order_by()[:limit + 1].count()
+    return min(count, limit), count <= limit
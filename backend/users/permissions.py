@@ -15,3 +15,10 @@ class IsProfessor(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user and request.user.role == 'PROFESSOR'
 
+
+class IsStudent(permissions.BasePermission):
+    """
+    Custom permission to only allow students to access certain views.
+    """
+    def has_permission(self, request, view):
+        return request.user and request.user.role == 'STUDENT'
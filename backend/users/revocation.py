@@ -0,0 +1,102 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class RevocationIndex:
+    """
+    In-process index of revoked token JTIs.
+
+    Each process keeps a dict of revoked JTIs and their expiry so that the
+    common case (a revoked token seen again by the same worker) is a dict
+    lookup. Revocations are published to the shared cache so that other
+    workers pick them up with a single cache read, and the index is warmed
+    from `BlacklistedToken` once per process so a cold cache never lets a
+    revoked token through. Expired entries are dropped, which keeps the
+    index bounded by the number of revoked-but-unexpired tokens.
+    """
+
+    cache_prefix = 'auth:revoked:'
+    sweep_interval = 300
+
+    def __init__(self):
+        self._revoked = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._last_sweep = time.time()
+
+    def revoke(self, jti, exp):
+        """Mark a token as revoked until its expiry (epoch seconds)"""
+        timeout = int(exp - time.time())
+        if timeout <= 0:
+            return
+        with self._lock:
+            self._revoked[jti] = exp
+        cache.set(self.cache_prefix + jti, exp, timeout)
+
+    def is_revoked(self, jti):
+        """Return True if the token with this JTI has been revoked"""
+        self._ensure_loaded()
+        now = time.time()
+        if now - self._last_sweep > self.sweep_interval:
+            self.sweep(now)
+
+        exp = self._revoked.get(jti)
+        if exp is not None:
+            return exp > now
+
+        exp = cache.get(self.cache_prefix + jti)
+        if exp is None:
+            return False
+        with self._lock:
+            self._revoked[jti] = exp
+        return True
+
+    def sweep(self, now=None):
+        """Drop entries of tokens that have expired anyway"""
+        now = now or time.time()
+        with self._lock:
+            self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+            self._last_sweep = now
+
+    def reset(self):
+        with self._lock:
+            self._revoked = {}
+            self._loaded = False
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            rows = BlacklistedToken.objects.filter(
+                token__expires_at__gt=timezone.now()
+            ).values_list('token__jti', 'token__expires_at')
+            for jti, expires_at in rows.iterator():
+                self._revoked[jti] = expires_at.timestamp()
+            self._loaded = True
+
+
+revocation_index = RevocationIndex()
+
+
+def prune_expired_tokens(batch_size=5000):
+    """
+    Delete expired outstanding and blacklisted tokens in batches.
+    Returns the number of outstanding tokens removed.
+    """
+    expired = OutstandingToken.objects.filter(expires_at__lte=timezone.now())
+    removed = 0
+    while True:
+        ids = list(expired.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        # Blacklist entries go with their outstanding token (CASCADE)
+        OutstandingToken.objects.filter(id__in=ids).delete()
+        removed += len(ids)
+    revocation_index.sweep()
+    return removed
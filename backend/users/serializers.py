@@ -9,6 +9,14 @@ User = get_user_model()
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for user details"""
     
+    def __init__(self, *args, **kwargs):
+        # Optional `fields` argument restricts the output to a subset of fields
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+    
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'matricule', 'role', 'first_name', 'last_name', 'date_joined']
@@ -56,8 +64,8 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     
     def validate_role(self, value):
         """Validate role is one of the allowed choices"""
-        if value not in [User.roles.ADMIN, User.roles.PROFESOR]:
-            raise serializers.ValidationError("Invalid role. Must be 'ADMIN' or 'PROFESSOR'.")
+        if value not in User.roles.values:
+            raise serializers.ValidationError("Invalid role. Must be 'ADMIN', 'PROFESSOR' or 'STUDENT'.")
         return value
     
     def create(self, validated_data):
@@ -114,7 +122,7 @@ class ChangePasswordSerializer(serializers.Serializer):
     
     def validate_old_password(self, value):
         """Validate that old password is correct"""
-        user = self.context['request'].user
+        user = self.context['user']
         if not user.check_password(value):
             raise serializers.ValidationError("Old password is incorrect.")
         return value
@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .throttling import login_throttle
+from .tokens import USER_CLAIMS, bump_claims_version
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def forget_unknown_username(sender, instance, **kwargs):
+    """A username that now exists must no longer be reported as unknown"""
+    login_throttle.forget_unknown([instance.username])
+
+
+@receiver(pre_save, sender=User)
+def note_claims_change(sender, instance, update_fields=None, **kwargs):
+    """Compare the claims tokens carry with the stored row before it is overwritten"""
+    instance._claims_changed = False
+    if instance.pk is None or (update_fields is not None and not set(update_fields) & set(USER_CLAIMS)):
+        return
+    stored = User.objects.filter(pk=instance.pk).values(*USER_CLAIMS).first()
+    instance._claims_changed = stored is not None and any(
+        stored[claim] != getattr(instance, claim) for claim in USER_CLAIMS
+    )
+
+
+@receiver(post_save, sender=User)
+def retire_stale_claims(sender, instance, **kwargs):
+    """Tokens issued before a role, username or status change are re-checked"""
+    if getattr(instance, '_claims_changed', False):
+        bump_claims_version(instance.pk)
+        if connection.in_atomic_block:
+            # Again on commit, in case a request read the old row meanwhile
+            transaction.on_commit(lambda: bump_claims_version(instance.pk))
+
+
+@receiver(post_delete, sender=User)
+def retire_deleted_user_claims(sender, instance, **kwargs):
+    """Tokens of a deleted user are re-checked, and fail to find the row"""
+    user_id = instance.pk
+    bump_claims_version(user_id)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: bump_claims_version(user_id))
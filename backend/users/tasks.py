@@ -0,0 +1,10 @@
+from django.conf import settings
+
+from jobs.queue import task
+
+from .revocation import prune_expired_tokens
+
+
+@task('users.prune_tokens', every=getattr(settings, 'JWT_PRUNE_INTERVAL', 86400))
+def prune_tokens():
+    return {'removed': prune_expired_tokens()}
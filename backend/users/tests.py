@@ -1,8 +1,25 @@
-from django.test import TestCase
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from django.contrib.auth import get_user_model
-from rest_framework.test import APITestCase, APIClient
+from django.core.cache import cache
+from rest_framework.test import APITestCase, APIClient, APIRequestFactory
 from rest_framework import status
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from unittest import mock
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.signals import user_login_failed
+from backend.testing import Grower, QueryBudgetMixin, bulk_users
+from .async_views import LoginGate
+from .authentication import ClaimsJWTAuthentication
+from .importers import import_users
+from .revocation import RevocationIndex, prune_expired_tokens, revocation_index
+from .tokens import ClaimsRefreshToken
 
 User = get_user_model()
 
@@ -130,6 +147,7 @@ class UserLoginTest(APITestCase):
     """Test cases for user login endpoint"""
     
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.login_url = '/api/auth/login/'
         self.user = User.objects.create_user(
@@ -276,6 +294,29 @@ class UserProfileTest(APITestCase):
         data = {'first_name': 'Jane'}
         response = self.client.patch(self.profile_url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_profile_not_modified(self):
+        """Test a matching ETag is answered with 304 without queries"""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access_token}')
+        response = self.client.get(self.profile_url)
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.profile_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        
+        response = self.client.get(self.profile_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+    
+    def test_profile_etag_changes_on_update(self):
+        """Test the ETag changes once the profile is written"""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access_token}')
+        etag = self.client.get(self.profile_url)['ETag']
+        self.client.patch(self.profile_url, {'first_name': 'Jane'}, format='json')
+        response = self.client.get(self.profile_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user']['first_name'], 'Jane')
+        self.assertNotEqual(response['ETag'], etag)
 
 
 class ChangePasswordTest(APITestCase):
@@ -368,11 +409,86 @@ class UserListTest(APITestCase):
         self.assertIn('users', response.data)
         self.assertIn('count', response.data)
         self.assertEqual(response.data['count'], 2)
+        self.assertTrue(response.data['count_exact'])
     
     def test_list_users_without_authentication(self):
         """Test user list fails without authentication"""
         response = self.client.get(self.users_url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_list_users_cursor_pagination(self):
+        """Test user list is paginated with a cursor"""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access_token}')
+        response = self.client.get(self.users_url, {'page_size': 1, 'ordering': 'id'})
+        self.assertEqual(len(response.data['users']), 1)
+        self.assertEqual(response.data['users'][0]['username'], 'user1')
+        self.assertIsNotNone(response.data['next'])
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.data['users'][0]['username'], 'user2')
+        self.assertIsNone(response.data['next'])
+    
+    def test_list_users_selected_fields(self):
+        """Test the fields parameter trims the serialized users"""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access_token}')
+        response = self.client.get(self.users_url, {'fields': 'id,username'})
+        self.assertEqual(set(response.data['users'][0]), {'id', 'username'})
+    
+    def test_list_users_filters(self):
+        """Test filtering the user list by role and active flag"""
+        self.user2.role = User.roles.PROFESOR
+        self.user2.is_active = False
+        self.user2.save()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access_token}')
+        response = self.client.get(self.users_url, {'role': 'PROFESSOR', 'is_active': 'false'})
+        self.assertEqual([user['username'] for user in response.data['users']], ['user2'])
+        self.assertEqual(response.data['count'], 1)
+    
+    def test_list_users_without_count(self):
+        """Test the count can be skipped"""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access_token}')
+        response = self.client.get(self.users_url, {'count': 'none'})
+        self.assertNotIn('count', response.data)
+    
+    @override_settings(USER_LIST_COUNT_LIMIT=1)
+    def test_list_users_count_capped(self):
+        """Test the default count stops at USER_LIST_COUNT_LIMIT and says so"""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access_token}')
+        response = self.client.get(self.users_url, {'role': 'ADMIN'})
+        self.assertEqual((response.data['count'], response.data['count_exact']), (1, False))
+        response = self.client.get(self.users_url, {'role': 'ADMIN', 'count': 'exact'})
+        self.assertEqual((response.data['count'], response.data['count_exact']), (2, True))
+
+
+class UserQueryBudgetTest(QueryBudgetMixin, APITestCase):
+    """Query and latency budgets of the user endpoints as the user table grows"""
+    
+    def setUp(self):
+        admin = User.objects.create_user(
+            username='admin',
+            email='admin@example.com',
+            password='AdminPass123!',
+            role=User.roles.ADMIN
+        )
+        self.grow = Grower(lambda start, count: bulk_users(count, start=start))
+        token = ClaimsRefreshToken.for_user(admin).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    
+    def test_user_list_budget(self):
+        """Test a user list page costs the same whatever the table size"""
+        self.assertQueryBudget('/api/auth/users/', self.grow, max_queries=2, max_ms=500)
+    
+    def test_user_list_filtered_budget(self):
+        """Test filtered pages without a count stay flat"""
+        self.assertQueryBudget('/api/auth/users/?role=STUDENT&count=none', self.grow, max_queries=1, max_ms=500)
+    
+    @override_settings(USER_LIST_COUNT_LIMIT=100)
+    def test_user_list_filtered_count_budget(self):
+        """Test the default count of a filtered list is bounded by USER_LIST_COUNT_LIMIT"""
+        self.assertQueryBudget('/api/auth/users/?role=STUDENT', self.grow, max_queries=2, max_ms=500)
+    
+    def test_profile_budget(self):
+        """Test reading the profile does not depend on other users"""
+        self.assertQueryBudget('/api/auth/profile/', self.grow, max_queries=1, max_ms=250)
 
 
 class TokenRefreshTest(APITestCase):
@@ -432,3 +548,424 @@ class PermissionsTest(APITestCase):
     def test_professor_role_assignment(self):
         """Test professor role is correctly assigned"""
         self.assertEqual(self.professor_user.role, User.roles.PROFESOR)
+
+
+class ClaimsAuthenticationTest(APITestCase):
+    """Test cases for claims-based JWT authentication"""
+    
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.authentication = ClaimsJWTAuthentication()
+        self.user = User.objects.create_user(
+            username='professor',
+            email='prof@example.com',
+            password='ProfPass123!',
+            role=User.roles.PROFESOR
+        )
+    
+    def authenticate(self, token):
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return self.authentication.authenticate(request)
+    
+    def test_login_tokens_carry_claims(self):
+        """Test login issues access tokens with role, username and is_active"""
+        response = self.client.post('/api/auth/login/', {
+            'username': 'professor',
+            'password': 'ProfPass123!'
+        }, format='json')
+        access = AccessToken(response.data['tokens']['access'])
+        self.assertEqual(access['role'], User.roles.PROFESOR)
+        self.assertEqual(access['username'], 'professor')
+        self.assertTrue(access['is_active'])
+    
+    def test_authenticate_without_queries(self):
+        """Test claims-bearing tokens are authenticated without touching the database"""
+        token = ClaimsRefreshToken.for_user(self.user).access_token
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate(token)
+        self.assertEqual(user.id, self.user.id)
+        self.assertEqual(user.role, User.roles.PROFESOR)
+        self.assertTrue(user.is_authenticated)
+    
+    def test_inactive_claim_rejected(self):
+        """Test tokens issued to an inactive user are rejected"""
+        self.user.is_active = False
+        token = ClaimsRefreshToken.for_user(self.user).access_token
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+    
+    def test_deactivated_user_token_rejected(self):
+        """Test a token issued before the user was deactivated stops working"""
+        token = ClaimsRefreshToken.for_user(self.user).access_token
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+    
+    def test_demoted_user_reads_current_role(self):
+        """Test a token issued before a role change is authorized with the new role"""
+        token = ClaimsRefreshToken.for_user(self.user).access_token
+        self.user.role = User.roles.STUDENT
+        self.user.save()
+        user, _ = self.authenticate(token)
+        self.assertEqual(user.role, User.roles.STUDENT)
+        # Tokens issued after the change carry it and need no query again
+        token = ClaimsRefreshToken.for_user(self.user).access_token
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate(token)
+        self.assertEqual(user.role, User.roles.STUDENT)
+    
+    def test_deleted_user_token_rejected(self):
+        """Test a token issued before the user was deleted stops working"""
+        token = ClaimsRefreshToken.for_user(self.user).access_token
+        self.user.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_unrelated_save_keeps_tokens(self):
+        """Test saving a user without changing their claims keeps tokens query-free"""
+        token = ClaimsRefreshToken.for_user(self.user).access_token
+        self.user.first_name = 'Ada'
+        self.user.save()
+        with self.assertNumQueries(0):
+            self.authenticate(token)
+    
+    def test_legacy_token_falls_back_to_cache(self):
+        """Test tokens without claims are resolved once and then served from cache"""
+        token = RefreshToken.for_user(self.user).access_token
+        with self.assertNumQueries(1):
+            user, _ = self.authenticate(token)
+        self.assertEqual(user.role, User.roles.PROFESOR)
+        with self.assertNumQueries(0):
+            self.authenticate(token)
+
+
+class TokenRevocationTest(APITestCase):
+    """Test cases for the revocation index and token pruning"""
+    
+    def setUp(self):
+        cache.clear()
+        revocation_index.reset()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='TestPass123!'
+        )
+        self.refresh = ClaimsRefreshToken.for_user(self.user)
+    
+    def test_issuing_tokens_writes_no_outstanding_row(self):
+        """Test refresh tokens are issued without an OutstandingToken insert"""
+        self.assertEqual(OutstandingToken.objects.count(), 0)
+    
+    def test_blacklisted_token_cannot_refresh(self):
+        """Test a logged-out refresh token is rejected without a blacklist query"""
+        self.refresh.blacklist()
+        revocation_index.is_revoked('warm-up')
+        with self.assertNumQueries(0):
+            self.assertTrue(revocation_index.is_revoked(self.refresh['jti']))
+        response = self.client.post('/api/auth/token/refresh/', {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_revocation_shared_through_cache(self):
+        """Test another worker's index sees a revocation via the cache"""
+        other_worker = RevocationIndex()
+        other_worker.is_revoked('warm-up')
+        self.refresh.blacklist()
+        with self.assertNumQueries(0):
+            self.assertTrue(other_worker.is_revoked(self.refresh['jti']))
+    
+    def test_revocation_survives_cold_cache(self):
+        """Test the index is rebuilt from the blacklist table"""
+        self.refresh.blacklist()
+        cache.clear()
+        revocation_index.reset()
+        self.assertTrue(revocation_index.is_revoked(self.refresh['jti']))
+    
+    def test_refresh_reads_current_claims(self):
+        """Test refreshed access tokens reflect the user's current role"""
+        self.user.role = User.roles.PROFESOR
+        self.user.save()
+        response = self.client.post('/api/auth/token/refresh/', {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.data['access'])['role'], User.roles.PROFESOR)
+    
+    def test_prune_expired_tokens(self):
+        """Test expired outstanding and blacklisted rows are deleted"""
+        self.refresh.blacklist()
+        live = ClaimsRefreshToken.for_user(self.user)
+        live.blacklist()
+        OutstandingToken.objects.filter(jti=self.refresh['jti']).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        self.assertEqual(prune_expired_tokens(batch_size=1), 1)
+        self.assertEqual(OutstandingToken.objects.count(), 1)
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+
+@override_settings(USER_IMPORT_HASH_WORKERS=1)
+class UserImportTest(APITestCase):
+    """Test cases for bulk user import"""
+    
+    def setUp(self):
+        self.import_url = '/api/auth/users/import/'
+        self.admin = User.objects.create_user(
+            username='admin',
+            email='admin@example.com',
+            password='AdminPass123!',
+            role=User.roles.ADMIN,
+            matricule='ADM1'
+        )
+        self.access_token = str(ClaimsRefreshToken.for_user(self.admin).access_token)
+    
+    def roster(self):
+        return [
+            {'username': 'prof1', 'email': 'prof1@example.com', 'password': 'ProfPass123!', 'matricule': 'P1'},
+            {'username': 'prof2', 'email': 'prof2@example.com', 'password': 'ProfPass123!', 'role': 'ADMIN'},
+            {'username': 'prof3', 'email': 'prof1@example.com', 'password': 'ProfPass123!'},
+            {'username': 'prof4', 'email': 'admin@example.com', 'password': 'ProfPass123!', 'matricule': 'ADM1'},
+            {'username': 'prof5', 'email': 'prof5@example.com', 'password': 'ProfPass123!', 'role': 'INVALID'},
+            {'username': 'prof6', 'email': 'prof6@example.com'},
+        ]
+    
+    def test_import_users_report(self):
+        """Test valid rows are created and invalid rows reported"""
+        report = import_users(self.roster())
+        self.assertEqual(report['created'], 2)
+        errors = {error['row']: error['errors'] for error in report['errors']}
+        self.assertEqual(set(errors), {3, 4, 5, 6})
+        self.assertIn('email', errors[3])
+        self.assertEqual(set(errors[4]), {'email', 'matricule'})
+        self.assertIn('role', errors[5])
+        self.assertIn('password', errors[6])
+        prof1 = User.objects.get(username='prof1')
+        self.assertEqual(prof1.role, User.roles.PROFESOR)
+        self.assertTrue(prof1.check_password('ProfPass123!'))
+    
+    def test_import_rejects_invalid_values(self):
+        """Test values of the wrong type or failing model validators are reported per row"""
+        report = import_users([
+            {'username': 'prof1', 'email': 5, 'password': 'ProfPass123!'},
+            {'username': 'prof2', 'email': 'prof2@example.com', 'password': 12345678901},
+            {'username': 'bad name!', 'email': 'prof3@example.com', 'password': 'ProfPass123!'},
+            {'username': 'p' * 200, 'email': 'prof4@example.com', 'password': 'ProfPass123!'},
+            {'username': 'prof5', 'email': 'prof5@example.com', 'password': 'ProfPass123!', 'matricule': 'M' * 101},
+        ])
+        self.assertEqual(report['created'], 0)
+        errors = {error['row']: set(error['errors']) for error in report['errors']}
+        self.assertEqual(errors, {1: {'email'}, 2: {'password'}, 3: {'username'}, 4: {'username'}, 5: {'matricule'}})
+    
+    def test_import_uses_set_based_queries(self):
+        """Test uniqueness checks do not grow with the roster size"""
+        rows = [
+            {'username': f'prof{i}', 'email': f'prof{i}@example.com', 'password': 'ProfPass123!', 'matricule': f'P{i}'}
+            for i in range(20)
+        ]
+        # 3 uniqueness lookups + 1 bulk insert inside a savepoint
+        with self.assertNumQueries(6):
+            report = import_users(rows)
+        self.assertEqual(report['created'], 20)
+    
+    def test_import_with_process_pool(self):
+        """Test passwords hashed in worker processes are usable"""
+        report = import_users(self.roster()[:2], workers=2)
+        self.assertEqual(report['created'], 2)
+        self.assertTrue(User.objects.get(username='prof2').check_password('ProfPass123!'))
+    
+    def test_import_endpoint(self):
+        """Test the admin import endpoint"""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access_token}')
+        response = self.client.post(self.import_url, {'users': self.roster()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(len(response.data['errors']), 4)
+    
+    def test_import_endpoint_requires_admin(self):
+        """Test professors cannot import users"""
+        professor = User.objects.create_user(
+            username='professor',
+            email='prof@example.com',
+            password='ProfPass123!',
+            role=User.roles.PROFESOR
+        )
+        token = ClaimsRefreshToken.for_user(professor).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.post(self.import_url, {'users': self.roster()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+    
+    def test_import_command_csv(self):
+        """Test the import_users management command with a CSV roster"""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as roster:
+            roster.write('username,email,password,matricule\n')
+            roster.write('prof1,prof1@example.com,ProfPass123!,P1\n')
+            roster.write('prof2,admin@example.com,ProfPass123!,\n')
+        out, err = StringIO(), StringIO()
+        call_command('import_users', roster.name, stdout=out, stderr=err)
+        self.assertIn('Imported 1 users, 1 rows rejected', out.getvalue())
+        self.assertIn('Row 2', err.getvalue())
+        self.assertTrue(User.objects.filter(username='prof1', matricule='P1').exists())
+
+
+class AsyncLoginTest(APITestCase):
+    """Test cases for the async login endpoint"""
+    
+    def setUp(self):
+        cache.clear()
+        self.login_url = '/api/auth/login/async/'
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='TestPass123!',
+            role=User.roles.PROFESOR
+        )
+        self.gate = LoginGate(workers=2, max_pending=4)
+        patcher = mock.patch('users.async_views.get_login_gate', return_value=self.gate)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def login(self, username='testuser', password='TestPass123!'):
+        return self.client.post(self.login_url, {'username': username, 'password': password}, format='json')
+    
+    def test_async_login_success(self):
+        """Test successful async login"""
+        response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.json()
+        self.assertEqual(body['user']['username'], 'testuser')
+        self.assertIn('access', body['tokens'])
+        self.assertEqual(self.gate.stats()['in_flight'], 0)
+    
+    @override_settings(JWT_TRACK_OUTSTANDING_TOKENS=True)
+    def test_async_login_tracks_outstanding_tokens(self):
+        """Test async login issues tracked refresh tokens off the event loop"""
+        response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(OutstandingToken.objects.filter(user=self.user).count(), 1)
+    
+    def test_async_login_invalid_credentials(self):
+        """Test async login rejects wrong passwords and unknown users"""
+        self.assertEqual(self.login(password='WrongPass123!').status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.login(username='nobody').status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_async_login_inactive_user(self):
+        """Test async login refuses disabled accounts"""
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.login().status_code, status.HTTP_403_FORBIDDEN)
+    
+    def test_async_login_missing_fields(self):
+        """Test async login validates the body"""
+        response = self.client.post(self.login_url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('username', response.json())
+    
+    def test_async_login_rejected_when_gate_full(self):
+        """Test logins beyond the admission limit are shed with 503"""
+        for _ in range(self.gate.max_pending):
+            self.assertTrue(self.gate.admit())
+        response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(self.gate.stats()['rejected'], 1)
+    
+    def test_unbounded_gate(self):
+        """Test a max_pending of 0 admits every login and negative limits are refused"""
+        gate = LoginGate(workers=1, max_pending=0)
+        for _ in range(100):
+            self.assertTrue(gate.admit())
+        for _ in range(100):
+            gate.release()
+        self.assertEqual(gate.stats()['in_flight'], 0)
+        with self.assertRaises(ValueError):
+            LoginGate(workers=1, max_pending=-1)
+    
+    def test_outdated_hash_upgraded_off_request_path(self):
+        """Test outdated hashes are handed to the background upgrade pool"""
+        self.user.password = make_password('TestPass123!', hasher='pbkdf2_sha1')
+        self.user.save()
+        with mock.patch.object(self.gate, 'schedule_upgrade') as schedule_upgrade:
+            response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        schedule_upgrade.assert_called_once_with(self.user.pk, 'TestPass123!')
+
+
+@override_settings(LOGIN_MAX_FAILURES_PER_USERNAME=3, LOGIN_MAX_FAILURES_PER_IP=10)
+class LoginThrottleTest(APITestCase):
+    """Test cases for the single-fetch login pipeline and its throttle"""
+    
+    def setUp(self):
+        cache.clear()
+        self.login_url = '/api/auth/login/'
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='TestPass123!'
+        )
+    
+    def login(self, username='testuser', password='TestPass123!', **extra):
+        return self.client.post(self.login_url, {'username': username, 'password': password}, format='json', **extra)
+    
+    def test_login_fetches_user_once(self):
+        """Test a successful login makes a single query"""
+        with self.assertNumQueries(1):
+            response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_repeated_failures_blocked_before_database(self):
+        """Test a username is locked out after repeated failures"""
+        for _ in range(3):
+            self.assertEqual(self.login(password='WrongPass123!').status_code, status.HTTP_401_UNAUTHORIZED)
+        with self.assertNumQueries(0):
+            response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+    
+    def test_failures_counted_per_ip(self):
+        """Test one client cycling through usernames is locked out"""
+        for i in range(10):
+            self.login(username=f'unknown{i}', REMOTE_ADDR='10.0.0.1')
+        response = self.login(REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.login(REMOTE_ADDR='10.0.0.2').status_code, status.HTTP_200_OK)
+    
+    def test_successful_login_resets_failures(self):
+        """Test a successful login clears the username's failure count"""
+        self.login(password='WrongPass123!')
+        self.login(password='WrongPass123!')
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+        self.login(password='WrongPass123!')
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+    
+    def test_unknown_username_remembered(self):
+        """Test repeat attempts for a missing username skip the lookup"""
+        self.login(username='ghost')
+        with self.assertNumQueries(0):
+            response = self.login(username='ghost')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_long_username_keys_bounded(self):
+        """Test an oversized username is throttled under a fixed-size cache key"""
+        username = 'x' * 5000
+        with mock.patch('users.throttling.cache', wraps=cache) as throttle_cache:
+            self.assertEqual(self.login(username=username).status_code, status.HTTP_401_UNAUTHORIZED)
+        keys = [key for call in throttle_cache.method_calls for key in (
+            call.args[0] if isinstance(call.args[0], list) else [call.args[0]]
+        )]
+        self.assertTrue(keys)
+        self.assertTrue(all(len(key) < 250 for key in keys))
+    
+    def test_failed_login_signal_sent(self):
+        """Test failures send user_login_failed like authenticate() does"""
+        received = []
+        handler = lambda sender, credentials, **kwargs: received.append(credentials['username'])
+        user_login_failed.connect(handler)
+        self.addCleanup(user_login_failed.disconnect, handler)
+        self.login(password='WrongPass123!')
+        self.login(username='ghost')
+        self.assertEqual(received, ['testuser', 'ghost'])
+    
+    def test_new_user_clears_unknown_username(self):
+        """Test creating an account makes its username loginable immediately"""
+        self.login(username='ghost')
+        User.objects.create_user(username='ghost', email='ghost@example.com', password='GhostPass123!')
+        self.assertEqual(self.login(username='ghost', password='GhostPass123!').status_code, status.HTTP_200_OK)
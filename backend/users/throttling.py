@@ -0,0 +1,84 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_login_failed
+from django.core.cache import cache
+
+User = get_user_model()
+
+
+class LoginThrottle:
+    """
+    Cache-backed login failure tracking.
+
+    Failed attempts are counted per username and per client IP within a
+    sliding window; once either count reaches its limit, further attempts
+    are refused before any database or hashing work. Usernames that do not
+    exist are remembered for a short time so repeated attempts against them
+    skip the user lookup entirely.
+
+    Usernames are unbounded client input, so keys embed a hash of the
+    normalized username rather than the username itself.
+    """
+
+    prefix = 'auth:login:'
+
+    @property
+    def window(self):
+        return getattr(settings, 'LOGIN_FAILURE_WINDOW', 900)
+
+    def _username_hash(self, username):
+        return hashlib.sha256(User.normalize_username(username).encode()).hexdigest()
+
+    def _username_key(self, username):
+        return f'{self.prefix}fail:user:{self._username_hash(username)}'
+
+    def _ip_key(self, ip):
+        return f'{self.prefix}fail:ip:{ip}'
+
+    def _unknown_key(self, username):
+        return f'{self.prefix}unknown:{self._username_hash(username)}'
+
+    def is_blocked(self, username, ip):
+        counts = cache.get_many([self._username_key(username), self._ip_key(ip)])
+        return (
+            counts.get(self._username_key(username), 0) >= getattr(settings, 'LOGIN_MAX_FAILURES_PER_USERNAME', 5)
+            or counts.get(self._ip_key(ip), 0) >= getattr(settings, 'LOGIN_MAX_FAILURES_PER_IP', 50)
+        )
+
+    def record_failure(self, username, ip, request=None):
+        """
+        Count a failed attempt and send `user_login_failed`, as authenticate()
+        would: the login views check the password on the row they fetched.
+        """
+        user_login_failed.send(sender=__name__, credentials={'username': username}, request=request)
+        for key in (self._username_key(username), self._ip_key(ip)):
+            # add() starts the window; incr() keeps the original expiry
+            if not cache.add(key, 1, self.window):
+                try:
+                    cache.incr(key)
+                except ValueError:
+                    cache.set(key, 1, self.window)
+
+    def reset(self, username):
+        cache.delete(self._username_key(username))
+
+    def get_user(self, username):
+        """Fetch the user row for a login attempt, or None if it does not exist"""
+        if cache.get(self._unknown_key(username)):
+            return None
+        user = User.objects.filter(username=User.normalize_username(username)).first()
+        if user is None:
+            cache.set(self._unknown_key(username), True, getattr(settings, 'LOGIN_UNKNOWN_USERNAME_TIMEOUT', 300))
+        return user
+
+    def forget_unknown(self, usernames):
+        cache.delete_many([self._unknown_key(username) for username in usernames])
+
+
+login_throttle = LoginThrottle()
+
+
+def get_client_ip(request):
+    return request.META.get('REMOTE_ADDR', '')
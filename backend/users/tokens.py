@@ -0,0 +1,126 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import BlacklistMixin, RefreshToken
+from rest_framework.exceptions import AuthenticationFailed
+
+from .revocation import revocation_index
+
+
+# Claims copied from the user row into every token so that requests can be
+# authorized without loading the user from the database.
+USER_CLAIMS = ('username', 'role', 'is_active')
+
+# Stamp of the user's claims when the token was issued (see claims_version)
+CLAIMS_VERSION_CLAIM = 'claims_version'
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token that embeds the user's authorization claims.
+    The access token derived from it inherits the same claims.
+
+    Blacklist checks go through the in-process revocation index instead of
+    the `BlacklistedToken` table, and no `OutstandingToken` row is written
+    at issue time unless `JWT_TRACK_OUTSTANDING_TOKENS` is set; `blacklist()`
+    still records the row it needs.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        if getattr(settings, 'JWT_TRACK_OUTSTANDING_TOKENS', False):
+            token = super().for_user(user)
+        else:
+            # Skip BlacklistMixin.for_user, which inserts the outstanding row
+            token = super(BlacklistMixin, cls).for_user(user)
+        set_user_claims(token, user)
+        return token
+
+    def check_blacklist(self):
+        if revocation_index.is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError('Token is blacklisted')
+
+    def blacklist(self):
+        result = super().blacklist()
+        revocation_index.revoke(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+        return result
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Token refresh that checks revocation in O(1) and re-reads the user's
+    claims, so role or status changes reach the new access token.
+    """
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+
+        User = get_user_model()
+        user = User.objects.filter(
+            pk=refresh.payload.get(api_settings.USER_ID_CLAIM)
+        ).only('id', *USER_CLAIMS).first()
+        if user is None or not user.is_active:
+            raise AuthenticationFailed(
+                self.error_messages['no_active_account'],
+                'no_active_account',
+            )
+        set_user_claims(refresh, user)
+
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            if getattr(settings, 'JWT_TRACK_OUTSTANDING_TOKENS', False):
+                refresh.outstand()
+            data['refresh'] = str(refresh)
+
+        return data
+
+
+def claims_version_key(user_id):
+    return f'auth:claims-version:{user_id}'
+
+
+def claims_version(user_id):
+    """
+    The stamp of a user's last role, username or status change, or 0 if
+    none is recorded. Tokens carry the stamp they were issued under, so a
+    token issued before a change is re-checked against the database.
+    """
+    return cache.get(claims_version_key(user_id), 0)
+
+
+def bump_claims_version(user_id):
+    """
+    Record that a user's claims changed. Saving a user does this itself
+    (users.signals); call it after bulk updates of role or is_active.
+    """
+    from .authentication import user_claims_cache_key
+
+    cache.set(claims_version_key(user_id), time.time_ns(), None)
+    cache.delete(user_claims_cache_key(user_id))
+
+
+def set_user_claims(token, user):
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    token[CLAIMS_VERSION_CLAIM] = claims_version(user.pk)
+
+
+def tokens_for_user(user):
+    """Return a fresh refresh/access token pair for the given user"""
+    refresh = ClaimsRefreshToken.for_user(user)
+    return {
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+    }
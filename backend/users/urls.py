@@ -1,12 +1,15 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
+from .async_views import async_login
 from .auth_views import (
     RegisterView,
     LoginView,
+    LoginStatsView,
     LogoutView,
     UserProfileView,
     ChangePasswordView,
-    UserListView
+    UserListView,
+    UserImportView
 )
 from .permissions import IsAdmin
 
@@ -15,6 +18,8 @@ urlpatterns = [
     # Authentication endpoints
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
+    path('login/async/', async_login, name='login-async'),
+    path('login/async/stats/', LoginStatsView.as_view(), name='login-async-stats'),
     path('logout/', LogoutView.as_view(), name='logout'),
     
     # User profile endpoints
@@ -23,6 +28,7 @@ urlpatterns = [
     
     # User management endpoints
     path('users/', UserListView.as_view(), name='user-list'),
+    path('users/import/', UserImportView.as_view(), name='user-import'),
     
     # JWT token refresh endpoint
     path('token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
@@ -8,6 +8,18 @@ export interface AttendanceRecord {
   timestamp: string;
 }
 
+// The list endpoint is keyset-paginated; follow `next` until the last page
+const fetchAllAttendance = async (query: string): Promise<AttendanceRecord[]> => {
+  const records: AttendanceRecord[] = [];
+  let url: string | null = `/attendance/?${query}`;
+  while (url) {
+    const response: { data: { attendance: AttendanceRecord[]; next: string | null } } = await api.get(url);
+    records.push(...response.data.attendance);
+    url = response.data.next;
+  }
+  return records;
+};
+
 export class AttendanceService {
   static async markAttendance(sessionId: string, status: 'present' | 'absent' | 'late'): Promise<AttendanceRecord> {
     const response = await api.post('/attendance/', { session_id: sessionId, status });
@@ -15,13 +27,11 @@ export class AttendanceService {
   }
 
   static async getAttendance(sessionId: string): Promise<AttendanceRecord[]> {
-    const response = await api.get(`/attendance/?session_id=${sessionId}`);
-    return response.data;
+    return fetchAllAttendance(`session_id=${sessionId}`);
   }
 
   static async getStudentAttendance(studentId: string): Promise<AttendanceRecord[]> {
-    const response = await api.get(`/attendance/?student_id=${studentId}`);
-    return response.data;
+    return fetchAllAttendance(`student_id=${studentId}`);
   }
 
   static async updateAttendance(attendanceId: string, status: 'present' | 'absent' | 'late'): Promise<AttendanceRecord> {
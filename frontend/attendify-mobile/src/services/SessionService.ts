@@ -14,8 +14,9 @@ export const createSession = async (classId: string, duration: number): Promise<
 };
 
 export const getSessions = async (): Promise<Session[]> => {
+  // The list is paginated; this returns the newest page
   const response = await api.get('/sessions/');
-  return response.data;
+  return response.data.sessions;
 };
 
 export const updateSession = async (sessionId: string, data: Partial<Session>): Promise<Session> => {